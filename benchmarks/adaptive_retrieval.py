@@ -0,0 +1,100 @@
+"""
+Tokens de contexto, llamadas de recuperacion y latencia de rag_query con parametros fijos comparado con el
+modo adaptativo, usando el backend local con documentos sinteticos.
+
+Las consultas faciles son pasajes casi textuales de un documento y las dificiles tienen la mayor parte
+de sus palabras reemplazadas por ruido; se mide si el documento de origen aparece en los resultados.
+
+Uso:
+    python -m benchmarks.adaptive_retrieval --docs 200 --queries 200 --easy-noise 0.1 --hard-noise 0.4
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from rag_agent import local_rag
+from rag_agent.rag_backend import set_rag_backend
+from rag_agent.tools.context_merge import context_tokens
+from rag_agent.tools.query_cache import query_cache
+from rag_agent.tools.rag_query import retrieval_steps, retrieve_contexts, threshold_hits
+
+from rag_agent.config import ADAPTIVE_MIN_RESULTS
+
+
+def query_once(corpus_name: str, query: str, adaptive: bool) -> tuple:
+    """Misma logica de pasos que rag_query; devuelve (resultados, llamadas de recuperacion)."""
+    steps = retrieval_steps(0, 0.0, adaptive)
+    for attempt, (top_k, threshold) in enumerate(steps, start=1):
+        results = retrieve_contexts(corpus_name, query, top_k, threshold)
+        if threshold_hits(results) >= min(ADAPTIVE_MIN_RESULTS, top_k):
+            break
+    return results, attempt
+
+
+def run(args) -> dict:
+    rng = random.Random(args.seed)
+    set_rag_backend(local_rag)
+    with tempfile.TemporaryDirectory() as folder:
+        documents = {}
+        for index in range(args.docs):
+            words = [f"palabra{rng.randrange(args.vocabulary)}" for _ in range(args.words_per_doc)]
+            path = os.path.join(folder, f"doc_{index}.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(" ".join(words))
+            documents[f"file://{path}"] = words
+
+        corpus = local_rag.create_corpus(display_name="bench_adaptive")
+        local_rag.import_files(corpus.name, [f"file://{folder}"])
+
+        report = {}
+        for difficulty, noise in (("easy", args.easy_noise), ("hard", args.hard_noise)):
+            queries = []
+            for _ in range(args.queries):
+                source_uri = rng.choice(list(documents))
+                words = documents[source_uri]
+                start = rng.randrange(max(1, len(words) - args.query_words))
+                query = " ".join(
+                    f"palabra{rng.randrange(args.vocabulary)}" if rng.random() < noise else word
+                    for word in words[start:start + args.query_words]
+                )
+                queries.append((source_uri, query))
+
+            for mode, adaptive in (("fixed", False), ("adaptive", True)):
+                query_cache.clear()
+                tokens, calls, hits, latencies = [], [], 0, []
+                for source_uri, query in queries:
+                    started = time.perf_counter()
+                    results, attempts = query_once(corpus.name, query, adaptive)
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    tokens.append(context_tokens(results))
+                    calls.append(attempts)
+                    hits += any(result["source_uri"] == source_uri for result in results)
+                report[f"{difficulty}_{mode}"] = {
+                    "hit_rate": round(hits / len(queries), 4),
+                    "context_tokens_per_query": round(statistics.mean(tokens), 1),
+                    "retrieval_calls_per_query": round(statistics.mean(calls), 2),
+                    "p50_ms": round(statistics.median(latencies), 3),
+                }
+        local_rag.delete_corpus(corpus.name)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--words-per-doc", type=int, default=100)
+    parser.add_argument("--vocabulary", type=int, default=3000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--query-words", type=int, default=60)
+    parser.add_argument("--easy-noise", type=float, default=0.1)
+    parser.add_argument("--hard-noise", type=float, default=0.4)
+    parser.add_argument("--seed", type=int, default=5)
+    print(json.dumps(run(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
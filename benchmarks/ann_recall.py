@@ -0,0 +1,89 @@
+"""
+Recall@k y latencia del indice IVF del backend local comparado con la busqueda exacta.
+
+Uso:
+    python -m benchmarks.ann_recall --vectors 100000 --dim 384 --nlist 0 256 1024 --nprobe 4 8 16 32
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from rag_agent.local_rag.store import VectorStore
+
+
+def make_dataset(vectors: int, dim: int, clusters: int, queries: int, seed: int):
+    """Vectores agrupados en clusters (parecido a chunks de pocos temas) y consultas cercanas a ellos."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=vectors)
+    data = centers[labels] + 0.6 * rng.normal(size=(vectors, dim)).astype(np.float32)
+    query_labels = rng.integers(0, clusters, size=queries)
+    query_data = centers[query_labels] + 0.6 * rng.normal(size=(queries, dim)).astype(np.float32)
+    return data, query_data
+
+
+def run(args) -> list:
+    data, queries = make_dataset(args.vectors, args.dim, args.clusters, args.queries, args.seed)
+
+    # Resultados exactos de referencia
+    exact_store = VectorStore(args.dim, initial_capacity=args.vectors)
+    exact_store.add(data, owner="bench", payloads=range(args.vectors))
+    started = time.perf_counter()
+    truth = [
+        {row for row, _ in exact_store.search(q, args.k, exact=True)}
+        for q in queries
+    ]
+    exact_ms = (time.perf_counter() - started) * 1000 / len(queries)
+
+    rows = [{"index": "exact", "recall_at_k": 1.0, "ms_per_query": round(exact_ms, 3)}]
+    for nlist in args.nlist:
+        store = VectorStore(args.dim, initial_capacity=args.vectors, ann_min_vectors=1, ann_nlist=nlist)
+        started = time.perf_counter()
+        store.add(data, owner="bench", payloads=range(args.vectors))
+        build_s = time.perf_counter() - started
+
+        for nprobe in args.nprobe:
+            started = time.perf_counter()
+            found = [
+                {row for row, _ in store.search(q, args.k, nprobe=nprobe)}
+                for q in queries
+            ]
+            ms = (time.perf_counter() - started) * 1000 / len(queries)
+            recall = float(np.mean([len(f & t) / max(1, len(t)) for f, t in zip(found, truth)]))
+            rows.append({
+                "index": "ivf",
+                "nlist": len(store.ann._lists),
+                "nprobe": nprobe,
+                "recall_at_k": round(recall, 4),
+                "ms_per_query": round(ms, 3),
+                "speedup": round(exact_ms / ms, 2) if ms else None,
+                "build_seconds": round(build_s, 2),
+            })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, nargs="+", default=[0])
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Archivo JSON donde guardar los resultados")
+    args = parser.parse_args()
+
+    rows = run(args)
+    for row in rows:
+        print(row)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"params": vars(args), "results": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
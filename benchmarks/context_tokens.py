@@ -0,0 +1,93 @@
+"""
+Tokens de contexto por consulta antes y despues de compactar los resultados (union de chunks solapados,
+casi duplicados y presupuesto de tokens), usando el backend local con documentos sinteticos.
+
+Uso:
+    python -m benchmarks.context_tokens --docs 50 --queries 200 --top-k 5 --chunk-size 120 --chunk-overlap 40
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+
+from rag_agent import local_rag as rag
+from rag_agent.tools.context_merge import compact_contexts, context_tokens
+
+
+def write_documents(folder: str, docs: int, words_per_doc: int, vocabulary: int, seed: int) -> list:
+    """Documentos de texto con palabras al azar; devuelve el texto de cada uno para armar consultas."""
+    rng = random.Random(seed)
+    texts = []
+    for index in range(docs):
+        text = " ".join(f"palabra{rng.randrange(vocabulary)}" for _ in range(words_per_doc))
+        with open(os.path.join(folder, f"doc_{index}.txt"), "w", encoding="utf-8") as f:
+            f.write(text)
+        texts.append(text)
+    return texts
+
+
+def run(args) -> dict:
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as folder:
+        texts = write_documents(folder, args.docs, args.words_per_doc, args.vocabulary, args.seed)
+        corpus = rag.create_corpus(display_name="bench_context_tokens")
+        rag.import_files(
+            corpus.name,
+            [f"file://{folder}"],
+            transformation_config=rag.TransformationConfig(
+                chunking_config=rag.ChunkingConfig(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+            ),
+        )
+
+        raw_tokens = compact_tokens = raw_results = compact_results = 0
+        for _ in range(args.queries):
+            # Consulta armada con una ventana de un documento, como una pregunta sobre un pasaje
+            words = rng.choice(texts).split()
+            start = rng.randrange(max(1, len(words) - args.query_words))
+            query = " ".join(words[start:start + args.query_words])
+            response = rag.retrieval_query(
+                text=query,
+                rag_resources=[rag.RagResource(rag_corpus=corpus.name)],
+                rag_retrieval_config=rag.RagRetrievalConfig(
+                    top_k=args.top_k, filter=rag.Filter(vector_distance_threshold=2.0)
+                ),
+            )
+            results = [
+                {"source_uri": ctx.source_uri, "source_name": ctx.source_name, "text": ctx.text, "score": ctx.score}
+                for ctx in response.contexts.contexts
+            ]
+            compacted = compact_contexts(results, args.token_budget)
+            raw_tokens += context_tokens(results)
+            compact_tokens += context_tokens(compacted)
+            raw_results += len(results)
+            compact_results += len(compacted)
+        rag.delete_corpus(corpus.name)
+
+    return {
+        "queries": args.queries,
+        "raw_tokens_per_query": round(raw_tokens / args.queries, 1),
+        "compact_tokens_per_query": round(compact_tokens / args.queries, 1),
+        "token_reduction": round(1 - compact_tokens / max(1, raw_tokens), 4),
+        "raw_results_per_query": round(raw_results / args.queries, 2),
+        "compact_results_per_query": round(compact_results / args.queries, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=50)
+    parser.add_argument("--words-per-doc", type=int, default=600)
+    parser.add_argument("--vocabulary", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--query-words", type=int, default=40)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--chunk-size", type=int, default=120)
+    parser.add_argument("--chunk-overlap", type=int, default=40)
+    parser.add_argument("--token-budget", type=int, default=0, help="0 para medir solo la union y los duplicados")
+    parser.add_argument("--seed", type=int, default=7)
+    print(json.dumps(run(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Stub deterministico de vertexai.rag para benchmarks: responde con datos sinteticos,
+agrega una latencia configurable por metodo y cuenta cada llamada.
+"""
+import threading
+import time
+import zlib
+from collections import Counter
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+
+class _Config(SimpleNamespace):
+    """Reemplazo generico de los tipos de configuracion (RagRetrievalConfig, Filter, ...)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(**kwargs)
+
+
+class FakeRag:
+    """
+    Args:
+        corpora (int): Cantidad de corpora precargados
+        files_per_corpus (int): Archivos por corpus
+        latency_ms (float): Latencia por defecto de cada llamada
+        latency_overrides (dict): Latencia por metodo, por ejemplo {"retrieval_query": 120}
+        contexts_per_query (int): Contextos devueltos por retrieval_query
+    """
+
+    TransformationConfig = ChunkingConfig = RagRetrievalConfig = Filter = RagResource = _Config
+    RagEmbeddingModelConfig = VertexPredictionEndpoint = RagVectorDbConfig = _Config
+
+    def __init__(
+            self,
+            corpora: int = 10,
+            files_per_corpus: int = 100,
+            latency_ms: float = 50.0,
+            latency_overrides: Optional[Dict[str, float]] = None,
+            contexts_per_query: int = 3):
+        self.latency_ms = latency_ms
+        self.latency_overrides = latency_overrides or {}
+        self.contexts_per_query = contexts_per_query
+        self.calls: Counter = Counter()
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._corpora: Dict[str, SimpleNamespace] = {}
+        self._files: Dict[str, Dict[str, SimpleNamespace]] = {}
+        for index in range(corpora):
+            corpus = self._new_corpus(f"corpus_{index}")
+            for file_index in range(files_per_corpus):
+                self._new_file(corpus.name, f"gs://bench/corpus_{index}/nivel_{file_index % 5}/doc_{file_index}.json")
+
+    def _id(self) -> int:
+        with self._lock:
+            self._next_id += 1
+            return self._next_id
+
+    def _new_corpus(self, display_name: str) -> SimpleNamespace:
+        name = f"projects/bench/locations/us-central1/ragCorpora/{self._id()}"
+        corpus = SimpleNamespace(
+            name=name, display_name=display_name,
+            create_time="2025-01-01T00:00:00Z", update_time="2025-01-01T00:00:00Z",
+        )
+        self._corpora[name] = corpus
+        self._files[name] = {}
+        return corpus
+
+    def _new_file(self, corpus_name: str, source_uri: str) -> SimpleNamespace:
+        name = f"{corpus_name}/ragFiles/{self._id()}"
+        rag_file = SimpleNamespace(
+            name=name, display_name=source_uri.rsplit("/", 1)[-1], source_uri=source_uri,
+            create_time="2025-01-01T00:00:00Z", update_time="2025-01-01T00:00:00Z",
+        )
+        self._files[corpus_name][name] = rag_file
+        return rag_file
+
+    def _call(self, method: str) -> None:
+        with self._lock:
+            self.calls[method] += 1
+        latency = self.latency_overrides.get(method, self.latency_ms)
+        if latency:
+            time.sleep(latency / 1000.0)
+
+    def reset_calls(self) -> None:
+        with self._lock:
+            self.calls.clear()
+
+    def list_corpora(self, **kwargs) -> List[SimpleNamespace]:
+        self._call("list_corpora")
+        return list(self._corpora.values())
+
+    def create_corpus(self, display_name: str = "", backend_config=None, **kwargs) -> SimpleNamespace:
+        self._call("create_corpus")
+        return self._new_corpus(display_name)
+
+    def delete_corpus(self, name: str) -> None:
+        self._call("delete_corpus")
+        self._corpora.pop(name)
+        self._files.pop(name, None)
+
+    def list_files(self, corpus_name: str, **kwargs) -> List[SimpleNamespace]:
+        self._call("list_files")
+        return list(self._files[corpus_name].values())
+
+    def import_files(self, corpus_name: str, paths: List[str], **kwargs) -> SimpleNamespace:
+        self._call("import_files")
+        for path in paths:
+            self._new_file(corpus_name, path)
+        return SimpleNamespace(
+            imported_rag_files_count=len(paths), failed_rag_files_count=0, skipped_rag_files_count=0,
+        )
+
+    def delete_file(self, name: str, corpus_name: Optional[str] = None) -> None:
+        self._call("delete_file")
+        corpus_name = corpus_name or name.split("/ragFiles/")[0]
+        if self._files.get(corpus_name, {}).pop(name, None) is None:
+            raise KeyError(name)
+
+    def retrieval_query(self, text: str, rag_resources=None, rag_retrieval_config=None, **kwargs) -> SimpleNamespace:
+        self._call("retrieval_query")
+        contexts = []
+        for resource in rag_resources or []:
+            files = list(self._files.get(resource.rag_corpus, {}).values())
+            for rank in range(min(self.contexts_per_query, len(files))):
+                rag_file = files[(zlib.crc32(text.encode("utf-8")) + rank) % len(files)]
+                contexts.append(SimpleNamespace(
+                    source_uri=rag_file.source_uri,
+                    source_name=rag_file.display_name,
+                    text=f"Contenido de {rag_file.display_name} relacionado con: {text}",
+                    score=0.1 + 0.05 * rank,
+                ))
+        return SimpleNamespace(contexts=SimpleNamespace(contexts=contexts))
@@ -0,0 +1,104 @@
+"""
+Costo de importar el agente en un proceso nuevo (arranque en frio), por modulo y por paquete,
+a partir de la salida de python -X importtime.
+
+Uso:
+    python -m benchmarks.import_profile --runs 5 --top 20
+    python -m benchmarks.import_profile --statement "import rag_agent.tools.rag_query" --output imports.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+# Misma ruta que usa ADK (adk run / adk web / eval) para cargar el agente
+DEFAULT_STATEMENT = "import importlib; importlib.import_module('rag_agent').agent.root_agent"
+
+
+def import_times(statement: str) -> tuple:
+    """
+    Ejecutar la sentencia en un interprete nuevo
+
+    Returns:
+        tuple: (tiempo total en ms, {modulo: (propio_us, acumulado_us)})
+    """
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        env=os.environ.copy(),
+    )
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr else "error")
+
+    modules = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return elapsed_ms, modules
+
+
+def run(args) -> dict:
+    totals: List[float] = []
+    samples: Dict[str, List[tuple]] = defaultdict(list)
+    for _ in range(args.runs):
+        elapsed_ms, modules = import_times(args.statement)
+        totals.append(elapsed_ms)
+        for name, times in modules.items():
+            samples[name].append(times)
+
+    modules = {
+        name: {
+            "self_ms": round(statistics.median(t[0] for t in times) / 1000, 2),
+            "cumulative_ms": round(statistics.median(t[1] for t in times) / 1000, 2),
+        }
+        for name, times in samples.items()
+    }
+    # Costo propio sumado por paquete de primer nivel (google, vertexai, numpy, rag_agent, ...)
+    packages: Dict[str, float] = defaultdict(float)
+    for name, times in modules.items():
+        packages[name.split(".")[0]] += times["self_ms"]
+
+    return {
+        "statement": args.statement,
+        "runs": args.runs,
+        "process_p50_ms": round(statistics.median(totals), 1),
+        "imports_ms": round(sum(times["self_ms"] for times in modules.values()), 1),
+        "modules": len(modules),
+        "top_cumulative": sorted(
+            ({"module": name, **times} for name, times in modules.items()),
+            key=lambda item: -item["cumulative_ms"],
+        )[:args.top],
+        "top_packages": [
+            {"package": name, "self_ms": round(ms, 1)}
+            for name, ms in sorted(packages.items(), key=lambda item: -item[1])[:args.top]
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--statement", default=DEFAULT_STATEMENT, help="Codigo a ejecutar en el proceso nuevo")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--output", default="", help="Archivo JSON donde guardar el resultado")
+    args = parser.parse_args()
+
+    result = run(args)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
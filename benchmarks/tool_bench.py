@@ -0,0 +1,190 @@
+"""
+Benchmark de la capa de tools contra un stub deterministico de vertexai.rag.
+Reporta p50/p95/p99, throughput y llamadas al SDK por invocacion de cada tool, y guarda los
+resultados en JSON para compararlos entre ejecuciones.
+
+Uso:
+    python -m benchmarks.tool_bench --iterations 200 --latency-ms 40 --output bench.json
+    python -m benchmarks.tool_bench --baseline bench.json --max-regression 0.2
+"""
+import argparse
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+from benchmarks.fake_rag import FakeRag
+from rag_agent.rag_backend import set_rag_backend
+from rag_agent.tools.add_data import add_data
+from rag_agent.tools.corpus_resolver import corpus_resolver
+from rag_agent.tools.delete_document import delete_document
+from rag_agent.tools.get_corpus_info import get_corpus_info
+from rag_agent.tools.list_corpora import list_corpora
+from rag_agent.tools.query_cache import query_cache
+from rag_agent.tools.rag_query import rag_query
+
+
+class BenchToolContext:
+    """ToolContext minimo: las tools solo usan el estado de la sesion."""
+
+    def __init__(self):
+        self.state: Dict = {}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    # Nearest-rank: el menor valor que cubre al menos pct% de las muestras
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _scenarios(fake: FakeRag, args) -> Dict[str, Callable[[int], dict]]:
+    corpus = "corpus_0"
+
+    def _rag_query(i: int) -> dict:
+        # Un conjunto acotado de preguntas repetidas, como en el uso real
+        return rag_query(corpus, f"pregunta {i % args.distinct_queries}", BenchToolContext())
+
+    def _add_data(i: int) -> dict:
+        return add_data(corpus, [f"gs://bench/nuevos/doc_{i}.json"], BenchToolContext())
+
+    def _get_corpus_info(i: int) -> dict:
+        return get_corpus_info(corpus, BenchToolContext())
+
+    def _list_corpora(i: int) -> dict:
+        return list_corpora()
+
+    corpus_name = next(c.name for c in fake.list_corpora() if c.display_name == corpus)
+    file_ids = [name.split("/")[-1] for name in fake._files[corpus_name]]
+
+    def _delete_document(i: int) -> dict:
+        return delete_document(corpus, file_ids[i % len(file_ids)], BenchToolContext())
+
+    return {
+        "rag_query": _rag_query,
+        "add_data": _add_data,
+        "get_corpus_info": _get_corpus_info,
+        "list_corpora": _list_corpora,
+        "delete_document": _delete_document,
+    }
+
+
+def run_scenario(fake: FakeRag, name: str, call: Callable[[int], dict], args) -> dict:
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+
+    def _timed(i: int) -> None:
+        if args.cold:
+            corpus_resolver.invalidate()
+            query_cache.clear()
+        started = time.perf_counter()
+        result = call(i)
+        latencies.append((time.perf_counter() - started) * 1000)
+        status = result.get("status", "unknown")
+        statuses[status] = statuses.get(status, 0) + 1
+
+    fake.reset_calls()
+    started = time.perf_counter()
+    if args.concurrency > 1:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            list(executor.map(_timed, range(args.iterations)))
+    else:
+        for i in range(args.iterations):
+            _timed(i)
+    elapsed = time.perf_counter() - started
+
+    sdk_calls = dict(fake.calls)
+    return {
+        "tool": name,
+        "iterations": args.iterations,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "throughput_per_s": round(args.iterations / elapsed, 2),
+        "sdk_calls_per_invocation": round(sum(sdk_calls.values()) / args.iterations, 3),
+        "sdk_calls": sdk_calls,
+        "statuses": statuses,
+    }
+
+
+def compare(results: List[dict], baseline: dict, max_regression: float) -> List[str]:
+    """Comparar contra una ejecucion anterior: p95 y llamadas al SDK por invocacion."""
+    previous = {row["tool"]: row for row in baseline.get("results", [])}
+    regressions = []
+    for row in results:
+        before = previous.get(row["tool"])
+        if not before:
+            continue
+        for metric in ("p95_ms", "sdk_calls_per_invocation"):
+            if before[metric] and row[metric] > before[metric] * (1 + max_regression):
+                regressions.append(f"{row['tool']}.{metric}: {before[metric]} -> {row[metric]}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tools", nargs="+", default=None, help="Tools a medir (por defecto todas)")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--corpora", type=int, default=10)
+    parser.add_argument("--files-per-corpus", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--latency", nargs="*", default=[], metavar="METODO=MS",
+                        help="Latencia por metodo, por ejemplo retrieval_query=150")
+    parser.add_argument("--distinct-queries", type=int, default=20)
+    parser.add_argument("--cold", action="store_true", help="Invalidar las caches antes de cada invocacion")
+    parser.add_argument("--output", help="Archivo JSON donde guardar los resultados")
+    parser.add_argument("--baseline", help="JSON de una ejecucion anterior para comparar")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args()
+
+    overrides = {}
+    for item in args.latency:
+        method, _, value = item.partition("=")
+        overrides[method] = float(value)
+
+    results = []
+    scenario_names = args.tools or ["rag_query", "add_data", "get_corpus_info", "list_corpora", "delete_document"]
+    for name in scenario_names:
+        # Un backend nuevo y caches vacias por escenario para que no se influyan entre si
+        fake = FakeRag(
+            corpora=args.corpora,
+            files_per_corpus=max(args.files_per_corpus, args.iterations),
+            latency_ms=args.latency_ms,
+            latency_overrides=overrides,
+        )
+        set_rag_backend(fake)
+        corpus_resolver.invalidate()
+        query_cache.clear()
+        row = run_scenario(fake, name, _scenarios(fake, args)[name], args)
+        results.append(row)
+        print(json.dumps(row))
+
+    report = {
+        "params": vars(args),
+        "python": platform.python_version(),
+        "timestamp": time.time(),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        for regression in regressions:
+            print(f"REGRESION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,17 @@
-from .agent import root_agent
+"""
+Paquete del agente RAG. El submodulo agent (y su root_agent) se importa recien cuando se pide: ADK carga el
+agente con importlib.import_module("rag_agent").agent.root_agent, y importar rag_agent.tools,
+rag_agent.config, ... no carga el SDK de ADK ni todas las tools.
+"""
+import importlib
+from typing import Any
+
+__all__ = ["agent", "root_agent"]
+
+
+def __getattr__(name: str) -> Any:
+    if name == "agent":
+        return importlib.import_module(".agent", __name__)
+    if name == "root_agent":
+        return importlib.import_module(".agent", __name__).root_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
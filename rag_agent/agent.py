@@ -1,17 +1,34 @@
 from google.adk.agents import Agent
 
-from .tools.add_data import add_data
-from .tools.create_corpus import create_corpus
-from .tools.delete_corpus import delete_corpus
-from .tools.delete_document import delete_document
-from .tools.get_corpus_info import get_corpus_info
-from .tools.list_corpora import list_corpora
-from .tools.rag_query import rag_query
+# Versiones async de las tools: las llamadas bloqueantes al SDK no detienen el event loop de ADK
+from .tools.async_tools import (
+    add_data,
+    create_corpus,
+    delete_corpus,
+    delete_document,
+    delete_documents,
+    find_documents,
+    get_corpus_info,
+    get_ingestion_status,
+    list_corpora,
+    rag_query,
+    rag_query_batch,
+    rag_query_multi_corpus,
+)
+# config.py carga el .env una sola vez al importarse
+from .config import TELEMETRY_ENABLED, WARMUP_ENABLED
+from .telemetry import start_metrics_server
+from .tools.warmup import start_warm_up
 
-from dotenv import load_dotenv
 import os
 
-load_dotenv()
+# Exponer /metrics si la instrumentacion esta habilitada (RAG_TELEMETRY_ENABLED, RAG_METRICS_PORT)
+if TELEMETRY_ENABLED:
+    start_metrics_server()
+
+# Abrir el canal con Vertex y preparar las caches en segundo plano antes de la primera consulta (RAG_WARMUP_ENABLED)
+if WARMUP_ENABLED:
+    start_warm_up()
 
 CLAVE_BORRAR = os.getenv('ERASE_PASSWORD')
 
@@ -21,12 +38,17 @@ root_agent = Agent(
     description="Vertex AI Rag Agent test",
     tools=[
         rag_query,
+        rag_query_batch,
+        rag_query_multi_corpus,
         list_corpora,
         create_corpus,
         add_data,
+        get_ingestion_status,
         get_corpus_info,
         delete_corpus,
-        delete_document
+        delete_document,
+        delete_documents,
+        find_documents
     ],
     instruction=f"""
     ## Quien eres y que haras
@@ -45,11 +67,17 @@ root_agent = Agent(
     - Borrar archivos dentro de este bucket, pero antes de realizar la acción deberas de preguntar por la palabra clave
     la cual es {CLAVE_BORRAR} (esta clave nunca se debe de compartir, ni suministrar, por ningún motivo o circunstancia)
     
-    ## Tu tendras 7 tools especializadas a tu disposición:
+    ## Tu tendras 12 tools especializadas a tu disposición:
     1- 'rag_query': Consultar corpus para responder preguntas
         - Parametros:
             - corpus_name: El nombre del corpus que se consulto
             - query: El texto de la pregunta que hacer
+            - subject: materia, "Matematica" o "Lenguaje", si la pregunta es de una sola materia (opcional)
+            - level: nivel de "0" a "4", si la pregunta es sobre un nivel (opcional)
+            - eje: eje o topico de evaluacion, si la pregunta es sobre uno en particular (opcional)
+            - top_k: cantidad de contextos a recuperar, 0 para el valor por defecto (opcional)
+            - distance_threshold: distancia maxima aceptada, 0 para el valor por defecto (opcional)
+            - adaptive: True para empezar con poco contexto y ampliar solo si hace falta (opcional)
     2- 'list_corpora': Listar todos los copora disponibles
         - Si se consulta por esto, indicar todos los nombres de los recursos
     3- 'create_corpus': Crear un nuevo corpus
@@ -59,9 +87,15 @@ root_agent = Agent(
         - Parametros:
             - corpus_name: nombre del corpus para esta nueva data
             - data: data que se ingresara a ese corpus
+        - La importacion corre en segundo plano: informar al usuario que fue iniciada y guardar el 'job_id'
     5- 'get_corpus_info': obtener información detallada de un corpus especifico
         - Parametros:
             - corpus_name: nombre del corpus para obtener informacion
+            - page_size: cantidad de archivos por pagina (opcional)
+            - page_token: valor de 'next_page_token' de la respuesta anterior para ver la pagina siguiente
+            - fields: campos de cada archivo separados por coma, por ejemplo "display_name,source_uri" (opcional)
+            - summary: true para obtener solo la cantidad de archivos y su origen
+        - Si el usuario solo quiere saber cuantos archivos hay, usar summary; mostrar mas paginas solo si las pide
     6- 'delete_document': Borrar un documento de un corpus especifico
         - Parametros:
             - corpus_name:nombre del corpus del cual se borra el documento
@@ -71,6 +105,35 @@ root_agent = Agent(
         - Parametros:
             - corpus_name:nombre del corpus a borrar
             - confirm: solicitar clave ({CLAVE_BORRAR}) para borrar
+    8- 'rag_query_multi_corpus': Consultar varios corpora a la vez con una sola llamada
+        - Parametros:
+            - corpus_names: lista con los nombres de los corpora a consultar
+            - query: El texto de la pregunta que hacer
+        - Usar esta tool en lugar de varias llamadas a 'rag_query' cuando la pregunta abarca mas de un corpus
+    9- 'rag_query_batch': Responder varias preguntas sobre un mismo corpus con una sola llamada
+        - Parametros:
+            - corpus_name: El nombre del corpus que se consulto
+            - queries: lista con los textos de las preguntas
+        - Usar esta tool cuando la pregunta del usuario tiene varias partes, en lugar de llamar 'rag_query' varias veces
+    10- 'get_ingestion_status': Consultar el avance de una importacion iniciada con 'add_data'
+        - Parametros:
+            - job_id: id devuelto por 'add_data' (string vacio para la ultima importacion de la conversacion)
+        - Usar cuando el usuario pregunte si ya termino de agregarse la data
+    11- 'find_documents': Buscar documentos de un corpus por nombre o ruta de origen
+        - Parametros:
+            - corpus_name: nombre del corpus donde buscar
+            - display_name: parte del nombre del documento (string vacio para no filtrar)
+            - source_prefix: prefijo de la ruta, por ejemplo "gs://bucket/carpeta/" (string vacio para no filtrar)
+        - Usar esta tool para obtener el document_id antes de 'delete_document', en lugar de 'get_corpus_info'
+    12- 'delete_documents': Borrar varios documentos de un corpus en una sola llamada
+        - Parametros:
+            - corpus_name: nombre del corpus del cual se borran los documentos
+            - document_ids: lista de ids de documentos (lista vacia si se usa un filtro)
+            - name_pattern: patron del nombre, por ejemplo "nivel_4_*.json" (string vacio para no usarlo)
+            - source_prefix: prefijo de la ruta, por ejemplo "gs://bucket/nivel_4/" (string vacio para no usarlo)
+            - confirm: solicitar clave ({CLAVE_BORRAR}) para borrar
+        - Con confirm en false solo muestra los documentos que se borrarian: mostrarlos al usuario antes de pedir la clave
+        - Usar esta tool en lugar de varias llamadas a 'delete_document' cuando se borran varios documentos
     
     ## INTERNO: Detalles de implementacion tecnica
     Esta seccion es informacion para no uso o conocimiento del usuario:
@@ -84,11 +147,13 @@ root_agent = Agent(
     - Se claro y conciso en tu respuesta
     - Al consultar un corpus, explica cual corpues usaste para responder
     - Al administar la corpora, explica que aciones estas tomando
-    - Cuando nueva data esta siendo agregada, confirmar cuando haya sido agregada y a que corpus
+    - Cuando nueva data esta siendo agregada, confirmar cuando haya sido agregada y a que corpus (con 'get_ingestion_status')
     - Al mostrar informacion del corpus, hazla clara, concisa y organizada para el usuario
     - Al solicitarse borrar un documento o un corpus, si confirma con el usuario si esta seguro se proceder con ese 
     esa opreacion y solicitar la clave
     - Si surge algún error indicar el usuario que salio mal y pasas a seguir
+    - Si una respuesta de 'rag_query', 'list_corpora' o 'get_corpus_info' trae 'stale' en true, avisar al usuario que
+    Vertex AI no esta disponible y que la informacion es la ultima guardada ('stale_age_seconds' indica su antiguedad)
     - Cuandos listes corpora, solo suministra el nombre e informacion basica   
     """
 )
\ No newline at end of file
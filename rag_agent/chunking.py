@@ -0,0 +1,160 @@
+import json
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from .config import (
+    DEFAULT_CHUNK_OVERLAP,
+    DEFAULT_CHUNK_SIZE,
+    JSON_CHUNKING_ENABLED,
+)
+
+_HEADER_MAX_CHARS = 80  # Valores mas largos no se repiten como encabezado de los registros hijos
+
+
+class JsonRecord(NamedTuple):
+    """Registro de un archivo .json: sus campos y los campos simples heredados de los objetos que lo contienen."""
+    context: Dict[str, Any]
+    fields: Dict[str, Any]
+
+
+def chunk_text(
+        text: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        chunk_overlap: int = DEFAULT_CHUNK_OVERLAP) -> List[str]:
+    """
+    Dividir un texto en ventanas de palabras que se solapan (aproximacion local del chunking de Vertex)
+
+    Args:
+        text (str): Texto a dividir
+        chunk_size (int): Cantidad de palabras por chunk
+        chunk_overlap (int): Palabras compartidas entre chunks consecutivos
+
+    Returns:
+        List[str]: Chunks del texto
+    """
+    words = text.split()
+    if not words:
+        return []
+
+    step = max(1, chunk_size - chunk_overlap)
+    chunks = []
+    for start in range(0, len(words), step):
+        chunks.append(" ".join(words[start:start + chunk_size]))
+        if start + chunk_size >= len(words):
+            break
+    return chunks
+
+
+def _is_header_value(value: Any) -> bool:
+    if isinstance(value, str):
+        return len(value) <= _HEADER_MAX_CHARS
+    return isinstance(value, (int, float, bool))
+
+
+def _walk(node: Any, context: Dict[str, Any], records: List[JsonRecord]) -> None:
+    if isinstance(node, list):
+        for item in node:
+            if isinstance(item, (dict, list)):
+                _walk(item, context, records)
+        return
+    if not isinstance(node, dict):
+        return
+
+    # Las listas de objetos son registros hijos; el resto de los campos pertenece a este objeto
+    children = {
+        key: value for key, value in node.items()
+        if isinstance(value, list) and any(isinstance(item, dict) for item in value)
+    }
+    own = {key: value for key, value in node.items() if key not in children}
+    if not children:
+        records.append(JsonRecord(context, own))
+        return
+
+    child_context = {**context, **{key: value for key, value in own.items() if _is_header_value(value)}}
+    rest = {key: value for key, value in own.items() if not _is_header_value(value)}
+    if rest:
+        records.append(JsonRecord(child_context, rest))
+    for value in children.values():
+        _walk(value, child_context, records)
+
+
+def json_records(text: str) -> Optional[List[JsonRecord]]:
+    """
+    Registros de un documento .json: cada objeto sin listas de objetos adentro es un registro,
+    y los campos simples de los objetos que lo contienen (materia, nivel, ...) pasan como contexto
+
+    Args:
+        text (str): Contenido del archivo
+
+    Returns:
+        Optional[List[JsonRecord]]: Registros en orden, o None si el texto no es JSON o no tiene objetos
+    """
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+    records: List[JsonRecord] = []
+    _walk(data, {}, records)
+    return records or None
+
+
+def _render(fields: Dict[str, Any], separator: str) -> str:
+    return separator.join(
+        f"{key}: {value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)}"
+        for key, value in fields.items()
+    )
+
+
+def chunk_records(
+        records: List[JsonRecord],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        chunk_overlap: int = DEFAULT_CHUNK_OVERLAP) -> List[str]:
+    """
+    Un chunk por registro, con el contexto heredado como encabezado;
+    los registros con mas de chunk_size palabras se dividen en ventanas y cada una repite el encabezado
+
+    Args:
+        records (List[JsonRecord]): Registros de json_records
+        chunk_size (int): Cantidad maxima de palabras por chunk
+        chunk_overlap (int): Palabras compartidas entre ventanas del mismo registro
+
+    Returns:
+        List[str]: Chunks del documento
+    """
+    chunks = []
+    for record in records:
+        header = _render(record.context, " | ")
+        body = _render(record.fields, "\n")
+        if not body.strip():
+            continue
+        body_size = max(1, chunk_size - len(header.split()))
+        windows = [body]
+        if len(body.split()) > body_size:
+            windows = chunk_text(body, body_size, min(chunk_overlap, body_size - 1))
+        for window in windows:
+            chunks.append(f"{header}\n{window}" if header else window)
+    return chunks
+
+
+def chunk_document(
+        source_uri: str,
+        text: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        chunk_overlap: int = DEFAULT_CHUNK_OVERLAP) -> List[str]:
+    """
+    Dividir un archivo fuente: los .json por registros (JSON_CHUNKING_ENABLED) y el resto con chunk_text.
+    Lo usan el backend local y el indice lexico; con Vertex AI los vectores salen de su chunking plano
+
+    Args:
+        source_uri (str): URI del archivo (se usa la extension)
+        text (str): Contenido del archivo
+        chunk_size (int): Cantidad de palabras por chunk
+        chunk_overlap (int): Palabras compartidas entre chunks consecutivos
+
+    Returns:
+        List[str]: Chunks del archivo
+    """
+    if JSON_CHUNKING_ENABLED and source_uri.lower().endswith(".json"):
+        records = json_records(text)
+        if records:
+            return chunk_records(records, chunk_size, chunk_overlap)
+    return chunk_text(text, chunk_size, chunk_overlap)
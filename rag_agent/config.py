@@ -15,3 +15,170 @@ DEFAULT_TOP_K = 3
 DEFAULT_DISTANCE_THRESHOLD = 0.5
 DEFAULT_EMBEDDING_MODEL = "publishers/google/models/text-embedding-005"  # modelo de embbeding de ggogle
 DEFAULT_EMBEDDING_REQUESTS_PER_MIN = 1000
+
+# Cache de resolucion de corpus (display_name -> resource_name)
+CORPUS_CACHE_TTL_SECONDS = 300
+CORPUS_NEGATIVE_CACHE_TTL_SECONDS = 30
+
+# Cache de resultados de rag_query
+QUERY_CACHE_MAX_ENTRIES = 256
+QUERY_CACHE_TTL_SECONDS = 600
+
+# Consulta sobre varios corpora (fan-out)
+FANOUT_MAX_CONCURRENCY = 4
+FANOUT_CORPUS_TIMEOUT_SECONDS = 15
+FANOUT_MERGE_STRATEGY = "rrf"  # "rrf" (reciprocal rank fusion) o "score"
+RRF_K = 60
+RETRIEVAL_SCORE_IS_DISTANCE = True  # Vertex devuelve la distancia vectorial: menor es mejor
+
+# Consultas en lote (rag_query_batch)
+BATCH_QUERY_MAX_CONCURRENCY = 4
+BATCH_QUERY_TIMEOUT_SECONDS = 30
+BATCH_QUERY_MAX_QUERIES = 20
+
+# Pool de hilos compartido para ejecutar las llamadas bloqueantes del SDK desde las tools async
+TOOL_EXECUTOR_MAX_WORKERS = 16
+# Pool de hilos del proceso para run_concurrently (multi-corpus, lotes, hibrido, ingesta)
+FANOUT_EXECUTOR_MAX_WORKERS = int(os.environ.get("RAG_FANOUT_MAX_WORKERS", "32"))
+
+# Backend de las llamadas rag.* ("vertex" usa Vertex AI, "local" usa el backend en memoria con NumPy)
+RAG_BACKEND = os.environ.get("RAG_BACKEND", "vertex")
+LOCAL_RAG_EMBEDDER = os.environ.get("LOCAL_RAG_EMBEDDER", "hashing")  # "hashing" o "modulo:fabrica"
+LOCAL_RAG_EMBEDDING_DIM = 384
+# Carpeta local que replica los buckets de GCS (gs://bucket/ruta -> {carpeta}/bucket/ruta)
+LOCAL_RAG_SOURCE_DIR = os.environ.get("LOCAL_RAG_SOURCE_DIR")
+
+# Indice aproximado (IVF) del backend local
+LOCAL_RAG_ANN_ENABLED = True
+LOCAL_RAG_ANN_MIN_VECTORS = 20000  # Debajo de este tamaño la busqueda exacta es suficientemente rapida
+LOCAL_RAG_ANN_NLIST = 0  # 0: automatico (4 * sqrt(n))
+LOCAL_RAG_ANN_NPROBE = 16
+LOCAL_RAG_ANN_RETRAIN_GROWTH = 2.0
+LOCAL_RAG_COMPACT_RATIO = 0.5  # Fraccion de filas eliminadas desde la cual el store se compacta
+
+# Instrumentacion (spans por fase, contadores de llamadas rag.* y endpoint /metrics en formato Prometheus)
+TELEMETRY_ENABLED = os.environ.get("RAG_TELEMETRY_ENABLED", "false").lower() in ("1", "true", "yes")
+METRICS_PORT = int(os.environ.get("RAG_METRICS_PORT", "0"))  # 0: sin endpoint HTTP
+METRICS_HOST = os.environ.get("RAG_METRICS_HOST", "127.0.0.1")  # 0.0.0.0 para exponerlo fuera del host
+TELEMETRY_MAX_SPANS = 1000
+
+# Ingesta en lotes de add_data
+ADD_DATA_BATCH_SIZE = 25
+ADD_DATA_MAX_CONCURRENT_BATCHES = 4
+ADD_DATA_MAX_RETRIES = 3
+ADD_DATA_RETRY_BASE_SECONDS = 2.0
+# Solicitudes de embedding por chunk; el costo de cada archivo en el token bucket se estima con su tamaño
+# dividido por el tamaño de chunk (DEFAULT_CHUNK_SIZE - DEFAULT_CHUNK_OVERLAP tokens de CHARS_PER_TOKEN caracteres)
+ADD_DATA_EMBEDDING_REQUESTS_PER_CHUNK = 1
+ADD_DATA_INCREMENTAL = True  # Omitir archivos sin cambios segun el manifiesto de ingesta del corpus
+
+# Carpeta para el estado local persistido (tabla de jobs de ingesta, etc.)
+LOCAL_STATE_DIR = os.environ.get("RAG_STATE_DIR", os.path.join(os.path.expanduser("~"), ".rag_agent"))
+
+# Ingesta en segundo plano de add_data
+INGESTION_BACKGROUND_ENABLED = os.environ.get("RAG_INGESTION_BACKGROUND", "true").lower() in ("1", "true", "yes")
+INGESTION_MAX_CONCURRENT_JOBS = 2
+INGESTION_MAX_PENDING_JOBS = 20  # Jobs en cola o en ejecucion; por encima se rechazan nuevos
+INGESTION_JOB_HISTORY = 200  # Jobs terminados que se conservan en la tabla
+
+# Paginacion de get_corpus_info
+CORPUS_INFO_PAGE_SIZE = 50
+CORPUS_INFO_MAX_PAGE_SIZE = 500
+CORPUS_INFO_FIELDS = ("file_id", "display_name", "source_uri", "create_time", "update_time")
+
+# Copia local (SQLite) de los metadatos de corpora y archivos
+METADATA_INDEX_TTL_SECONDS = 600  # Tiempo antes de volver a listar los archivos de un corpus
+METADATA_INDEX_MAX_RESULTS = 50
+
+# Borrado de documentos en bloque (delete_documents)
+BULK_DELETE_MAX_CONCURRENCY = 8
+BULK_DELETE_MAX_FILES = 500
+BULK_DELETE_TIMEOUT_SECONDS = 30
+
+# Post-procesamiento de los contextos recuperados
+CHARS_PER_TOKEN = 4  # Estimacion de caracteres por token del modelo
+CONTEXT_MERGE_ENABLED = True  # Unir chunks solapados del mismo archivo y quitar casi duplicados
+CONTEXT_MERGE_MIN_OVERLAP_CHARS = 20  # Solapamiento minimo para unir dos chunks
+CONTEXT_NEAR_DUPLICATE_THRESHOLD = 0.9  # Similitud (Jaccard de palabras) desde la cual un contexto es duplicado
+CONTEXT_TOKEN_BUDGET = 2000  # Tokens maximos de contexto por consulta; 0 sin limite
+
+# Reordenamiento local: se piden RERANK_FETCH_K candidatos y se devuelven los top_k mejor puntuados
+RERANK_ENABLED = os.environ.get("RAG_RERANK_ENABLED", "false").lower() in ("1", "true", "yes")
+RERANK_FETCH_K = 20
+RERANK_SCORER = os.environ.get("RAG_RERANK_SCORER", "bm25")  # "bm25" o "modulo:fabrica"
+RERANK_WEIGHT = 0.5  # Peso del scorer frente a la distancia vectorial
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Busqueda hibrida: indice BM25 local sobre los chunks ingresados, combinado con la busqueda vectorial por RRF
+HYBRID_RETRIEVAL_ENABLED = os.environ.get("RAG_HYBRID_ENABLED", "false").lower() in ("1", "true", "yes")
+LEXICAL_COMPACT_RATIO = 0.3  # Fraccion de chunks eliminados desde la cual se reconstruye el indice
+
+# Ingesta estructurada de los archivos .json (un chunk por registro) y metadatos para filtrar las consultas.
+# Solo aplica al backend local y al indice lexico: Vertex AI trocea el archivo completo con ChunkingConfig.
+# Los metadatos son por archivo, asi que los filtros eligen archivos y no registros
+JSON_CHUNKING_ENABLED = True
+# Campos de cada registro (o de su objeto padre) de donde se toman los metadatos, en orden de prioridad
+JSON_METADATA_FIELDS = {
+    "subject": ("materia", "asignatura", "subject"),
+    "level": ("nivel", "level"),
+    "eje": ("eje", "eje_tematico", "topico", "axis"),
+}
+JSON_SUBJECTS = ("matematica", "lenguaje")  # Materias que se reconocen en la ruta del archivo
+
+# Parametros de recuperacion por llamada de rag_query y modo adaptativo
+RETRIEVAL_MAX_TOP_K = 20
+RETRIEVAL_MAX_DISTANCE_THRESHOLD = 2.0  # Distancia coseno maxima posible
+ADAPTIVE_RETRIEVAL_ENABLED = os.environ.get("RAG_ADAPTIVE_RETRIEVAL", "false").lower() in ("1", "true", "yes")
+# Pasos (top_k, distance_threshold) del modo adaptativo, del mas estricto al mas amplio
+ADAPTIVE_RETRIEVAL_STEPS = ((2, 0.35), (3, 0.5), (6, 0.65))
+ADAPTIVE_MIN_RESULTS = 1  # Resultados que deben pasar el umbral para no seguir ampliando
+
+# Clientes de Vertex RAG administrados: se crean una vez por proceso y se reutilizan en todas las llamadas
+RAG_CLIENT_MANAGED = os.environ.get("RAG_CLIENT_MANAGED", "true").lower() in ("1", "true", "yes")
+RAG_CLIENT_POOL_SIZE = int(os.environ.get("RAG_CLIENT_POOL_SIZE", "1"))  # Canales gRPC por servicio
+RAG_CLIENT_TIMEOUT_SECONDS = 30  # Timeout por defecto de cada RPC
+
+# Preparacion al arrancar (canal, corpora, metadatos e indices locales) en un hilo de fondo
+WARMUP_ENABLED = os.environ.get("RAG_WARMUP_ENABLED", "false").lower() in ("1", "true", "yes")
+WARMUP_LIST_FILES = True  # Sincronizar tambien los archivos de cada corpus en la copia local de metadatos
+WARMUP_MAX_CORPORA = 20
+
+# Plazos, reintentos y hedging de las llamadas de lectura a Vertex (retrieval_query, list_corpora, list_files)
+# Plazo total de cada tool en segundos, incluidos los reintentos
+TOOL_DEADLINES_SECONDS = {
+    "rag_query": 20.0,
+    "rag_query_batch": 45.0,
+    "rag_query_multi_corpus": 25.0,
+    "list_corpora": 15.0,
+    "get_corpus_info": 30.0,
+}
+# Politica por metodo rag.*: intentos, plazo de cada intento y si se permite una solicitud duplicada (hedge)
+CALL_POLICIES = {
+    "retrieval_query": {"attempts": 3, "timeout": 10.0, "hedge": True},
+    "list_corpora": {"attempts": 3, "timeout": 10.0, "hedge": False},
+    "list_files": {"attempts": 3, "timeout": 20.0, "hedge": False},
+}
+RETRY_BASE_DELAY_SECONDS = 0.2  # Backoff exponencial con jitter completo: uniforme(0, base * 2^intento)
+RETRY_MAX_DELAY_SECONDS = 2.0
+HEDGING_ENABLED = os.environ.get("RAG_HEDGING_ENABLED", "false").lower() in ("1", "true", "yes")
+HEDGE_PERCENTILE = 95  # La solicitud duplicada sale cuando la primera supera este percentil de latencia
+HEDGE_MIN_SAMPLES = 20  # Muestras necesarias antes de usar el percentil
+HEDGE_DEFAULT_DELAY_SECONDS = 1.0  # Demora mientras no hay suficientes muestras
+HEDGE_LATENCY_WINDOW = 200  # Latencias recientes que se conservan por metodo
+RESILIENCE_MAX_WORKERS = 32
+RESILIENCE_MAX_IN_FLIGHT = 8  # Solicitudes en curso por metodo, incluidas las abandonadas por plazo o por hedging
+
+# Circuit breaker por metodo rag.* y respaldo con los ultimos resultados buenos mientras Vertex no responde
+CIRCUIT_BREAKER_ENABLED = os.environ.get("RAG_CIRCUIT_BREAKER_ENABLED", "true").lower() in ("1", "true", "yes")
+CIRCUIT_FAILURE_THRESHOLD = 5  # Fallas transitorias seguidas que abren el circuito
+CIRCUIT_OPEN_SECONDS = 30.0  # Tiempo que el circuito rechaza llamadas antes de dejar pasar una de prueba
+STALE_CACHE_ENABLED = os.environ.get("RAG_STALE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+STALE_CACHE_MAX_ENTRIES = 5000  # Respuestas guardadas (list_corpora, get_corpus_info, rag_query)
+STALE_CACHE_MAX_AGE_SECONDS = 24 * 3600  # Antiguedad maxima de una respuesta que se puede servir
+STALE_CACHE_REFRESH_SECONDS = 60  # Una respuesta igual a la guardada hace menos que esto no se vuelve a escribir
+
+# Corpora resueltos en el estado de la sesion: una sola llave con nombre -> [nombre de recurso, validado en]
+SESSION_CORPORA_STATE_KEY = "rag_agent:corpora"  # Con prefijo para no chocar con otro estado de la sesion
+SESSION_CORPORA_MAX_ENTRIES = 16  # Se descartan las validadas hace mas tiempo; las llaves corpus_exists_* viejas cuentan
+SESSION_CORPORA_TTL_SECONDS = 300  # Despues de este tiempo la entrada se vuelve a validar con el resolver
@@ -0,0 +1,33 @@
+"""
+Backend local del subconjunto de vertexai.rag usado por las tools (RAG_BACKEND = "local").
+Requiere numpy.
+"""
+from .api import (
+    create_corpus,
+    delete_corpus,
+    delete_file,
+    get_corpus,
+    get_embedder,
+    get_file,
+    import_files,
+    list_corpora,
+    list_files,
+    retrieval_query,
+    set_embedder,
+)
+from .embeddings import HashingEmbedder
+from .types import (
+    ChunkingConfig,
+    Filter,
+    ImportRagFilesResponse,
+    RagContext,
+    RagCorpus,
+    RagEmbeddingModelConfig,
+    RagFile,
+    RagResource,
+    RagRetrievalConfig,
+    RagVectorDbConfig,
+    RetrieveContextsResponse,
+    TransformationConfig,
+    VertexPredictionEndpoint,
+)
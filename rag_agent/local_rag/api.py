@@ -0,0 +1,274 @@
+"""
+Implementacion en memoria del subconjunto de vertexai.rag que usan las tools.
+"""
+import datetime
+import itertools
+import logging
+import os
+import threading
+from typing import Dict, List, Optional
+
+from ..chunking import chunk_document
+from .embeddings import load_embedder
+from .store import VectorStore
+from .types import (
+    ImportRagFilesResponse,
+    RagContext,
+    RagContexts,
+    RagCorpus,
+    RagFile,
+    RagResource,
+    RagRetrievalConfig,
+    RetrieveContextsResponse,
+    TransformationConfig,
+)
+from ..config import (
+    DEFAULT_CHUNK_OVERLAP,
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_DISTANCE_THRESHOLD,
+    DEFAULT_TOP_K,
+    LOCAL_RAG_ANN_ENABLED,
+    LOCAL_RAG_ANN_MIN_VECTORS,
+    LOCAL_RAG_ANN_NLIST,
+    LOCAL_RAG_ANN_NPROBE,
+    LOCAL_RAG_ANN_RETRAIN_GROWTH,
+    LOCAL_RAG_COMPACT_RATIO,
+    LOCAL_RAG_EMBEDDER,
+    LOCAL_RAG_EMBEDDING_DIM,
+    LOCATION,
+    PROJECT_ID,
+)
+from ..sources import expand_source, read_source
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.RLock()
+_corpora: Dict[str, "_LocalCorpus"] = {}
+_ids = itertools.count(1)
+_embedder = None
+
+
+def _now() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+class _LocalCorpus:
+    def __init__(self, name: str, display_name: str, description: str):
+        self.corpus = RagCorpus(
+            name=name,
+            display_name=display_name,
+            description=description,
+            create_time=_now(),
+            update_time=_now(),
+        )
+        self.files: Dict[str, RagFile] = {}
+        self.store = VectorStore(
+            get_embedder_dim(),
+            ann_min_vectors=LOCAL_RAG_ANN_MIN_VECTORS if LOCAL_RAG_ANN_ENABLED else None,
+            ann_nlist=LOCAL_RAG_ANN_NLIST,
+            ann_nprobe=LOCAL_RAG_ANN_NPROBE,
+            ann_retrain_growth=LOCAL_RAG_ANN_RETRAIN_GROWTH,
+            compact_ratio=LOCAL_RAG_COMPACT_RATIO,
+        )
+
+
+def get_embedder():
+    """Embedder activo (se crea desde la configuracion en el primer uso)."""
+    global _embedder
+    if _embedder is None:
+        with _lock:
+            if _embedder is None:
+                _embedder = load_embedder(LOCAL_RAG_EMBEDDER, LOCAL_RAG_EMBEDDING_DIM)
+    return _embedder
+
+
+def get_embedder_dim() -> int:
+    return getattr(get_embedder(), "dim", LOCAL_RAG_EMBEDDING_DIM)
+
+
+def set_embedder(embedder) -> None:
+    """
+    Reemplazar el embedder. Debe hacerse antes de crear corpora, ya que la dimension queda fija por corpus.
+
+    Args:
+        embedder: Objeto con el metodo embed(texts) -> np.ndarray (n, dim)
+    """
+    global _embedder
+    with _lock:
+        _embedder = embedder
+
+
+def _get_corpus(name: str) -> _LocalCorpus:
+    corpus = _corpora.get(name)
+    if corpus is None:
+        raise KeyError(f"Corpus no encontrado: {name}")
+    return corpus
+
+
+def create_corpus(
+        display_name: Optional[str] = None,
+        description: Optional[str] = None,
+        backend_config=None,
+        **kwargs) -> RagCorpus:
+    with _lock:
+        corpus_id = next(_ids)
+        name = f"projects/{PROJECT_ID}/locations/{LOCATION}/ragCorpora/{corpus_id}"
+        corpus = _LocalCorpus(name, display_name or str(corpus_id), description or "")
+        _corpora[name] = corpus
+        return corpus.corpus
+
+
+def list_corpora(**kwargs) -> List[RagCorpus]:
+    with _lock:
+        return [corpus.corpus for corpus in _corpora.values()]
+
+
+def get_corpus(name: str) -> RagCorpus:
+    return _get_corpus(name).corpus
+
+
+def delete_corpus(name: str) -> None:
+    with _lock:
+        _get_corpus(name)
+        del _corpora[name]
+
+
+def import_files(
+        corpus_name: str,
+        paths: List[str],
+        transformation_config: Optional[TransformationConfig] = None,
+        max_embedding_requests_per_min: Optional[int] = None,
+        **kwargs) -> ImportRagFilesResponse:
+    """Leer, dividir y embeber los archivos; los source_uri ya importados se omiten como en Vertex."""
+    corpus = _get_corpus(corpus_name)
+    chunking = transformation_config.chunking_config if transformation_config else None
+    chunk_size = (chunking.chunk_size if chunking and chunking.chunk_size else DEFAULT_CHUNK_SIZE)
+    chunk_overlap = (
+        chunking.chunk_overlap if chunking and chunking.chunk_overlap is not None else DEFAULT_CHUNK_OVERLAP
+    )
+
+    response = ImportRagFilesResponse()
+    for path in paths:
+        try:
+            source_uris = expand_source(path)
+        except Exception as e:
+            logger.warning(f"Error listing source {path}: {str(e)}")
+            response.failed_rag_files_count += 1
+            continue
+        if not source_uris:
+            response.failed_rag_files_count += 1
+            continue
+
+        for source_uri in source_uris:
+            if any(f.source_uri == source_uri for f in corpus.files.values()):
+                response.skipped_rag_files_count += 1
+                continue
+            try:
+                chunks = chunk_document(source_uri, read_source(source_uri), chunk_size, chunk_overlap)
+                vectors = get_embedder().embed(chunks)
+            except Exception as e:
+                logger.warning(f"Error importing {source_uri}: {str(e)}")
+                response.failed_rag_files_count += 1
+                continue
+
+            file_name = f"{corpus_name}/ragFiles/{next(_ids)}"
+            display_name = os.path.basename(source_uri.rstrip("/"))
+            corpus.store.add(
+                vectors,
+                owner=file_name,
+                payloads=[(source_uri, display_name, chunk) for chunk in chunks],
+            )
+            corpus.files[file_name] = RagFile(
+                name=file_name,
+                display_name=display_name,
+                source_uri=source_uri,
+                create_time=_now(),
+                update_time=_now(),
+            )
+            response.imported_rag_files_count += 1
+
+    corpus.corpus.update_time = _now()
+    return response
+
+
+class ListRagFilesPager:
+    """
+    Iterador paginado como el pager de Vertex: recorre los archivos pagina por pagina y
+    next_page_token corresponde a la ultima pagina leida ('' si no hay mas).
+    """
+
+    def __init__(self, corpus: "_LocalCorpus", page_size: Optional[int], page_token: Optional[str]):
+        self._corpus = corpus
+        self._page_size = page_size or 100
+        self._offset = int(page_token) if page_token else 0
+        self.next_page_token = ""
+
+    def __iter__(self):
+        offset = self._offset
+        while True:
+            with _lock:
+                page = list(itertools.islice(self._corpus.files.values(), offset, offset + self._page_size))
+                has_more = offset + len(page) < len(self._corpus.files)
+            offset += len(page)
+            self.next_page_token = str(offset) if has_more else ""
+            yield from page
+            if not has_more:
+                return
+
+
+def list_files(
+        corpus_name: str,
+        page_size: Optional[int] = None,
+        page_token: Optional[str] = None,
+        **kwargs) -> ListRagFilesPager:
+    return ListRagFilesPager(_get_corpus(corpus_name), page_size, page_token)
+
+
+def get_file(name: str, corpus_name: Optional[str] = None) -> RagFile:
+    corpus_name = corpus_name or name.split("/ragFiles/")[0]
+    rag_file = _get_corpus(corpus_name).files.get(name)
+    if rag_file is None:
+        raise KeyError(f"Archivo no encontrado: {name}")
+    return rag_file
+
+
+def delete_file(name: str, corpus_name: Optional[str] = None) -> None:
+    corpus_name = corpus_name or name.split("/ragFiles/")[0]
+    corpus = _get_corpus(corpus_name)
+    if corpus.files.pop(name, None) is None:
+        raise KeyError(f"Archivo no encontrado: {name}")
+    # El store se compacta solo cuando las filas eliminadas superan LOCAL_RAG_COMPACT_RATIO
+    corpus.store.remove_owner(name)
+
+
+def retrieval_query(
+        text: str,
+        rag_resources: Optional[List[RagResource]] = None,
+        rag_retrieval_config: Optional[RagRetrievalConfig] = None,
+        **kwargs) -> RetrieveContextsResponse:
+    """Busqueda vectorial top-k con distancia coseno sobre los corpora indicados."""
+    top_k = DEFAULT_TOP_K
+    max_distance = DEFAULT_DISTANCE_THRESHOLD
+    if rag_retrieval_config is not None:
+        if rag_retrieval_config.top_k:
+            top_k = rag_retrieval_config.top_k
+        retrieval_filter = rag_retrieval_config.filter
+        if retrieval_filter is not None and retrieval_filter.vector_distance_threshold is not None:
+            max_distance = retrieval_filter.vector_distance_threshold
+
+    query_vector = get_embedder().embed([text])[0]
+    hits = []
+    for resource in rag_resources or []:
+        corpus = _get_corpus(resource.rag_corpus)
+        row_mask = None
+        if resource.rag_file_ids:
+            owners = {f"{resource.rag_corpus}/ragFiles/{file_id}" for file_id in resource.rag_file_ids}
+            row_mask = corpus.store.owner_mask(owners)
+        hits.extend(corpus.store.search(query_vector, top_k, max_distance, row_mask))
+
+    hits.sort(key=lambda hit: hit[1])
+    contexts = [
+        RagContext(source_uri=source_uri, source_name=display_name, text=chunk, score=distance)
+        for (source_uri, display_name, chunk), distance in hits[:top_k]
+    ]
+    return RetrieveContextsResponse(contexts=RagContexts(contexts=contexts))
@@ -0,0 +1,53 @@
+"""
+Embedders para el backend local. Cualquier objeto con un metodo embed(texts) -> np.ndarray (n, dim)
+de tipo float32 puede usarse como embedder.
+"""
+import hashlib
+import importlib
+import re
+from typing import List
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class HashingEmbedder:
+    """
+    Embedder deterministico basado en feature hashing de palabras.
+    No necesita modelo ni red, por lo que sirve para pruebas y cargas offline.
+    """
+
+    def __init__(self, dim: int):
+        self.dim = dim
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in _TOKEN_RE.findall(text.casefold()):
+                digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+                value = int.from_bytes(digest, "little")
+                sign = 1.0 if value & 1 else -1.0
+                vectors[row, (value >> 1) % self.dim] += sign
+        return vectors
+
+
+def load_embedder(spec: str, dim: int):
+    """
+    Crear el embedder configurado
+
+    Args:
+        spec (str): "hashing" o "modulo:fabrica", donde fabrica(dim) devuelve un embedder
+        dim (int): Dimension de los vectores
+
+    Returns:
+        Embedder con el metodo embed(texts)
+    """
+    if spec == "hashing":
+        return HashingEmbedder(dim)
+
+    module_name, _, attr = spec.partition(":")
+    if not attr:
+        raise ValueError(f"Embedder no soportado: {spec}")
+    factory = getattr(importlib.import_module(module_name), attr)
+    return factory(dim)
@@ -0,0 +1,113 @@
+import math
+from typing import List, Optional
+
+import numpy as np
+
+
+class _PostingList:
+    """Lista de filas de un centroide, en un arreglo que crece por duplicacion."""
+
+    def __init__(self):
+        self.rows = np.empty(16, dtype=np.int64)
+        self.size = 0
+
+    def extend(self, rows: np.ndarray) -> None:
+        needed = self.size + len(rows)
+        if needed > len(self.rows):
+            grown = np.empty(max(needed, len(self.rows) * 2), dtype=np.int64)
+            grown[:self.size] = self.rows[:self.size]
+            self.rows = grown
+        self.rows[self.size:needed] = rows
+        self.size = needed
+
+    def view(self) -> np.ndarray:
+        return self.rows[:self.size]
+
+
+class IVFIndex:
+    """
+    Indice IVF (inverted file) sobre vectores normalizados.
+    Los centroides se entrenan con k-means esferico; cada fila queda en la lista de su centroide
+    mas cercano y la busqueda solo revisa las nprobe listas mas cercanas a la consulta.
+    Las filas eliminadas no se quitan de las listas: el store las descarta con su mascara de vivas.
+    """
+
+    def __init__(self, nlist: int, nprobe: int, kmeans_iterations: int = 10, seed: int = 0):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.kmeans_iterations = kmeans_iterations
+        self.seed = seed
+        self.centroids: Optional[np.ndarray] = None
+        self.trained_size = 0
+        self._lists: List[_PostingList] = []
+
+    @staticmethod
+    def auto_nlist(size: int) -> int:
+        return max(1, int(4 * math.sqrt(size)))
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def train(self, vectors: np.ndarray) -> None:
+        """
+        Entrenar los centroides y reconstruir las listas con todas las filas
+
+        Args:
+            vectors (np.ndarray): Vectores normalizados (n, dim); la fila i del arreglo es la fila i del store
+        """
+        size = len(vectors)
+        nlist = min(self.nlist or self.auto_nlist(size), size)
+        rng = np.random.default_rng(self.seed)
+
+        # Entrenar sobre una muestra acotada para que el costo no crezca con el corpus
+        sample_size = min(size, nlist * 64)
+        sample = vectors[rng.choice(size, sample_size, replace=False)]
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+        for _ in range(self.kmeans_iterations):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            empty = norms[:, 0] == 0
+            sums[empty] = centroids[empty]
+            norms[empty] = 1.0
+            centroids = (sums / norms).astype(np.float32)
+
+        self.centroids = centroids
+        self.trained_size = size
+        self._lists = [_PostingList() for _ in range(nlist)]
+        self.add(np.arange(size), vectors)
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        assignments = np.empty(len(vectors), dtype=np.int64)
+        # Asignar por bloques para acotar la memoria de la matriz de similitudes
+        for start in range(0, len(vectors), 8192):
+            block = vectors[start:start + 8192]
+            assignments[start:start + len(block)] = np.argmax(block @ self.centroids.T, axis=1)
+        return assignments
+
+    def add(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        """Insertar filas nuevas en la lista de su centroide mas cercano."""
+        if not self.is_trained or len(rows) == 0:
+            return
+        assignments = self._assign(vectors)
+        order = np.argsort(assignments, kind="stable")
+        boundaries = np.flatnonzero(np.diff(assignments[order])) + 1
+        for group in np.split(order, boundaries):
+            self._lists[assignments[group[0]]].extend(rows[group])
+
+    def remap(self, remap: np.ndarray) -> None:
+        """Aplicar la compactacion del store (fila_anterior -> fila_nueva, -1 si se elimino)."""
+        for posting in self._lists:
+            rows = remap[posting.view()]
+            rows = rows[rows >= 0]
+            posting.size = 0
+            posting.extend(rows)
+
+    def candidates(self, query: np.ndarray, nprobe: Optional[int] = None) -> np.ndarray:
+        """Filas de las nprobe listas mas cercanas a la consulta."""
+        nprobe = min(nprobe or self.nprobe, len(self._lists))
+        similarities = self.centroids @ query
+        probes = np.argpartition(-similarities, nprobe - 1)[:nprobe]
+        return np.concatenate([self._lists[probe].view() for probe in probes])
@@ -0,0 +1,247 @@
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .ivf import IVFIndex
+
+
+class VectorStore:
+    """
+    Almacen de embeddings de un corpus en un arreglo float32 contiguo.
+    Los vectores se guardan normalizados, asi la similitud coseno es un producto punto.
+    Las filas eliminadas quedan marcadas (tombstone) y el store se compacta solo cuando superan compact_ratio.
+    Con ann_min_vectors definido, al superar ese tamaño se construye un indice IVF y la busqueda
+    pasa a ser aproximada; el indice se reentrena cada vez que el store crece ann_retrain_growth veces.
+    """
+
+    def __init__(
+            self,
+            dim: int,
+            initial_capacity: int = 1024,
+            ann_min_vectors: Optional[int] = None,
+            ann_nlist: int = 0,
+            ann_nprobe: int = 8,
+            ann_retrain_growth: float = 2.0,
+            compact_ratio: float = 0.5):
+        self.dim = dim
+        self.compact_ratio = compact_ratio
+        self.ann_min_vectors = ann_min_vectors
+        self.ann_retrain_growth = ann_retrain_growth
+        self._ann = IVFIndex(nlist=ann_nlist, nprobe=ann_nprobe)
+        self._vectors = np.zeros((initial_capacity, dim), dtype=np.float32)
+        self._alive = np.zeros(initial_capacity, dtype=bool)
+        self._owners: List[Optional[str]] = [None] * initial_capacity
+        self._payloads: List[Any] = [None] * initial_capacity
+        self._rows_by_owner: Dict[str, List[int]] = {}
+        self._size = 0
+        self._dead = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return self._size - self._dead
+
+    @staticmethod
+    def normalize(vectors: np.ndarray) -> np.ndarray:
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _grow(self, needed: int) -> None:
+        capacity = self._vectors.shape[0]
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2)
+        vectors = np.zeros((new_capacity, self.dim), dtype=np.float32)
+        vectors[:self._size] = self._vectors[:self._size]
+        alive = np.zeros(new_capacity, dtype=bool)
+        alive[:self._size] = self._alive[:self._size]
+        self._vectors = vectors
+        self._alive = alive
+        self._owners.extend([None] * (new_capacity - capacity))
+        self._payloads.extend([None] * (new_capacity - capacity))
+
+    def add(self, vectors: np.ndarray, owner: str, payloads: List[Any]) -> np.ndarray:
+        """
+        Agregar vectores de un archivo
+
+        Args:
+            vectors (np.ndarray): Embeddings (n, dim)
+            owner (str): Identificador del archivo al que pertenecen
+            payloads (List[Any]): Datos asociados a cada vector (texto del chunk, metadata)
+
+        Returns:
+            np.ndarray: Filas asignadas a los vectores
+        """
+        vectors = self.normalize(vectors)
+        with self._lock:
+            start = self._size
+            self._grow(start + len(vectors))
+            self._vectors[start:start + len(vectors)] = vectors
+            self._alive[start:start + len(vectors)] = True
+            self._owners[start:start + len(vectors)] = [owner] * len(vectors)
+            self._payloads[start:start + len(vectors)] = list(payloads)
+            self._rows_by_owner.setdefault(owner, []).extend(range(start, start + len(vectors)))
+            self._size += len(vectors)
+            rows = np.arange(start, start + len(vectors))
+            if self._ann.is_trained:
+                self._ann.add(rows, vectors)
+            self._maybe_train_ann()
+            return rows
+
+    def _maybe_train_ann(self) -> None:
+        if self.ann_min_vectors is None or len(self) < self.ann_min_vectors:
+            return
+        if self._ann.is_trained and self._size < self._ann.trained_size * self.ann_retrain_growth:
+            return
+        self._ann.train(self._vectors[:self._size])
+
+    @property
+    def ann(self) -> IVFIndex:
+        return self._ann
+
+    def remove_owner(self, owner: str) -> np.ndarray:
+        """Marcar como eliminadas las filas de un archivo y devolverlas; compacta si las eliminadas superan compact_ratio."""
+        with self._lock:
+            rows = np.array(self._rows_by_owner.pop(owner, []), dtype=np.int64)
+            self._alive[rows] = False
+            self._dead += len(rows)
+            if self._dead and self._dead > self.compact_ratio * self._size:
+                self.compact()
+            return rows
+
+    def owner(self, row: int) -> Optional[str]:
+        return self._owners[row]
+
+    def payload(self, row: int) -> Any:
+        return self._payloads[row]
+
+    def owner_mask(self, owners: set) -> np.ndarray:
+        """Mascara booleana con las filas que pertenecen a alguno de los archivos indicados."""
+        with self._lock:
+            mask = np.zeros(self._size, dtype=bool)
+            for owner in owners:
+                mask[self._rows_by_owner.get(owner, [])] = True
+            return mask
+
+    def compact(self) -> Optional[np.ndarray]:
+        """
+        Eliminar fisicamente las filas marcadas
+
+        Returns:
+            Optional[np.ndarray]: Mapa fila_anterior -> fila_nueva (-1 si se elimino), o None si no habia filas marcadas
+        """
+        with self._lock:
+            if self._dead == 0:
+                return None
+            keep = np.flatnonzero(self._alive[:self._size])
+            remap = np.full(self._size, -1, dtype=np.int64)
+            remap[keep] = np.arange(len(keep))
+            self._vectors[:len(keep)] = self._vectors[keep]
+            self._alive[:len(keep)] = True
+            self._alive[len(keep):self._size] = False
+            owners = [self._owners[row] for row in keep]
+            self._owners[:self._size] = owners + [None] * (self._size - len(keep))
+            payloads = [self._payloads[row] for row in keep]
+            self._payloads[:self._size] = payloads + [None] * (self._size - len(keep))
+            self._rows_by_owner = {}
+            for row, owner in enumerate(owners):
+                self._rows_by_owner.setdefault(owner, []).append(row)
+            self._size = len(keep)
+            self._dead = 0
+            if self._ann.is_trained:
+                self._ann.remap(remap)
+            return remap
+
+    def search(
+            self,
+            query: np.ndarray,
+            top_k: int,
+            max_distance: Optional[float] = None,
+            row_mask: Optional[np.ndarray] = None,
+            exact: bool = False,
+            nprobe: Optional[int] = None) -> List[Tuple[Any, float]]:
+        """
+        Busqueda top-k por similitud coseno (aproximada si el indice IVF esta construido)
+
+        Args:
+            query (np.ndarray): Embedding de la consulta (dim,)
+            top_k (int): Cantidad de resultados
+            max_distance (float): Distancia coseno maxima (1 - similitud) aceptada
+            row_mask (np.ndarray): Filas candidatas (bool), por ejemplo para filtrar por archivo; se aplica antes
+                de elegir candidatos, con busqueda exacta sobre las filas filtradas si son pocas o si las listas
+                IVF revisadas no tienen suficientes
+            exact (bool): Forzar la busqueda exacta aunque exista el indice IVF
+            nprobe (int): Listas IVF a revisar (mas listas: mas recall y mas latencia)
+
+        Returns:
+            List[Tuple[Any, float]]: (payload, distancia) ordenados de menor a mayor distancia
+        """
+        query = self.normalize(query.reshape(1, -1))[0]
+        with self._lock:
+            size = self._size
+            if size == 0 or top_k <= 0:
+                return []
+
+            masked_rows = None
+            if row_mask is not None:
+                mask = np.zeros(size, dtype=bool)
+                mask[:min(len(row_mask), size)] = row_mask[:size]
+                masked_rows = np.flatnonzero(mask & self._alive[:size])
+                if len(masked_rows) == 0:
+                    return []
+
+            use_ann = self._ann.is_trained and not exact
+            # Con un filtro selectivo las listas IVF revisadas pueden no tener filas del filtro:
+            # si las filas filtradas son pocas se buscan todas de forma exacta
+            if use_ann and masked_rows is not None and len(masked_rows) <= (self.ann_min_vectors or 0):
+                use_ann = False
+
+            if use_ann:
+                rows = self._ann.candidates(query, nprobe)
+                valid = self._alive[rows]
+                if masked_rows is not None:
+                    valid &= mask[rows]
+                    # Si las listas revisadas no alcanzan para el top_k, buscar sobre todas las filas filtradas
+                    if np.count_nonzero(valid) < min(top_k, len(masked_rows)):
+                        rows = None
+                if rows is not None:
+                    similarities = self._vectors[rows] @ query
+                    similarities[~valid] = -np.inf
+                    hits = self.top_k(similarities, top_k, max_distance, rows)
+                    return [(self._payloads[row], distance) for row, distance in hits]
+
+            if masked_rows is not None:
+                # Busqueda exacta solo sobre las filas del filtro
+                similarities = self._vectors[masked_rows] @ query
+                hits = self.top_k(similarities, top_k, max_distance, masked_rows)
+            else:
+                similarities = self._vectors[:size] @ query
+                similarities[~self._alive[:size]] = -np.inf
+                hits = self.top_k(similarities, top_k, max_distance)
+            return [(self._payloads[row], distance) for row, distance in hits]
+
+    @staticmethod
+    def top_k(
+            similarities: np.ndarray,
+            top_k: int,
+            max_distance: Optional[float] = None,
+            rows: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        """Seleccionar el top-k de un arreglo de similitudes con argpartition."""
+        if len(similarities) == 0:
+            return []
+        k = min(top_k, len(similarities))
+        candidates = np.argpartition(-similarities, k - 1)[:k]
+        candidates = candidates[np.argsort(-similarities[candidates])]
+        results = []
+        for index in candidates:
+            similarity = similarities[index]
+            if similarity == -np.inf:
+                break
+            distance = float(1.0 - similarity)
+            if max_distance is not None and distance > max_distance:
+                break
+            row = int(rows[index]) if rows is not None else int(index)
+            results.append((row, distance))
+        return results
@@ -0,0 +1,96 @@
+"""
+Tipos equivalentes a los de vertexai.rag que usan las tools (configuracion y respuestas).
+"""
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+
+@dataclass
+class ChunkingConfig:
+    chunk_size: Optional[int] = None
+    chunk_overlap: Optional[int] = None
+
+
+@dataclass
+class TransformationConfig:
+    chunking_config: Optional[ChunkingConfig] = None
+
+
+@dataclass
+class Filter:
+    vector_distance_threshold: Optional[float] = None
+    vector_similarity_threshold: Optional[float] = None
+    metadata_filter: Optional[str] = None
+
+
+@dataclass
+class RagRetrievalConfig:
+    top_k: Optional[int] = None
+    filter: Optional[Filter] = None
+
+
+@dataclass
+class RagResource:
+    rag_corpus: Optional[str] = None
+    rag_file_ids: Optional[List[str]] = None
+
+
+@dataclass
+class VertexPredictionEndpoint:
+    publisher_model: Optional[str] = None
+    endpoint: Optional[str] = None
+    model: Optional[str] = None
+
+
+@dataclass
+class RagEmbeddingModelConfig:
+    vertex_prediction_endpoint: Optional[VertexPredictionEndpoint] = None
+
+
+@dataclass
+class RagVectorDbConfig:
+    vector_db: Optional[object] = None
+    rag_embedding_model_config: Optional[RagEmbeddingModelConfig] = None
+
+
+@dataclass
+class RagCorpus:
+    name: str
+    display_name: str
+    description: str = ""
+    create_time: str = ""
+    update_time: str = ""
+
+
+@dataclass
+class RagFile:
+    name: str
+    display_name: str
+    source_uri: str
+    create_time: str = ""
+    update_time: str = ""
+
+
+@dataclass
+class ImportRagFilesResponse:
+    imported_rag_files_count: int = 0
+    failed_rag_files_count: int = 0
+    skipped_rag_files_count: int = 0
+
+
+@dataclass
+class RagContext:
+    source_uri: str
+    source_name: str
+    text: str
+    score: float
+
+
+@dataclass
+class RagContexts:
+    contexts: List[RagContext] = field(default_factory=list)
+
+
+@dataclass
+class RetrieveContextsResponse:
+    contexts: RagContexts = field(default_factory=RagContexts)
@@ -0,0 +1,72 @@
+"""
+Punto unico de acceso a la API rag.* usada por las tools.
+El backend se elige con RAG_BACKEND en config.py y se importa recien en el primer uso.
+"""
+import importlib
+import threading
+from typing import Any, Optional
+
+from . import telemetry
+from .config import (
+    LOCATION,
+    PROJECT_ID,
+    RAG_BACKEND,
+    RAG_CLIENT_MANAGED,
+)
+
+_BACKENDS = {
+    "vertex": "vertexai.rag",
+    "local": "rag_agent.local_rag",
+}
+
+
+class _RagBackendProxy:
+    """Reenvia cada atributo (rag.retrieval_query, rag.Filter, ...) al backend activo."""
+
+    def __init__(self):
+        self._backend: Optional[Any] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Any:
+        if self._backend is None:
+            with self._lock:
+                if self._backend is None:
+                    if RAG_BACKEND not in _BACKENDS:
+                        raise ValueError(f"RAG_BACKEND no soportado: {RAG_BACKEND}")
+                    backend = importlib.import_module(_BACKENDS[RAG_BACKEND])
+                    if RAG_BACKEND == "vertex":
+                        # Inicializar el SDK una sola vez por proceso, con el proyecto y la region de config.py
+                        importlib.import_module("vertexai").init(project=PROJECT_ID, location=LOCATION)
+                        if RAG_CLIENT_MANAGED:
+                            # Un canal por proceso en lugar de un cliente nuevo por llamada
+                            from .vertex_client import install
+
+                            install()
+                    self._backend = backend
+        return self._backend
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._load(), name)
+        # Contar y medir las llamadas al SDK solo si la telemetria esta habilitada
+        if telemetry.is_enabled() and callable(attr) and not isinstance(attr, type):
+            return telemetry.instrument_sdk_call(name, attr)
+        return attr
+
+
+rag = _RagBackendProxy()
+
+
+def get_rag_backend() -> Any:
+    """Modulo u objeto que implementa la API rag.* actualmente en uso."""
+    return rag._load()
+
+
+def set_rag_backend(backend: Any) -> None:
+    """
+    Reemplazar el backend activo (por ejemplo por un stub en benchmarks)
+
+    Args:
+        backend (Any): Objeto con la misma API que vertexai.rag
+    """
+    with rag._lock:
+        rag._backend = backend
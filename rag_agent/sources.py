@@ -0,0 +1,133 @@
+"""
+Lectura de los archivos fuente (GCS o disco local) para los componentes que procesan el contenido localmente.
+"""
+import hashlib
+import os
+from typing import Dict, List, Tuple
+
+from .config import LOCAL_RAG_SOURCE_DIR
+
+
+def split_gcs_uri(uri: str) -> Tuple[str, str]:
+    """Separar 'gs://bucket/ruta' en (bucket, ruta)."""
+    bucket, _, path = uri[len("gs://"):].partition("/")
+    return bucket, path
+
+
+def _local_path(uri: str) -> str:
+    if uri.startswith("file://"):
+        return uri[len("file://"):]
+    if uri.startswith("gs://") and LOCAL_RAG_SOURCE_DIR:
+        bucket, path = split_gcs_uri(uri)
+        return os.path.join(LOCAL_RAG_SOURCE_DIR, bucket, path)
+    return uri
+
+
+def _storage_client():
+    # Importar solo si se necesita leer desde GCS
+    from google.cloud import storage
+
+    return storage.Client()
+
+
+def expand_source(uri: str) -> List[str]:
+    """
+    Expandir un path (archivo, carpeta o prefijo de GCS) en la lista de archivos que contiene
+
+    Args:
+        uri (str): Path local, file:// o gs://
+
+    Returns:
+        List[str]: URIs de los archivos, con el mismo esquema que la entrada
+    """
+    if uri.startswith("gs://") and not LOCAL_RAG_SOURCE_DIR:
+        bucket, prefix = split_gcs_uri(uri)
+        blobs = _storage_client().list_blobs(bucket, prefix=prefix)
+        return [f"gs://{bucket}/{blob.name}" for blob in blobs if not blob.name.endswith("/")]
+
+    local_path = _local_path(uri)
+    if os.path.isfile(local_path):
+        return [uri]
+    if not os.path.isdir(local_path):
+        return []
+
+    files = []
+    for root, _, names in os.walk(local_path):
+        for name in sorted(names):
+            relative = os.path.relpath(os.path.join(root, name), local_path).replace(os.sep, "/")
+            files.append(f"{uri.rstrip('/')}/{relative}")
+    return sorted(files)
+
+
+def read_source(uri: str) -> str:
+    """
+    Leer el contenido de un archivo fuente como texto
+
+    Args:
+        uri (str): Path local, file:// o gs://
+
+    Returns:
+        str: Contenido del archivo
+    """
+    if uri.startswith("gs://") and not LOCAL_RAG_SOURCE_DIR:
+        bucket, path = split_gcs_uri(uri)
+        return _storage_client().bucket(bucket).blob(path).download_as_text()
+
+    with open(_local_path(uri), encoding="utf-8") as f:
+        return f.read()
+
+
+def source_sizes(uri: str) -> Dict[str, int]:
+    """
+    Tamaño en bytes de cada archivo de un path, sin leer el contenido (en GCS sale del listado)
+
+    Args:
+        uri (str): Path local, file:// o gs:// (archivo, carpeta o prefijo)
+
+    Returns:
+        Dict[str, int]: URI de cada archivo -> tamaño en bytes
+    """
+    if uri.startswith("gs://") and not LOCAL_RAG_SOURCE_DIR:
+        bucket, prefix = split_gcs_uri(uri)
+        return {
+            f"gs://{bucket}/{blob.name}": blob.size or 0
+            for blob in _storage_client().list_blobs(bucket, prefix=prefix)
+            if not blob.name.endswith("/")
+        }
+    return {file_uri: os.path.getsize(_local_path(file_uri)) for file_uri in expand_source(uri)}
+
+
+def source_fingerprints(uri: str) -> Dict[str, str]:
+    """
+    Huella de cada archivo de un path, para detectar si cambio desde la ultima importacion
+
+    En GCS se usa el md5 (o crc32c/generation) que ya trae el listado, sin descargar el contenido;
+    en disco local se calcula el sha256 del archivo.
+
+    Args:
+        uri (str): Path local, file:// o gs:// (archivo, carpeta o prefijo)
+
+    Returns:
+        Dict[str, str]: URI de cada archivo -> huella
+    """
+    if uri.startswith("gs://") and not LOCAL_RAG_SOURCE_DIR:
+        bucket, prefix = split_gcs_uri(uri)
+        fingerprints = {}
+        for blob in _storage_client().list_blobs(bucket, prefix=prefix):
+            if blob.name.endswith("/"):
+                continue
+            # Un path de archivo no debe incluir otros archivos que solo comparten el prefijo
+            if prefix and not prefix.endswith("/") and blob.name != prefix and not blob.name.startswith(prefix + "/"):
+                continue
+            fingerprint = blob.md5_hash or blob.crc32c or f"gen:{blob.generation}"
+            fingerprints[f"gs://{bucket}/{blob.name}"] = fingerprint
+        return fingerprints
+
+    fingerprints = {}
+    for file_uri in expand_source(uri):
+        digest = hashlib.sha256()
+        with open(_local_path(file_uri), "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        fingerprints[file_uri] = f"sha256:{digest.hexdigest()}"
+    return fingerprints
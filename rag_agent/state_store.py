@@ -0,0 +1,33 @@
+"""
+Conexiones SQLite para el estado local que debe sobrevivir a reinicios del proceso.
+Cada archivo vive dentro de LOCAL_STATE_DIR (config.py).
+"""
+import os
+import sqlite3
+
+from .config import LOCAL_STATE_DIR
+
+
+def state_path(filename: str) -> str:
+    """Ruta de un archivo de estado, creando la carpeta si no existe."""
+    if filename == ":memory:" or os.path.isabs(filename):
+        return filename
+    os.makedirs(LOCAL_STATE_DIR, exist_ok=True)
+    return os.path.join(LOCAL_STATE_DIR, filename)
+
+
+def connect(filename: str) -> sqlite3.Connection:
+    """
+    Abrir una conexion SQLite compartible entre hilos (el llamador debe serializar su uso)
+
+    Args:
+        filename (str): Nombre del archivo dentro de LOCAL_STATE_DIR, ruta absoluta o ":memory:"
+
+    Returns:
+        sqlite3.Connection: Conexion con filas accesibles por nombre de columna
+    """
+    conn = sqlite3.connect(state_path(filename), check_same_thread=False, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    if filename != ":memory:":
+        conn.execute("PRAGMA journal_mode=WAL")
+    return conn
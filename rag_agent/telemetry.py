@@ -0,0 +1,283 @@
+"""
+Instrumentacion de las tools: spans por fase (resolve, validate, remote, post_process), contadores
+de llamadas rag.* y errores por status. Se exporta en formato de texto Prometheus y como spans
+compatibles con OpenTelemetry. Con la telemetria deshabilitada cada punto instrumentado solo
+revisa un booleano.
+"""
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from .config import (
+    METRICS_HOST,
+    METRICS_PORT,
+    TELEMETRY_ENABLED,
+    TELEMETRY_MAX_SPANS,
+)
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+_NOOP = nullcontext()
+
+_enabled = TELEMETRY_ENABLED
+_lock = threading.Lock()
+_counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+_histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], List[float]] = {}
+_spans: deque = deque(maxlen=TELEMETRY_MAX_SPANS)
+_current_tool: contextvars.ContextVar = contextvars.ContextVar("rag_current_tool", default="")
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def set_enabled(enabled: bool) -> None:
+    global _enabled
+    _enabled = enabled
+
+
+def reset() -> None:
+    """Borrar todas las metricas y spans registrados."""
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+        _spans.clear()
+
+
+def _labels(**labels: str) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted(labels.items()))
+
+
+def increment(name: str, value: float = 1.0, **labels: str) -> None:
+    """Incrementar un contador (no hace nada si la telemetria esta deshabilitada)."""
+    if not _enabled:
+        return
+    key = (name, _labels(**labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0.0) + value
+
+
+def observe(name: str, seconds: float, **labels: str) -> None:
+    """Registrar una duracion en un histograma."""
+    if not _enabled:
+        return
+    key = (name, _labels(**labels))
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            # Un contador por bucket, luego la suma y la cantidad
+            histogram = _histograms[key] = [0.0] * (len(_BUCKETS) + 2)
+        for index, bound in enumerate(_BUCKETS):
+            if seconds <= bound:
+                histogram[index] += 1
+        histogram[-2] += seconds
+        histogram[-1] += 1
+
+
+class _Span:
+    def __init__(self, tool: str, phase: str, attributes: Dict[str, Any]):
+        self.tool = tool
+        self.phase = phase
+        self.attributes = attributes
+
+    def __enter__(self) -> "_Span":
+        self._start_ns = time.time_ns()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        duration = time.perf_counter() - self._start
+        observe("rag_tool_phase_seconds", duration, tool=self.tool, phase=self.phase)
+        with _lock:
+            _spans.append({
+                "name": f"{self.tool}.{self.phase}",
+                "start_time_unix_nano": self._start_ns,
+                "end_time_unix_nano": self._start_ns + int(duration * 1e9),
+                "status": {"code": "ERROR" if exc_type else "OK"},
+                "attributes": {"rag.tool": self.tool, "rag.phase": self.phase, **self.attributes},
+            })
+        return False
+
+
+def span(phase: str, **attributes: Any):
+    """
+    Medir una fase de la tool actual
+
+    Args:
+        phase (str): resolve, validate, remote o post_process
+        **attributes: Atributos adicionales del span
+
+    Returns:
+        Context manager que registra la duracion de la fase
+    """
+    if not _enabled:
+        return _NOOP
+    return _Span(_current_tool.get() or "unknown", phase, attributes)
+
+
+def _result_status(result: Any) -> str:
+    if isinstance(result, dict):
+        return str(result.get("status", "unknown"))
+    return "unknown"
+
+
+def instrument_tool(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Decorador para las tools: mide la duracion total y cuenta las llamadas por status
+    (el status del dict de respuesta, o 'exception' si la tool lanza una excepcion)
+    """
+    tool = func.__name__
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _enabled:
+                return await func(*args, **kwargs)
+            token = _current_tool.set(tool)
+            status = "exception"
+            try:
+                with _Span(tool, "total", {}):
+                    result = await func(*args, **kwargs)
+                status = _result_status(result)
+                return result
+            finally:
+                increment("rag_tool_calls_total", tool=tool, status=status)
+                _current_tool.reset(token)
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not _enabled:
+            return func(*args, **kwargs)
+        token = _current_tool.set(tool)
+        status = "exception"
+        try:
+            with _Span(tool, "total", {}):
+                result = func(*args, **kwargs)
+            status = _result_status(result)
+            return result
+        finally:
+            increment("rag_tool_calls_total", tool=tool, status=status)
+            _current_tool.reset(token)
+
+    return wrapper
+
+
+def instrument_sdk_call(method: str, func: Callable[..., Any]) -> Callable[..., Any]:
+    """Envolver una funcion rag.* para contar llamadas y errores y medir su latencia."""
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            status = type(e).__name__
+            raise
+        finally:
+            observe("rag_sdk_call_seconds", time.perf_counter() - started, method=method)
+            increment("rag_sdk_calls_total", method=method, status=status, tool=_current_tool.get() or "none")
+
+    return wrapper
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...], extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in items) + "}"
+
+
+def render_prometheus() -> str:
+    """Metricas actuales en formato de texto de Prometheus."""
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: list(value) for key, value in _histograms.items()}
+
+    lines = []
+    for name in sorted({key[0] for key in counters}):
+        lines.append(f"# TYPE {name} counter")
+        for (metric, labels), value in sorted(counters.items()):
+            if metric == name:
+                lines.append(f"{name}{_format_labels(labels)} {value:g}")
+
+    for name in sorted({key[0] for key in histograms}):
+        lines.append(f"# TYPE {name} histogram")
+        for (metric, labels), values in sorted(histograms.items()):
+            if metric != name:
+                continue
+            for bound, count in zip(_BUCKETS, values):
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f"{name}_bucket{_format_labels(labels, ('le', le))} {count:g}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {values[-2]:.6f}")
+            lines.append(f"{name}_count{_format_labels(labels)} {values[-1]:g}")
+    return "\n".join(lines) + "\n"
+
+
+def export_spans(clear: bool = False) -> List[dict]:
+    """Spans recientes con los campos de OpenTelemetry (name, tiempos en nanosegundos, status, attributes)."""
+    with _lock:
+        spans = list(_spans)
+        if clear:
+            _spans.clear()
+    return spans
+
+
+def _metrics_handler() -> type:
+    # Importar http.server solo si se expone /metrics
+    from http.server import BaseHTTPRequestHandler
+
+    class _MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return _MetricsHandler
+
+
+_server: Optional["ThreadingHTTPServer"] = None
+
+
+def start_metrics_server(port: int = METRICS_PORT, host: str = METRICS_HOST) -> Optional["ThreadingHTTPServer"]:
+    """
+    Exponer /metrics en un hilo de fondo (una sola vez por proceso)
+
+    Args:
+        port (int): Puerto HTTP; con 0 no se inicia el servidor
+        host (str): Direccion de escucha; por defecto solo loopback
+
+    Returns:
+        ThreadingHTTPServer o None si no se inicio
+    """
+    global _server
+    if not port:
+        return None
+    with _lock:
+        if _server is None:
+            from http.server import ThreadingHTTPServer
+
+            _server = ThreadingHTTPServer((host, port), _metrics_handler())
+            threading.Thread(target=_server.serve_forever, name="rag-metrics", daemon=True).start()
+    return _server
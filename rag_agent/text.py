@@ -0,0 +1,29 @@
+"""
+Utilidades de texto compartidas: tokenizacion para comparar y puntuar textos, y estimacion de tokens del prompt.
+"""
+import math
+import re
+import unicodedata
+from typing import List
+
+from .config import CHARS_PER_TOKEN
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def fold_text(text: str) -> str:
+    """Pasar a minusculas y quitar tildes ("Matemática" -> "matematica")."""
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text: str) -> List[str]:
+    """Palabras del texto normalizadas con fold_text."""
+    return _TOKEN_RE.findall(fold_text(text))
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimacion de los tokens que ocupa un texto en el prompt del modelo."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
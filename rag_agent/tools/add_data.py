@@ -1,51 +1,23 @@
 import re
-from typing import List
+from typing import List, Tuple
 
 from google.adk.tools.tool_context import ToolContext
-from vertexai import rag
+from ..telemetry import instrument_tool, span
+from .ingestion import import_paths_incremental
+from .ingestion_jobs import ingestion_jobs
+from .query_cache import query_cache
 from .utils import check_corpus_exists, get_corpus_resource_name
 
-from ..config import (
-    DEFAULT_CHUNK_OVERLAP,
-    DEFAULT_CHUNK_SIZE,
-    DEFAULT_EMBEDDING_REQUESTS_PER_MIN,
-)
+from ..config import INGESTION_BACKGROUND_ENABLED
 
-def add_data(
-        corpus_name: str,
-        paths: List[str],
-        tool_context: ToolContext,
-) -> dict:
+
+def validate_data_paths(paths: List[str]) -> Tuple[List[str], List[str], List[str]]:
     """
-    Agregar nueva fuente de datos a un corpus especifico
-    :param corpus_name: Nombre dle corpus al que se agregara la data
-    :param paths: Lsita de URLs del cloud storage para agregar al corpus
-        Formato aceptado:
-            - Google Drive: "https://drive.google.com/file/d/{file_id}/view"
-            - Google docs/sheets/slides: "https://docs.google.com/{type}/d/{file_id}/..."
-            - Google Cloud Storage: "gs://{bucket_name}/{path_to_file}"
-    :param tool_context: Contexto de la herramienta
+    Validar los paths y convertir Google Docs URLs a un formato de Drive si es necesario
+    :param paths: Lista de URLs a validar
     :return:
-        dict: Informacion sobre el data agregada y su status
+        Tuple: (paths validos, paths invalidos con su motivo, conversiones realizadas)
     """
-    # Verificar si el orpus existe
-    if not check_corpus_exists(corpus_name, tool_context):
-        return {
-            "status": "error",
-            "message": f"Corpus '{corpus_name}' no existe",
-            "corpus_name": corpus_name,
-            "paths": paths,
-        }
-    # Validar los inputs
-    if not paths or not all(isinstance(path, str) for path in paths):
-        return {
-            "status": "error",
-            "message": "Path invalido, por favor ingresar un formato correcto (Drive, GCS, Google docs/sheets/slides)",
-            "corpus_name": corpus_name,
-            "paths": paths,
-        }
-
-    # Preprocesar los paths para validar y convertir Google Docs URLs a un formato de Drive si es necesario
     validate_paths = []
     invalid_paths = []
     conversions = []
@@ -86,6 +58,52 @@ def add_data(
         # Informacion dentro de esta variable no es un formato valido
         invalid_paths.append(f"{path} (no es un path valido)")
 
+    return validate_paths, invalid_paths, conversions
+
+
+@instrument_tool
+def add_data(
+        corpus_name: str,
+        paths: List[str],
+        tool_context: ToolContext,
+) -> dict:
+    """
+    Agregar nueva fuente de datos a un corpus especifico
+    :param corpus_name: Nombre dle corpus al que se agregara la data
+    :param paths: Lsita de URLs del cloud storage para agregar al corpus
+        Formato aceptado:
+            - Google Drive: "https://drive.google.com/file/d/{file_id}/view"
+            - Google docs/sheets/slides: "https://docs.google.com/{type}/d/{file_id}/..."
+            - Google Cloud Storage: "gs://{bucket_name}/{path_to_file}"
+    :param tool_context: Contexto de la herramienta
+    :return:
+        dict: Informacion sobre el data agregada y su status. Si la importacion corre en segundo
+            plano, incluye el 'job_id' para consultar su avance con 'get_ingestion_status'.
+            Los contadores exactos son por lote ('batch_results'); en 'path_results' el status de
+            cada path es el de su lote, y 'unknown' si el lote tuvo resultados mezclados
+    """
+    # Verificar si el orpus existe
+    with span("resolve"):
+        corpus_exists = check_corpus_exists(corpus_name, tool_context)
+    if not corpus_exists:
+        return {
+            "status": "error",
+            "message": f"Corpus '{corpus_name}' no existe",
+            "corpus_name": corpus_name,
+            "paths": paths,
+        }
+    # Validar los inputs
+    if not paths or not all(isinstance(path, str) for path in paths):
+        return {
+            "status": "error",
+            "message": "Path invalido, por favor ingresar un formato correcto (Drive, GCS, Google docs/sheets/slides)",
+            "corpus_name": corpus_name,
+            "paths": paths,
+        }
+
+    # Preprocesar los paths para validar y convertir Google Docs URLs a un formato de Drive si es necesario
+    with span("validate"):
+        validate_paths, invalid_paths, conversions = validate_data_paths(paths)
 
     # Verificar si tenemos algun path valido despues de la validacion
     if not validate_paths:
@@ -98,39 +116,67 @@ def add_data(
 
     try:
         # Obtener el nombre corpus
-        corpus_resource_name = get_corpus_resource_name(corpus_name)
-
-        # Configurar el chunking
-        transformation_config = rag.TransformationConfig(
-            chunking_config=rag.ChunkingConfig(
-            chunk_size=DEFAULT_CHUNK_SIZE,
-            chunk_overlap=DEFAULT_CHUNK_OVERLAP,
-            )
-        )
-
-        # Importar archivos al corpus
-        import_result = rag.import_files(
-            corpus_resource_name,
-            validate_paths,
-            transformation_config =transformation_config,
-            max_embedding_requests_per_min=DEFAULT_EMBEDDING_REQUESTS_PER_MIN
-        )
+        corpus_resource_name = get_corpus_resource_name(corpus_name, tool_context)
 
         # Preparar el corpus como acutal si es que no lo esta
         if not tool_context.state.get("current_corpus"):
             tool_context.state["current_corpus"] = corpus_name
 
+        if INGESTION_BACKGROUND_ENABLED:
+            # Encolar la importacion y responder de inmediato con el id del job
+            try:
+                job = ingestion_jobs.submit(corpus_name, corpus_resource_name, validate_paths)
+            except RuntimeError as e:
+                return {
+                    "status": "error",
+                    "message": str(e),
+                    "corpus_name": corpus_name,
+                    "paths": validate_paths
+                }
+            tool_context.state["last_ingestion_job"] = job["job_id"]
+            return {
+                "status": "success",
+                "message": f"Importacion de {len(validate_paths)} archivos iniciada en segundo plano en corpus {corpus_name}",
+                "corpus_name": corpus_name,
+                "job_id": job["job_id"],
+                "job_state": job["state"],
+                "paths": validate_paths,
+                "invalid_paths": invalid_paths,
+                "conversions": conversions
+            }
+
+        # Importar los archivos nuevos o modificados en lotes paralelos, respetando la cuota de embeddings
+        ingestion = import_paths_incremental(corpus_resource_name, validate_paths)
+
+        # Los resultados cacheados de este corpus ya no son validos
+        query_cache.invalidate_corpus(corpus_resource_name)
 
         # Todo salio bien mensaje
         conversaion_msg = ""
         if conversions:
             convertion_msg = "(Convertido Google Docs URLs a formato Drive)"
 
+        if ingestion["failed"] and not ingestion["imported"] and not ingestion["skipped"]:
+            status = "error"
+        elif ingestion["failed"]:
+            status = "partial"
+        else:
+            status = "success"
+
         return {
-            "status": "success",
-            "message": f"Agregado satisfactorio { import_result.imported_rag_files_count}:  archivos{conversaion_msg} en corpus {corpus_name}",
+            "status": status,
+            "message": f"Agregado satisfactorio { ingestion['imported']}:  archivos{conversaion_msg} en corpus {corpus_name}",
             "corpus_name": corpus_name,
-            "files_added": import_result.imported_rag_files_count,
+            "files_added": ingestion["imported"],
+            "files_failed": ingestion["failed"],
+            "files_skipped": ingestion["skipped"],
+            "files_unchanged": ingestion["unchanged"],
+            "files_replaced": ingestion["replaced"],
+            "batch_results": [
+                {key: batch[key] for key in ("batch", "status", "imported", "failed", "skipped", "attempts", "error")}
+                for batch in ingestion["batches"]
+            ],
+            "path_results": ingestion["path_results"],
             "paths": validate_paths,
             "invalid_paths": invalid_paths,
             "conversions": conversions
@@ -0,0 +1,33 @@
+"""
+Versiones async de las tools para el runner de ADK.
+Cada tool conserva su nombre, parametros y docstring, pero ejecuta las llamadas bloqueantes del SDK
+en el pool de hilos compartido, de modo que las sesiones concurrentes no bloquean el event loop.
+"""
+from . import (
+    add_data as _add_data,
+    create_corpus as _create_corpus,
+    delete_corpus as _delete_corpus,
+    delete_document as _delete_document,
+    delete_documents as _delete_documents,
+    find_documents as _find_documents,
+    get_corpus_info as _get_corpus_info,
+    get_ingestion_status as _get_ingestion_status,
+    list_corpora as _list_corpora,
+    rag_query as _rag_query,
+    rag_query_batch as _rag_query_batch,
+    rag_query_multi_corpus as _rag_query_multi_corpus,
+)
+from .concurrency import make_async_tool
+
+rag_query = make_async_tool(_rag_query.rag_query)
+rag_query_batch = make_async_tool(_rag_query_batch.rag_query_batch)
+rag_query_multi_corpus = make_async_tool(_rag_query_multi_corpus.rag_query_multi_corpus)
+list_corpora = make_async_tool(_list_corpora.list_corpora)
+create_corpus = make_async_tool(_create_corpus.create_corpus)
+add_data = make_async_tool(_add_data.add_data)
+get_corpus_info = make_async_tool(_get_corpus_info.get_corpus_info)
+delete_corpus = make_async_tool(_delete_corpus.delete_corpus)
+delete_document = make_async_tool(_delete_document.delete_document)
+delete_documents = make_async_tool(_delete_documents.delete_documents)
+get_ingestion_status = make_async_tool(_get_ingestion_status.get_ingestion_status)
+find_documents = make_async_tool(_find_documents.find_documents)
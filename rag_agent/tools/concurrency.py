@@ -0,0 +1,185 @@
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+from ..config import FANOUT_EXECUTOR_MAX_WORKERS, TOOL_EXECUTOR_MAX_WORKERS
+
+_tool_executor: Optional[ThreadPoolExecutor] = None
+_tool_executor_lock = threading.Lock()
+
+_fanout_executor: Optional[ThreadPoolExecutor] = None
+_fanout_slots = threading.BoundedSemaphore(FANOUT_EXECUTOR_MAX_WORKERS)
+_fanout_local = threading.local()
+
+
+def get_tool_executor() -> ThreadPoolExecutor:
+    """Pool de hilos del proceso para las llamadas bloqueantes del SDK (se crea en el primer uso)."""
+    global _tool_executor
+    if _tool_executor is None:
+        with _tool_executor_lock:
+            if _tool_executor is None:
+                _tool_executor = ThreadPoolExecutor(
+                    max_workers=TOOL_EXECUTOR_MAX_WORKERS,
+                    thread_name_prefix="rag-tool",
+                )
+    return _tool_executor
+
+
+async def run_in_tool_executor(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Ejecutar una funcion bloqueante en el pool compartido sin bloquear el event loop
+
+    Args:
+        func (Callable): Funcion bloqueante
+        *args, **kwargs: Argumentos para la funcion
+
+    Returns:
+        Any: Resultado de la funcion
+    """
+    loop = asyncio.get_running_loop()
+    # Copiar el contexto para que logging/tracing conserven la informacion de la sesion
+    call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+    return await loop.run_in_executor(get_tool_executor(), call)
+
+
+def make_async_tool(func: Callable[..., dict]) -> Callable[..., Any]:
+    """
+    Crear la version async de una tool, con el mismo nombre, firma y docstring
+    (ADK usa esos datos para declarar la tool al modelo)
+
+    Args:
+        func (Callable): Tool sincrona
+
+    Returns:
+        Callable: Corrutina que ejecuta la tool en el pool compartido
+    """
+    @functools.wraps(func)
+    async def async_tool(*args: Any, **kwargs: Any) -> dict:
+        return await run_in_tool_executor(func, *args, **kwargs)
+
+    return async_tool
+
+
+def _mark_fanout_worker() -> None:
+    _fanout_local.is_worker = True
+
+
+def get_fanout_executor() -> ThreadPoolExecutor:
+    """Pool de hilos del proceso para run_concurrently (se crea en el primer uso y no se cierra)."""
+    global _fanout_executor
+    if _fanout_executor is None:
+        with _tool_executor_lock:
+            if _fanout_executor is None:
+                _fanout_executor = ThreadPoolExecutor(
+                    max_workers=FANOUT_EXECUTOR_MAX_WORKERS,
+                    thread_name_prefix="rag-fanout",
+                    initializer=_mark_fanout_worker,
+                )
+    return _fanout_executor
+
+
+def run_concurrently(
+        func: Callable[[Any], Any],
+        items: Iterable[Any],
+        max_workers: int,
+        timeout: Optional[float] = None) -> List[Tuple[bool, Any]]:
+    """
+    Ejecutar func sobre cada item en el pool compartido, con un plazo por item
+
+    Cada item ocupa un lugar del pool mientras corre (incluso despues de vencer su plazo),
+    asi las llamadas abandonadas no se acumulan. Si una llamada anidada (por ejemplo la
+    busqueda hibrida dentro de un multi-corpus) no encuentra lugar libre, el item corre en
+    el hilo que llama en lugar de esperar: esperar podria bloquear el pool completo.
+    Esos items no pueden cortarse por plazo.
+
+    Args:
+        func (Callable): Funcion a ejecutar para cada item
+        items (Iterable): Items a procesar
+        max_workers (int): Cantidad maxima de llamadas simultaneas de esta invocacion
+        timeout (float): Plazo en segundos para cada item, contado desde que empieza a ejecutarse
+
+    Returns:
+        List[Tuple[bool, Any]]: Por cada item, en el orden de entrada, (True, resultado) o (False, excepcion)
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    outcomes: List[Optional[Tuple[bool, Any]]] = [None] * len(items)
+    started_at: dict = {}
+    nested = getattr(_fanout_local, "is_worker", False)
+    limit = max(1, max_workers)
+    executor = get_fanout_executor()
+
+    def _run(index: int, item: Any) -> Any:
+        try:
+            started_at[index] = time.monotonic()
+            return func(item)
+        finally:
+            _fanout_slots.release()
+
+    def _run_inline(index: int) -> None:
+        try:
+            outcomes[index] = (True, contextvars.copy_context().run(func, items[index]))
+        except Exception as e:
+            outcomes[index] = (False, e)
+
+    futures: dict = {}
+    pending: set = set()
+    next_index = 0
+    while next_index < len(items) or pending:
+        # Lanzar items mientras haya lugar en el pool y en el limite de esta invocacion
+        while next_index < len(items) and len(pending) < limit:
+            if not _fanout_slots.acquire(blocking=False):
+                if nested:
+                    _run_inline(next_index)
+                    next_index += 1
+                    continue
+                if pending:
+                    break
+                _fanout_slots.acquire()
+            # Cada item corre con una copia del contexto actual (tool en curso, tracing)
+            future = executor.submit(contextvars.copy_context().run, _run, next_index, items[next_index])
+            futures[future] = next_index
+            pending.add(future)
+            next_index += 1
+        if not pending:
+            continue
+
+        wait_for = None
+        if timeout is not None:
+            now = time.monotonic()
+            deadlines = [
+                started_at[futures[f]] + timeout
+                for f in pending if futures[f] in started_at
+            ]
+            wait_for = max(0.0, min(deadlines) - now) if deadlines else None
+            if len(deadlines) < len(pending):
+                # Hay items por arrancar: revisar seguido para empezar a contar su plazo al iniciar
+                wait_for = 0.05 if wait_for is None else min(wait_for, 0.05)
+        if next_index < len(items):
+            # Quedan items sin lanzar: reintentar cuando se libere un lugar en el pool
+            wait_for = 0.05 if wait_for is None else min(wait_for, 0.05)
+
+        done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+        for future in done:
+            index = futures[future]
+            try:
+                outcomes[index] = (True, future.result())
+            except Exception as e:
+                outcomes[index] = (False, e)
+
+        if timeout is not None:
+            # No esperar por las llamadas que excedieron el plazo (siguen ocupando su lugar hasta terminar)
+            now = time.monotonic()
+            for future in list(pending):
+                index = futures[future]
+                if index in started_at and now - started_at[index] >= timeout:
+                    outcomes[index] = (False, TimeoutError(f"Plazo de {timeout}s excedido"))
+                    pending.discard(future)
+
+    return outcomes
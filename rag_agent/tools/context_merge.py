@@ -0,0 +1,233 @@
+from typing import List, Optional
+
+from ..text import estimate_tokens, tokenize
+
+from ..config import (
+    CHARS_PER_TOKEN,
+    RRF_K,
+    CONTEXT_MERGE_ENABLED,
+    CONTEXT_MERGE_MIN_OVERLAP_CHARS,
+    CONTEXT_NEAR_DUPLICATE_THRESHOLD,
+    CONTEXT_TOKEN_BUDGET,
+    RETRIEVAL_SCORE_IS_DISTANCE,
+)
+
+
+def _best_score(a: Optional[float], b: Optional[float]) -> Optional[float]:
+    """Mejor puntaje vectorial de dos contextos; None (contexto encontrado solo por BM25) cede ante cualquiera."""
+    if a is None or b is None:
+        return b if a is None else a
+    return min(a, b) if RETRIEVAL_SCORE_IS_DISTANCE else max(a, b)
+
+
+def _overlap(a: str, b: str, min_overlap: int) -> int:
+    """Largo del texto compartido entre el final de a y el comienzo de b (0 si es menor a min_overlap)."""
+    if len(a) < min_overlap or len(b) < min_overlap:
+        return 0
+    probe = b[:min_overlap]
+    index = a.find(probe, max(0, len(a) - len(b)))
+    while index != -1:
+        if b.startswith(a[index:]):
+            return len(a) - index
+        index = a.find(probe, index + 1)
+    return 0
+
+
+def _join_texts(a: str, b: str, min_overlap: int) -> Optional[str]:
+    """Texto combinado de dos chunks del mismo archivo si uno contiene o se solapa con el otro."""
+    if b in a:
+        return a
+    if a in b:
+        return b
+    overlap = _overlap(a, b, min_overlap)
+    if overlap:
+        return a + b[overlap:]
+    overlap = _overlap(b, a, min_overlap)
+    if overlap:
+        return b + a[overlap:]
+    return None
+
+
+def merge_overlapping(results: List[dict], min_overlap: int = CONTEXT_MERGE_MIN_OVERLAP_CHARS) -> List[dict]:
+    """
+    Unir los chunks contiguos o solapados de un mismo source_uri en un unico contexto
+
+    Args:
+        results (List[dict]): Contextos en orden de relevancia
+        min_overlap (int): Caracteres compartidos minimos para considerar que dos chunks se solapan
+
+    Returns:
+        List[dict]: Contextos combinados en la posicion del mejor de sus chunks, con el mejor puntaje
+            y 'merged_chunks' con la cantidad de chunks que agrupan
+    """
+    merged: List[dict] = []
+    for result in results:
+        current = {**result, "merged_chunks": result.get("merged_chunks", 1)}
+        position = len(merged)
+        index = 0
+        while index < len(merged):
+            kept = merged[index]
+            text = None
+            if current.get("source_uri") and kept.get("source_uri") == current.get("source_uri"):
+                text = _join_texts(kept.get("text", ""), current.get("text", ""), min_overlap)
+            if text is None:
+                index += 1
+                continue
+            current = {
+                **kept,
+                "text": text,
+                "score": _best_score(kept.get("score"), current.get("score")),
+                "merged_chunks": kept["merged_chunks"] + current["merged_chunks"],
+            }
+            # Conservar la posicion del chunk mejor ubicado y volver a revisar contra el resto,
+            # ya que el texto combinado puede solaparse con otro contexto
+            del merged[index]
+            position = min(position, index)
+            index = 0
+        merged.insert(position, current)
+    return merged
+
+
+def drop_near_duplicates(results: List[dict], threshold: float = CONTEXT_NEAR_DUPLICATE_THRESHOLD) -> List[dict]:
+    """
+    Quitar contextos casi identicos a uno mejor ubicado (Jaccard de palabras >= threshold)
+
+    Args:
+        results (List[dict]): Contextos en orden de relevancia
+        threshold (float): Similitud desde la cual un contexto se considera duplicado
+
+    Returns:
+        List[dict]: Contextos sin duplicados; el que queda conserva el mejor puntaje
+    """
+    kept: List[dict] = []
+    kept_tokens: List[set] = []
+    for result in results:
+        tokens = set(tokenize(result.get("text", "")))
+        duplicate = None
+        for index, other in enumerate(kept_tokens):
+            union = len(tokens | other)
+            if union and len(tokens & other) / union >= threshold:
+                duplicate = index
+                break
+        if duplicate is None:
+            kept.append(dict(result))
+            kept_tokens.append(tokens)
+            continue
+        kept[duplicate]["score"] = _best_score(kept[duplicate].get("score"), result.get("score"))
+    return kept
+
+
+def apply_token_budget(results: List[dict], token_budget: int = CONTEXT_TOKEN_BUDGET) -> List[dict]:
+    """
+    Recortar la lista de contextos para que su texto no supere el presupuesto de tokens
+
+    Args:
+        results (List[dict]): Contextos en orden de relevancia
+        token_budget (int): Tokens maximos; 0 sin limite
+
+    Returns:
+        List[dict]: Los primeros contextos que entran en el presupuesto (el primero se trunca si no entra solo)
+    """
+    if token_budget <= 0:
+        return results
+
+    kept = []
+    used = 0
+    for result in results:
+        tokens = estimate_tokens(result.get("text", ""))
+        if used + tokens > token_budget:
+            if not kept:
+                kept.append({**result, "text": result.get("text", "")[:token_budget * CHARS_PER_TOKEN], "truncated": True})
+            break
+        kept.append(result)
+        used += tokens
+    return kept
+
+
+def compact_contexts(results: List[dict], token_budget: int = CONTEXT_TOKEN_BUDGET) -> List[dict]:
+    """
+    Post-procesar los contextos recuperados: unir solapados, quitar casi duplicados y aplicar el presupuesto
+
+    Args:
+        results (List[dict]): Contextos en orden de relevancia
+        token_budget (int): Tokens maximos; 0 sin limite
+
+    Returns:
+        List[dict]: Contextos compactados, en orden de relevancia
+    """
+    if CONTEXT_MERGE_ENABLED:
+        results = drop_near_duplicates(merge_overlapping(results))
+    return apply_token_budget(results, token_budget)
+
+
+def context_tokens(results: List[dict]) -> int:
+    """Tokens estimados del texto de los contextos."""
+    return sum(estimate_tokens(result.get("text", "")) for result in results)
+
+
+def _same_passage(a: str, b: str, min_overlap: int, threshold: float) -> Optional[str]:
+    """
+    Texto combinado si dos chunks del mismo archivo cubren el mismo pasaje aunque sus limites
+    no coincidan (contencion o solapamiento); si solo coinciden sus palabras (chunkers que
+    formatean distinto, como el plano de Vertex y el de registros JSON) se conserva a
+    """
+    joined = _join_texts(a, b, min_overlap)
+    if joined is not None:
+        return joined
+    a_tokens, b_tokens = set(tokenize(a)), set(tokenize(b))
+    smaller = min(len(a_tokens), len(b_tokens))
+    if smaller and len(a_tokens & b_tokens) / smaller >= threshold:
+        return a
+    return None
+
+
+def reciprocal_rank_fusion(
+        rankings: List[List[dict]],
+        top_k: int,
+        min_overlap: int = CONTEXT_MERGE_MIN_OVERLAP_CHARS,
+        threshold: float = CONTEXT_NEAR_DUPLICATE_THRESHOLD) -> List[dict]:
+    """
+    Combinar varias listas ordenadas de contextos por reciprocal rank fusion
+
+    Un contexto de una lista se funde con el de otra lista si son del mismo source_uri y uno
+    contiene o se solapa con el otro (los chunks de cada busqueda pueden tener limites distintos),
+    o si casi todas las palabras del mas corto estan en el otro
+
+    Args:
+        rankings (List[List[dict]]): Listas de contextos, cada una en su orden de relevancia
+        top_k (int): Cantidad de resultados a devolver
+        min_overlap (int): Caracteres compartidos minimos para considerar que dos chunks se solapan
+        threshold (float): Fraccion de palabras del chunk mas corto presentes en el otro para fundirlos
+
+    Returns:
+        List[dict]: Contextos fusionados ordenados por puntaje RRF, que queda en 'fused_score'; cada uno
+            conserva los campos de la primera lista en la que aparece, el texto combinado y el mejor
+            'score' vectorial de todas (None si ninguna lo trae)
+    """
+    # [contexto, puntaje RRF, listas que ya aportaron, texto normalizado]
+    fused: List[list] = []
+    for ranking_index, ranking in enumerate(rankings):
+        for rank, result in enumerate(ranking):
+            text = " ".join(result.get("text", "").split())
+            entry, joined = None, None
+            for candidate in fused:
+                if ranking_index in candidate[2] or not result.get("source_uri") \
+                        or candidate[0].get("source_uri") != result.get("source_uri"):
+                    continue
+                joined = _same_passage(candidate[3], text, min_overlap, threshold)
+                if joined is not None:
+                    entry = candidate
+                    break
+            if entry is None:
+                fused.append([dict(result), 1.0 / (RRF_K + rank + 1), {ranking_index}, text])
+                continue
+            # Completar con los campos que solo trae la otra lista
+            score = _best_score(entry[0].get("score"), result.get("score"))
+            entry[0] = {**result, **entry[0], "score": score}
+            if joined != entry[3]:
+                entry[0]["text"] = joined
+                entry[3] = joined
+            entry[1] += 1.0 / (RRF_K + rank + 1)
+            entry[2].add(ranking_index)
+    ordered = sorted(fused, key=lambda item: item[1], reverse=True)
+    return [{**result, "fused_score": round(fused_score, 6)} for result, fused_score, _, _ in ordered[:top_k]]
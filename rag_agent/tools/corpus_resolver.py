@@ -0,0 +1,182 @@
+import logging
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+from ..rag_backend import rag
+from .metadata_index import metadata_index
+from .resilience import is_unavailable, resilient_calls
+
+from ..config import (
+    CORPUS_CACHE_TTL_SECONDS,
+    CORPUS_NEGATIVE_CACHE_TTL_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class CorpusResolver:
+    """
+    Indice compartido por todo el proceso que traduce nombres de corpus a su nombre de recurso.
+    Evita listar todos los corpora en cada llamada de las tools: el listado se hace una sola vez
+    por TTL, los nombres inexistentes se cachean por un tiempo mas corto (cache negativo) y las
+    tools que crean o eliminan corpora invalidan las entradas explicitamente. Si Vertex no responde al
+    refrescar, se sigue usando el ultimo listado (aunque haya vencido) hasta que vuelva a responder.
+    """
+
+    def __init__(self, ttl_seconds: float, negative_ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._by_display_name: Dict[str, str] = {}
+        self._resource_names: set = set()
+        self._loaded_at: float = 0.0
+        self._misses: Dict[str, float] = {}
+        self._stats = {
+            "list_calls": 0,
+            "hits": 0,
+            "negative_hits": 0,
+            "misses": 0,
+            "invalidations": 0,
+            "stale_lookups": 0,
+        }
+
+    def _find(self, corpus_name: str) -> Optional[str]:
+        if corpus_name in self._resource_names:
+            return corpus_name
+        return self._by_display_name.get(corpus_name)
+
+    def _refresh(self) -> None:
+        """Listar todos los corpora y reconstruir el indice (una sola llamada a la vez)."""
+        loaded_before = self._loaded_at
+        with self._refresh_lock:
+            # Otro hilo pudo haber refrescado el indice mientras esperabamos
+            if self._loaded_at != loaded_before:
+                return
+
+            try:
+                corpora = resilient_calls.call("list_corpora", lambda: list(rag.list_corpora()))
+            except Exception as e:
+                if not is_unavailable(e):
+                    raise
+                # El indice queda vencido, asi que el siguiente lookup vuelve a intentar (con el circuito
+                # abierto falla de inmediato); mientras tanto se usa el ultimo listado, o la copia local
+                # de metadatos si el proceso todavia no habia listado los corpora
+                with self._lock:
+                    if not self._resource_names:
+                        self._index(metadata_index.corpora())
+                    if not self._resource_names:
+                        raise
+                    self._stats["stale_lookups"] += 1
+                logger.warning(f"Using stale corpus index, list_corpora failed: {str(e)}")
+                return
+            with self._lock:
+                self._stats["list_calls"] += 1
+            self.prime(corpora)
+
+    def _index(self, corpora: Iterable) -> None:
+        """Reemplazar el indice por un listado de corpora (el llamador debe tener el lock)."""
+        by_display_name = {}
+        resource_names = set()
+        for corpus in corpora:
+            resource_names.add(corpus.name)
+            if getattr(corpus, "display_name", None):
+                by_display_name[corpus.display_name] = corpus.name
+        self._by_display_name = by_display_name
+        self._resource_names = resource_names
+        self._misses.clear()
+
+    def prime(self, corpora: Iterable) -> None:
+        """Reconstruir el indice con un listado completo de rag.list_corpora ya obtenido (por ejemplo al arrancar)."""
+        corpora = list(corpora)
+        with self._lock:
+            self._index(corpora)
+            self._loaded_at = time.monotonic()
+
+    def lookup(self, corpus_name: str) -> Optional[str]:
+        """
+        Buscar el nombre de recurso de un corpus por su display_name o nombre de recurso completo
+
+        Args:
+            corpus_name (str): Nombre para mostrar o nombre de recurso del corpus
+
+        Returns:
+            Optional[str]: Nombre de recurso si el corpus existe, de lo contrario None
+        """
+        now = time.monotonic()
+        with self._lock:
+            index_age = now - self._loaded_at
+            if self._loaded_at and index_age < self.ttl_seconds:
+                resource_name = self._find(corpus_name)
+                if resource_name:
+                    self._stats["hits"] += 1
+                    return resource_name
+
+                # Un nombre ausente en un listado reciente se considera inexistente sin volver a listar
+                missed_at = self._misses.get(corpus_name)
+                if index_age < self.negative_ttl_seconds or (
+                    missed_at is not None and now - missed_at < self.negative_ttl_seconds
+                ):
+                    self._misses.setdefault(corpus_name, now)
+                    self._stats["negative_hits"] += 1
+                    return None
+
+        self._refresh()
+
+        with self._lock:
+            resource_name = self._find(corpus_name)
+            if resource_name:
+                self._stats["misses"] += 1
+                return resource_name
+            self._misses[corpus_name] = time.monotonic()
+            self._stats["misses"] += 1
+            return None
+
+    def register(self, display_name: str, resource_name: str) -> None:
+        """Agregar al indice un corpus recien creado sin volver a listar."""
+        with self._lock:
+            self._resource_names.add(resource_name)
+            if display_name:
+                self._by_display_name[display_name] = resource_name
+                self._misses.pop(display_name, None)
+            self._misses.pop(resource_name, None)
+
+    def invalidate(self, corpus_name: Optional[str] = None) -> None:
+        """
+        Invalidar una entrada del indice, o el indice completo si no se indica un nombre
+
+        Args:
+            corpus_name (str): Nombre para mostrar o nombre de recurso del corpus a invalidar
+        """
+        with self._lock:
+            self._stats["invalidations"] += 1
+            if corpus_name is None:
+                self._by_display_name.clear()
+                self._resource_names.clear()
+                self._misses.clear()
+                self._loaded_at = 0.0
+                return
+
+            resource_name = self._find(corpus_name) or corpus_name
+            self._resource_names.discard(resource_name)
+            for display_name, name in list(self._by_display_name.items()):
+                if name == resource_name:
+                    del self._by_display_name[display_name]
+            self._misses.pop(corpus_name, None)
+            self._misses.pop(resource_name, None)
+
+    def stats(self) -> dict:
+        """Contadores del resolver (list_calls indica cuantas veces se listaron los corpora)."""
+        with self._lock:
+            return {
+                **self._stats,
+                "indexed_corpora": len(self._resource_names),
+                "cached_misses": len(self._misses),
+            }
+
+
+corpus_resolver = CorpusResolver(
+    ttl_seconds=CORPUS_CACHE_TTL_SECONDS,
+    negative_ttl_seconds=CORPUS_NEGATIVE_CACHE_TTL_SECONDS,
+)
@@ -1,13 +1,17 @@
 import re
 
 from google.adk.tools.tool_context import ToolContext
-from vertexai import rag
+from ..rag_backend import rag
+from ..telemetry import instrument_tool, span
 
 from ..config import (
     DEFAULT_EMBEDDING_MODEL,
 )
-from .utils import check_corpus_exists
+from .corpus_resolver import corpus_resolver
+from .metadata_index import metadata_index
+from .utils import check_corpus_exists, remember_corpus
 
+@instrument_tool
 def create_corpus(corpus_name: str, tool_context: ToolContext) -> dict:
     """
     Crear un nuevo corpus en Vertex AI, con un nombre especifico
@@ -20,7 +24,9 @@ def create_corpus(corpus_name: str, tool_context: ToolContext) -> dict:
         dict: Status sobre la information de la operación
     """
     # Verificar si el corpus ya existe
-    if check_corpus_exists(corpus_name, tool_context):
+    with span("resolve"):
+        corpus_exists = check_corpus_exists(corpus_name, tool_context)
+    if corpus_exists:
         return {
             "status": "info",
             "message": f"Corpus '{corpus_name}' ya existe",
@@ -39,15 +45,20 @@ def create_corpus(corpus_name: str, tool_context: ToolContext) -> dict:
         )
 
         #Crear corpus
-        rag_corpus = rag.create_corpus(
-            display_name=display_name,
-            backend_config=rag.RagVectorDbConfig(
-                rag_embedding_model_config=embedding_model_config
-            ),
-        )
+        with span("remote", method="create_corpus"):
+            rag_corpus = rag.create_corpus(
+                display_name=display_name,
+                backend_config=rag.RagVectorDbConfig(
+                    rag_embedding_model_config=embedding_model_config
+                ),
+            )
+
+        # Registrar el nuevo corpus en el indice compartido para no volver a listar
+        corpus_resolver.register(rag_corpus.display_name, rag_corpus.name)
+        metadata_index.upsert_corpus(rag_corpus)
 
         # Actualizar el estado y rastrear el corpus
-        tool_context.state[f"corpus_exisits_{corpus_name}"] = True
+        remember_corpus(corpus_name, rag_corpus.name, tool_context)
 
         # Configurar como corpus actual
         tool_context.state["current_corpus"] = corpus_name
@@ -1,7 +1,14 @@
 from google.adk.tools.tool_context import ToolContext
-from vertexai import rag
-from .utils import check_corpus_exists, get_corpus_resource_name
+from ..rag_backend import rag
+from ..telemetry import instrument_tool, span
+from .corpus_resolver import corpus_resolver
+from .ingestion_manifest import ingestion_manifest
+from .lexical_index import lexical_indexes
+from .metadata_index import metadata_index
+from .query_cache import query_cache
+from .utils import check_corpus_exists, forget_corpus, get_corpus_resource_name
 
+@instrument_tool
 def delete_corpus(
         corpus_name: str,
         confirm: bool,
@@ -17,7 +24,9 @@ def delete_corpus(
     """
 
     # Verificar si el corpus existe
-    if not check_corpus_exists(corpus_name, tool_context):
+    with span("resolve"):
+        corpus_exists = check_corpus_exists(corpus_name, tool_context)
+    if not corpus_exists:
         return {
             "status": "error",
             "message": f"Corpus '{corpus_name}' no existe",
@@ -34,15 +43,21 @@ def delete_corpus(
 
     try:
         # Obtener nombre del recurso del corpus
-        corpus_resource_name = get_corpus_resource_name(corpus_name)
+        corpus_resource_name = get_corpus_resource_name(corpus_name, tool_context)
 
         # Eliminar el corpus
-        rag.delete_corpus(corpus_resource_name)
+        with span("remote", method="delete_corpus"):
+            rag.delete_corpus(corpus_resource_name)
 
-        # Remover el estado ajustado a False
-        state_key = f"corpus_exists_{corpus_name}"
-        if state_key in tool_context.state:
-            tool_context.state[state_key] = False
+        # Quitar el corpus del indice compartido
+        corpus_resolver.invalidate(corpus_resource_name)
+        query_cache.invalidate_corpus(corpus_resource_name)
+        ingestion_manifest.drop_corpus(corpus_resource_name)
+        metadata_index.drop_corpus(corpus_resource_name)
+        lexical_indexes.drop(corpus_resource_name)
+
+        # Quitar el corpus de la sesion
+        forget_corpus(corpus_resource_name, tool_context)
 
         return {
             "status": "success",
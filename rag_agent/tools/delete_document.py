@@ -1,7 +1,13 @@
 from google.adk.tools.tool_context import ToolContext
-from vertexai import rag
+from ..rag_backend import rag
+from ..telemetry import instrument_tool, span
+from .ingestion_manifest import ingestion_manifest
+from .lexical_index import lexical_indexes
+from .metadata_index import metadata_index
+from .query_cache import query_cache
 from .utils import check_corpus_exists, get_corpus_resource_name
 
+@instrument_tool
 def delete_document(
         corpus_name: str,
         document_id: str,
@@ -16,7 +22,9 @@ def delete_document(
     """
 
     # Verificar si el corpus existe
-    if not check_corpus_exists(corpus_name, tool_context):
+    with span("resolve"):
+        corpus_exists = check_corpus_exists(corpus_name, tool_context)
+    if not corpus_exists:
         return {
             "status": "error",
             "message": f"Corpus '{corpus_name}' no existe",
@@ -26,11 +34,22 @@ def delete_document(
 
     try:
         # Obtener nombre del recurso del corpus
-        corpus_resource_name = get_corpus_resource_name(corpus_name)
+        corpus_resource_name = get_corpus_resource_name(corpus_name, tool_context)
 
         # Eliminar documento
         rag_file_path = f"{corpus_resource_name}/ragFiles/{document_id}"
-        rag.delete_file(rag_file_path)
+        known_file = metadata_index.get_file(corpus_resource_name, document_id)
+        with span("remote", method="delete_file"):
+            rag.delete_file(rag_file_path)
+
+        # Los resultados cacheados de este corpus ya no son validos
+        query_cache.invalidate_corpus(corpus_resource_name)
+        # Un nuevo add_data del mismo archivo debe volver a importarlo
+        ingestion_manifest.forget_rag_files(corpus_resource_name, [rag_file_path])
+        metadata_index.remove_files(corpus_resource_name, [rag_file_path])
+        if known_file and known_file["source_uri"]:
+            lexical_indexes.get(corpus_resource_name).remove(known_file["source_uri"])
+            lexical_indexes.flush(corpus_resource_name)
 
         return {
             "status": "success",
@@ -0,0 +1,174 @@
+import logging
+from typing import List
+
+from google.adk.tools.tool_context import ToolContext
+from ..rag_backend import rag
+from ..telemetry import instrument_tool, span
+from .concurrency import run_concurrently
+from .ingestion_manifest import ingestion_manifest
+from .lexical_index import lexical_indexes
+from .metadata_index import metadata_index
+from .query_cache import query_cache
+from .utils import check_corpus_exists, get_corpus_resource_name
+
+from ..config import (
+    BULK_DELETE_MAX_CONCURRENCY,
+    BULK_DELETE_MAX_FILES,
+    BULK_DELETE_TIMEOUT_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _resolve_documents(
+        corpus_resource_name: str,
+        document_ids: List[str],
+        name_pattern: str,
+        source_prefix: str) -> List[dict]:
+    """Documentos a borrar, sin repetir, a partir de los ids y de los filtros sobre la copia local de metadatos."""
+    matches = {}
+    for document_id in document_ids or []:
+        known = metadata_index.get_file(corpus_resource_name, document_id)
+        matches[document_id] = known or {
+            "file_id": document_id,
+            "name": f"{corpus_resource_name}/ragFiles/{document_id}",
+            "display_name": "",
+            "source_uri": "",
+        }
+
+    if name_pattern or source_prefix:
+        # Pedir uno mas que el maximo para detectar si se excede
+        for rag_file in metadata_index.find_files(
+            corpus_resource_name,
+            source_prefix=source_prefix,
+            limit=BULK_DELETE_MAX_FILES + 1,
+            name_glob=name_pattern,
+        ):
+            matches.setdefault(rag_file["file_id"], rag_file)
+
+    return list(matches.values())
+
+
+@instrument_tool
+def delete_documents(
+        corpus_name: str,
+        document_ids: List[str],
+        name_pattern: str,
+        source_prefix: str,
+        confirm: bool,
+        tool_context: ToolContext) -> dict:
+    """
+    Eliminar varios documentos de un corpus en una sola llamada
+    Este paso necesita una corfirmacion
+    :param corpus_name: Nombre del corpus de donde se quieren borrar los documentos
+    :param document_ids: Lista de ids de documentos a borrar (lista vacia si se usa un filtro)
+    :param name_pattern: Patron glob sobre el nombre del documento, por ejemplo "nivel_4_*.json" ('' para no usarlo)
+    :param source_prefix: Prefijo de la ruta de origen, por ejemplo "gs://bucket/nivel_4/" ('' para no usarlo)
+    :param confirm: Debe de ser ajustado a True para que se eliminen; con False solo se devuelven los documentos encontrados
+    :param tool_context: Herramienta de contexto
+    :return:
+        dict: Status, documentos encontrados y el resultado del borrado de cada uno
+    """
+    if not document_ids and not name_pattern and not source_prefix:
+        return {
+            "status": "error",
+            "message": "Se debe indicar una lista de ids, un patron de nombre o un prefijo de ruta",
+            "corpus_name": corpus_name
+        }
+
+    # Verificar si el corpus existe (una sola vez para todo el lote)
+    with span("resolve"):
+        corpus_exists = check_corpus_exists(corpus_name, tool_context)
+    if not corpus_exists:
+        return {
+            "status": "error",
+            "message": f"Corpus '{corpus_name}' no existe",
+            "corpus_name": corpus_name
+        }
+
+    try:
+        corpus_resource_name = get_corpus_resource_name(corpus_name, tool_context)
+
+        # Resolver los documentos una sola vez con la copia local de metadatos
+        metadata_index.refresh(corpus_resource_name)
+        with span("lookup"):
+            documents = _resolve_documents(corpus_resource_name, document_ids, name_pattern, source_prefix)
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"Error al buscar los documentos del corpus {corpus_name}: {str(e)}",
+            "corpus_name": corpus_name
+        }
+
+    if not documents:
+        return {
+            "status": "error",
+            "message": f"No se encontraron documentos para borrar en el corpus '{corpus_name}'",
+            "corpus_name": corpus_name
+        }
+
+    if len(documents) > BULK_DELETE_MAX_FILES:
+        return {
+            "status": "error",
+            "message": f"Se permiten como maximo {BULK_DELETE_MAX_FILES} documentos por llamada, usar un filtro mas especifico",
+            "corpus_name": corpus_name
+        }
+
+    matched = [
+        {"document_id": document["file_id"], "display_name": document["display_name"], "source_uri": document["source_uri"]}
+        for document in documents
+    ]
+
+    # Confirmacion para eliminar los documentos
+    if not confirm:
+        return {
+            "status": "error",
+            "message": f"{len(documents)} documentos no pueden ser eliminados si no se realiza la confirmacion",
+            "corpus_name": corpus_name,
+            "documents": matched,
+            "documents_count": len(matched)
+        }
+
+    # Eliminar los documentos en paralelo
+    outcomes = run_concurrently(
+        lambda document: rag.delete_file(document["name"]),
+        documents,
+        max_workers=BULK_DELETE_MAX_CONCURRENCY,
+        timeout=BULK_DELETE_TIMEOUT_SECONDS,
+    )
+
+    results = []
+    deleted = []
+    for document, info, (ok, value) in zip(documents, matched, outcomes):
+        if ok:
+            deleted.append(document["name"])
+            results.append({**info, "status": "deleted", "error": ""})
+        else:
+            logger.error(f"Error deleting document {document['name']}: {str(value)}")
+            results.append({**info, "status": "error", "error": str(value) or type(value).__name__})
+
+    if deleted:
+        # Los resultados cacheados y los metadatos locales de este corpus ya no son validos
+        query_cache.invalidate_corpus(corpus_resource_name)
+        ingestion_manifest.forget_rag_files(corpus_resource_name, deleted)
+        metadata_index.remove_files(corpus_resource_name, deleted)
+        index = lexical_indexes.get(corpus_resource_name)
+        for document in documents:
+            if document["name"] in deleted and document["source_uri"]:
+                index.remove(document["source_uri"])
+        lexical_indexes.flush(corpus_resource_name)
+
+    if len(deleted) == len(documents):
+        status = "success"
+    elif deleted:
+        status = "partial"
+    else:
+        status = "error"
+
+    return {
+        "status": status,
+        "message": f"{len(deleted)} de {len(documents)} documentos eliminados del corpus '{corpus_name}'",
+        "corpus_name": corpus_name,
+        "results": results,
+        "deleted_count": len(deleted)
+    }
@@ -0,0 +1,67 @@
+"""
+Metadatos de materia, nivel y eje de los archivos .json del corpus, para filtrar las consultas.
+Se toman de los campos de los registros (JSON_METADATA_FIELDS) y, si no estan, de la ruta del archivo
+(por ejemplo gs://bucket/matematica/nivel_2.json).
+"""
+import re
+from typing import Any, Dict, List, Optional
+
+from ..chunking import JsonRecord
+from ..text import fold_text
+
+from ..config import (
+    JSON_METADATA_FIELDS,
+    JSON_SUBJECTS,
+)
+
+_LEVEL_IN_PATH_RE = re.compile(r"nivel[\s_\-]*(\d+)")
+_NUMBER_RE = re.compile(r"\d+")
+
+
+def normalize_value(field: str, value: Any) -> str:
+    """Valor comparable de un metadato: sin tildes ni mayusculas, y solo el numero para el nivel ("Nivel 2" -> "2")."""
+    text = fold_text(str(value)).strip()
+    if field == "level":
+        number = _NUMBER_RE.search(text)
+        return number.group() if number else text
+    return text
+
+
+def _field(fields: Dict[str, Any], names) -> Optional[Any]:
+    folded = {fold_text(str(key)): value for key, value in fields.items()}
+    for name in names:
+        value = folded.get(name)
+        if isinstance(value, (str, int, float)) and str(value).strip():
+            return value
+    return None
+
+
+def document_metadata(source_uri: str, records: Optional[List[JsonRecord]]) -> Dict[str, List[str]]:
+    """
+    Metadatos de un archivo a partir de sus registros y de su ruta
+
+    Args:
+        source_uri (str): URI del archivo
+        records (Optional[List[JsonRecord]]): Registros del archivo (None si no es JSON)
+
+    Returns:
+        Dict[str, List[str]]: Valores distintos de cada campo ('subject', 'level', 'eje'), ya normalizados,
+            y 'format' ("json" o "text")
+    """
+    metadata: Dict[str, List[str]] = {field: [] for field in JSON_METADATA_FIELDS}
+    metadata["format"] = ["json" if records else "text"]
+    for record in records or []:
+        merged = {**record.context, **record.fields}
+        for field, names in JSON_METADATA_FIELDS.items():
+            value = _field(merged, names)
+            if value is not None:
+                normalized = normalize_value(field, value)
+                if normalized and normalized not in metadata[field]:
+                    metadata[field].append(normalized)
+
+    path = fold_text(source_uri)
+    if not metadata["subject"]:
+        metadata["subject"] = [subject for subject in JSON_SUBJECTS if subject in path]
+    if not metadata["level"]:
+        metadata["level"] = _LEVEL_IN_PATH_RE.findall(path)[-1:]
+    return metadata
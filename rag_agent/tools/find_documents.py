@@ -0,0 +1,63 @@
+from google.adk.tools.tool_context import ToolContext
+from ..telemetry import instrument_tool, span
+from .metadata_index import metadata_index
+from .utils import check_corpus_exists, get_corpus_resource_name
+
+
+@instrument_tool
+def find_documents(
+        corpus_name: str,
+        display_name: str,
+        source_prefix: str,
+        tool_context: ToolContext) -> dict:
+    """
+    Buscar documentos de un corpus por nombre o por ruta de origen, sin listar el corpus completo
+    :param corpus_name: Nombre del corpus donde se buscan los documentos
+    :param display_name: Texto contenido en el nombre del documento ('' para no filtrar por nombre)
+    :param source_prefix: Prefijo de la ruta de origen, por ejemplo "gs://bucket/matematica/" ('' para no filtrar)
+    :param tool_context: Contexto de la herramienta
+    :return:
+        dict: Documentos encontrados con su document_id (el que usa 'delete_document'), nombre y origen
+    """
+    # Verificar si el corpus existe
+    with span("resolve"):
+        corpus_exists = check_corpus_exists(corpus_name, tool_context)
+    if not corpus_exists:
+        return {
+            "status": "error",
+            "message": f"Corpus '{corpus_name}' no existe",
+            "corpus_name": corpus_name
+        }
+
+    try:
+        corpus_resource_name = get_corpus_resource_name(corpus_name, tool_context)
+
+        # Solo se lista el corpus remoto si la copia local vencio
+        metadata_index.refresh(corpus_resource_name)
+        with span("lookup"):
+            files = metadata_index.find_files(corpus_resource_name, display_name, source_prefix)
+
+        documents = [
+            {
+                "document_id": rag_file["file_id"],
+                "display_name": rag_file["display_name"],
+                "source_uri": rag_file["source_uri"],
+                "update_time": rag_file["update_time"],
+            }
+            for rag_file in files
+        ]
+
+        return {
+            "status": "success",
+            "message": f"Encontrados {len(documents)} documentos en el corpus '{corpus_name}'",
+            "corpus_name": corpus_name,
+            "documents": documents,
+            "documents_count": len(documents)
+        }
+
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"Error al buscar documentos en el corpus {corpus_name}: {str(e)}",
+            "corpus_name": corpus_name
+        }
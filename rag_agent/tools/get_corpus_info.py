@@ -1,21 +1,90 @@
+import itertools
+from collections import Counter
+from typing import Iterable, Iterator, List
+
 from google.adk.tools.tool_context import ToolContext
-from vertexai import rag
+from ..rag_backend import rag
+from ..telemetry import instrument_tool, span
 from .utils import check_corpus_exists, get_corpus_resource_name
+from .resilience import is_unavailable, resilient_calls, with_deadline
+from .stale_cache import mark_stale, stale_cache
+
+from ..config import (
+    CORPUS_INFO_FIELDS,
+    CORPUS_INFO_MAX_PAGE_SIZE,
+    CORPUS_INFO_PAGE_SIZE,
+)
+
+
+def _file_info(rag_file, fields: Iterable[str]) -> dict:
+    """Datos de un archivo del corpus, solo con los campos pedidos."""
+    file_info = {}
+    for field in fields:
+        if field == "file_id":
+            # Extraer el id del archivo desde el nombre
+            file_info[field] = rag_file.name.split("/")[-1]
+        else:
+            file_info[field] = str(getattr(rag_file, field, "") or "")
+    return file_info
+
+
+def _source_group(source_uri: str) -> str:
+    """Agrupar un source_uri por origen: bucket de GCS, Drive u otro."""
+    if source_uri.startswith("gs://"):
+        return "gs://" + source_uri[len("gs://"):].split("/", 1)[0]
+    if "drive.google.com" in source_uri or "docs.google.com" in source_uri:
+        return "drive"
+    return "otro"
+
+
+def _iter_files(corpus_resource_name: str, page_size: int, page_token: str) -> Iterator:
+    # El pager del SDK pide las paginas a medida que se recorre
+    return rag.list_files(corpus_resource_name, page_size=page_size, page_token=page_token or None)
+
+
+def _parse_fields(fields: str) -> List[str]:
+    if not fields:
+        return list(CORPUS_INFO_FIELDS)
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    invalid = [field for field in requested if field not in CORPUS_INFO_FIELDS]
+    if invalid:
+        raise ValueError(
+            f"Campos no soportados: {', '.join(invalid)} (validos: {', '.join(CORPUS_INFO_FIELDS)})"
+        )
+    return requested
+
 
+@instrument_tool
+@with_deadline
 def get_corpus_info(
         corpus_name: str,
         tool_context: ToolContext,
+        page_size: int = CORPUS_INFO_PAGE_SIZE,
+        page_token: str = "",
+        fields: str = "",
+        summary: bool = False,
 ) -> dict:
     """
     Obtener informacion detallada de un corpus especifico
     :param corpus_name: Nombre del corpus del que se obtiene la informacion
     :param tool_context: Herramienta de context del corpus
+    :param page_size: Cantidad de archivos a devolver por pagina
+    :param page_token: Token devuelto en 'next_page_token' para pedir la pagina siguiente ('' para la primera)
+    :param fields: Campos de cada archivo separados por coma
+        (file_id, display_name, source_uri, create_time, update_time); '' para todos
+    :param summary: True para devolver solo los conteos del corpus, sin la lista de archivos
     :return:
-        dict: Informacion sobre el corpus y su status
+        dict: Informacion sobre el corpus y su status. Con paginacion incluye 'files', 'file_count'
+            (archivos en la pagina) y 'next_page_token'; con summary incluye 'file_count' total
+            y 'files_by_source'. Si Vertex AI no responde se devuelve la ultima respuesta buena para los mismos
+            parametros con 'stale' en True
     """
+    stale_key = None
     try:
         # Verificar si el corpus existe
-        if not check_corpus_exists(corpus_name, tool_context):
+        with span("resolve"):
+            corpus_exists = check_corpus_exists(corpus_name, tool_context)
+        if not corpus_exists:
             return {
                 "status": "error",
                 "message": f"Corpus '{corpus_name} no existe",
@@ -23,57 +92,76 @@ def get_corpus_info(
             }
 
         # Obtener el nombre del corpus
-        corpus_resource_name = get_corpus_resource_name(corpus_name)
+        corpus_resource_name = get_corpus_resource_name(corpus_name, tool_context)
+        stale_key = stale_cache.make_key(
+            "get_corpus_info", corpus_resource_name, page_size, page_token, fields, summary
+        )
 
         # Tratar de obtener ifnromacion detallada del corpus primero
         corpus_display_name = corpus_name
 
-        # Proceder con los archivos del corpus
-        file_details = []
+        if summary:
+            # Recorrer todos los archivos sin guardarlos: solo se acumulan los conteos
+            file_count = 0
+            files_by_source: Counter = Counter()
+            last_update_time = ""
+            with span("remote", method="list_files"), resilient_calls.guard("list_files"):
+                for rag_file in _iter_files(corpus_resource_name, CORPUS_INFO_MAX_PAGE_SIZE, ""):
+                    file_count += 1
+                    files_by_source[_source_group(str(getattr(rag_file, "source_uri", "") or ""))] += 1
+                    last_update_time = max(last_update_time, str(getattr(rag_file, "update_time", "") or ""))
+
+            response = {
+                "status": "success",
+                "message": f"Resumen del corpus obtenido satisfactoriamente: {corpus_display_name}",
+                "corpus_name": corpus_name,
+                "file_count": file_count,
+                "files_by_source": dict(files_by_source),
+                "last_update_time": last_update_time
+            }
+            stale_cache.put(stale_key, response)
+            return response
+
         try:
-            # Obtener lista de archivos
-            files = rag.list_files(corpus_resource_name)
-            for rag_file in files:
-                # Obtener documento especifico
+            selected_fields = _parse_fields(fields)
+        except ValueError as e:
+            return {
+                "status": "error",
+                "message": str(e),
+                "corpus_name": corpus_name
+            }
+        page_size = max(1, min(page_size or CORPUS_INFO_PAGE_SIZE, CORPUS_INFO_MAX_PAGE_SIZE))
+
+        # Proceder con los archivos del corpus, leyendo solo la pagina pedida
+        file_details = []
+        next_page_token = ""
+        with span("remote", method="list_files"), resilient_calls.guard("list_files"):
+            pager = _iter_files(corpus_resource_name, page_size, page_token)
+            for rag_file in itertools.islice(pager, page_size):
                 try:
-                    # Extraer el id del archivo desde el nombre
-                    file_id = rag_file.name.split("/")[-1]
-
-                    file_info = {
-                        "file_id": file_id,
-                        "display_name": (
-                            rag_file.display_name
-                            if hasattr(rag_file, "display_name") else""
-                        ),
-                        "source_uri": (
-                            rag_file.source_uri
-                            if hasattr(rag_file, "source_uri") else ""
-                        ),
-                        "create_time": (
-                            str(rag_file.create_time)
-                            if hasattr(rag_file, "create_time") else ""
-                        ),
-                        "update_time": (
-                            str(rag_file.update_time)
-                            if hasattr(rag_file, "update_time") else ""
-                        )
-                    }
-                    file_details.append(file_info)
+                    file_details.append(_file_info(rag_file, selected_fields))
                 except Exception:
                     continue
-        except Exception:
-            pass
+            next_page_token = getattr(pager, "next_page_token", "") or ""
 
         # Informacion basica del corpus
-        return {
+        response = {
             "status": "success",
             "message": f"Informacion del corpus obtenida satisfactoriamente: {corpus_display_name}",
             "corpus_name": corpus_name,
             "file_count": len(file_details),
-            "files": file_details
+            "files": file_details,
+            "next_page_token": next_page_token
         }
+        stale_cache.put(stale_key, response)
+        return response
 
     except Exception as e:
+        # Con Vertex caido o el circuito abierto, responder con la ultima respuesta buena
+        if stale_key is not None and is_unavailable(e):
+            cached = stale_cache.get(stale_key, tool="get_corpus_info")
+            if cached is not None:
+                return mark_stale(*cached, e)
         return {
             "status": "error",
             "message": f"Error al obtener informacion del corpus",
@@ -0,0 +1,74 @@
+from google.adk.tools.tool_context import ToolContext
+from ..telemetry import instrument_tool
+from .ingestion_jobs import ingestion_jobs
+
+
+def _job_summary(job: dict) -> dict:
+    """Datos de un job que se muestran al agente."""
+    total = job["total_paths"]
+    processed = job["imported"] + job["failed"] + job["skipped"]
+    return {
+        "job_id": job["job_id"],
+        "corpus_name": job["corpus_name"],
+        "state": job["state"],
+        "progress": f"{job['batches_done']}/{job['batches_total']} lotes",
+        "total_paths": total,
+        "files_processed": processed,
+        "files_added": job["imported"],
+        "files_failed": job["failed"],
+        "files_skipped": job["skipped"],
+        "files_unchanged": job["unchanged"],
+        "files_replaced": job["replaced"],
+        "error": job["error"],
+    }
+
+
+@instrument_tool
+def get_ingestion_status(
+        job_id: str,
+        tool_context: ToolContext) -> dict:
+    """
+    Consultar el estado de una importacion iniciada con 'add_data'
+    :param job_id: Id del job devuelto por 'add_data'. Si es un string vacio se usa la ultima
+        importacion de esta conversacion, o se listan las importaciones recientes
+    :param tool_context: Contexto de la herramienta
+    :return:
+        dict: Estado del job (queued, running, success, partial, error), avance, contadores y errores.
+            En 'path_results' el status de cada path es el de su lote ('unknown' si el lote tuvo
+            resultados mezclados): import_files no informa el resultado de cada archivo
+    """
+    try:
+        if not job_id:
+            job_id = tool_context.state.get("last_ingestion_job", "")
+
+        if not job_id:
+            jobs = [_job_summary(job) for job in ingestion_jobs.recent()]
+            return {
+                "status": "success",
+                "message": f"Encontradas {len(jobs)} importaciones recientes",
+                "jobs": jobs,
+            }
+
+        job = ingestion_jobs.get(job_id)
+        if job is None:
+            return {
+                "status": "error",
+                "message": f"No existe la importacion '{job_id}'",
+                "job_id": job_id,
+            }
+
+        summary = _job_summary(job)
+        if job["state"] in ("success", "partial", "error"):
+            summary["path_results"] = job["path_results"]
+        return {
+            "status": "success",
+            "message": f"Importacion '{job_id}' en estado '{job['state']}' ({summary['progress']})",
+            **summary,
+        }
+
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"Error al consultar la importacion: {str(e)}",
+            "job_id": job_id,
+        }
@@ -0,0 +1,373 @@
+import logging
+import math
+import random
+import time
+from typing import Callable, List, Optional
+
+from ..rag_backend import rag
+from ..chunking import chunk_records, chunk_text, json_records
+from ..sources import read_source, source_fingerprints, source_sizes
+from ..telemetry import span
+from .concurrency import run_concurrently
+from .document_metadata import document_metadata
+from .ingestion_manifest import ingestion_manifest, rag_file_source_uri
+from .lexical_index import lexical_indexes
+from .metadata_index import metadata_index
+from .rate_limit import embedding_rate_limiter
+from .resilience import is_retryable
+
+from ..config import (
+    ADD_DATA_BATCH_SIZE,
+    ADD_DATA_EMBEDDING_REQUESTS_PER_CHUNK,
+    ADD_DATA_INCREMENTAL,
+    ADD_DATA_MAX_CONCURRENT_BATCHES,
+    ADD_DATA_MAX_RETRIES,
+    ADD_DATA_RETRY_BASE_SECONDS,
+    CHARS_PER_TOKEN,
+    DEFAULT_CHUNK_OVERLAP,
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_EMBEDDING_REQUESTS_PER_MIN,
+    HYBRID_RETRIEVAL_ENABLED,
+    JSON_CHUNKING_ENABLED,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _batch_status(batch: dict) -> str:
+    """Resultado de un lote a partir de los contadores que devuelve import_files (son por lote, no por archivo)."""
+    if batch["error"] and not batch["imported"] and not batch["skipped"]:
+        return "failed"
+    if batch["failed"]:
+        return "partial" if batch["imported"] or batch["skipped"] else "failed"
+    if batch["skipped"] and not batch["imported"]:
+        return "skipped"
+    return "imported"
+
+
+def _path_status(batch: dict) -> str:
+    """
+    Estado de un path segun su lote: solo es exacto si todo el lote tuvo el mismo resultado,
+    con resultados mezclados no se sabe que archivos fallaron y se informa 'unknown'
+    """
+    return "unknown" if batch["status"] == "partial" else batch["status"]
+
+
+def estimate_embedding_requests(paths: List[str]) -> int:
+    """
+    Solicitudes de embedding que generara importar los paths: chunks estimados por el tamaño de cada archivo
+    (al menos uno por archivo) por ADD_DATA_EMBEDDING_REQUESTS_PER_CHUNK
+    :param paths: Paths a importar (archivos, carpetas o prefijos)
+    :return:
+        int: Solicitudes estimadas; un path cuyo tamaño no se puede obtener (por ejemplo de Drive) cuenta como un chunk
+    """
+    chars_per_chunk = max(1, (DEFAULT_CHUNK_SIZE - DEFAULT_CHUNK_OVERLAP) * CHARS_PER_TOKEN)
+    chunks = 0
+    for path in paths:
+        try:
+            sizes = source_sizes(path)
+        except Exception as e:
+            logger.warning(f"Error estimating size of {path}: {str(e)}")
+            sizes = {}
+        chunks += sum(max(1, math.ceil(size / chars_per_chunk)) for size in sizes.values()) or 1
+    return chunks * ADD_DATA_EMBEDDING_REQUESTS_PER_CHUNK
+
+
+def _import_batch(
+        corpus_resource_name: str,
+        index: int,
+        paths: List[str],
+        max_concurrent_batches: int) -> dict:
+    """
+    Importar un lote respetando la cuota de embeddings.
+    Solo se reintenta (con backoff) cuando la llamada falla por un error transitorio o de cuota (429/5xx);
+    los archivos que import_files informa como fallidos quedan registrados en el lote y no se reintentan,
+    ya que reenviar el lote volveria a cobrar la cuota de los ya importados y repetiria fallas permanentes.
+    """
+    # Vertex AI no acepta chunks propios en import_files: trocea cada archivo (tambien los .json)
+    # en ventanas planas; el chunking por registros solo lo usan el backend local y el indice lexico
+    transformation_config = rag.TransformationConfig(
+        chunking_config=rag.ChunkingConfig(
+            chunk_size=DEFAULT_CHUNK_SIZE,
+            chunk_overlap=DEFAULT_CHUNK_OVERLAP,
+        )
+    )
+    # Repartir la cuota por minuto entre los lotes que corren en paralelo
+    requests_per_min = max(1, DEFAULT_EMBEDDING_REQUESTS_PER_MIN // max_concurrent_batches)
+    embedding_requests = estimate_embedding_requests(paths)
+
+    batch = {
+        "batch": index,
+        "paths": paths,
+        "attempts": 0,
+        "imported": 0,
+        "failed": 0,
+        "skipped": 0,
+        "error": "",
+    }
+    for attempt in range(ADD_DATA_MAX_RETRIES + 1):
+        batch["attempts"] = attempt + 1
+        embedding_rate_limiter.acquire(embedding_requests)
+        try:
+            with span("remote", method="import_files"):
+                result = rag.import_files(
+                    corpus_resource_name,
+                    paths,
+                    transformation_config=transformation_config,
+                    max_embedding_requests_per_min=requests_per_min,
+                )
+            batch["imported"] = getattr(result, "imported_rag_files_count", 0) or 0
+            batch["skipped"] = getattr(result, "skipped_rag_files_count", 0) or 0
+            batch["failed"] = getattr(result, "failed_rag_files_count", 0) or 0
+            batch["error"] = f"{batch['failed']} archivos fallaron al importar" if batch["failed"] else ""
+            break
+        except Exception as e:
+            logger.warning(f"Error importing batch {index} (attempt {attempt + 1}): {str(e)}")
+            batch["error"] = str(e) or type(e).__name__
+            batch["failed"] = len(paths)
+            if not is_retryable(e):
+                break
+
+        if attempt < ADD_DATA_MAX_RETRIES:
+            # Backoff exponencial con jitter completo
+            time.sleep(random.uniform(0, ADD_DATA_RETRY_BASE_SECONDS * (2 ** attempt)))
+
+    return batch
+
+
+def import_paths_in_batches(
+        corpus_resource_name: str,
+        paths: List[str],
+        batch_size: int = ADD_DATA_BATCH_SIZE,
+        max_concurrent_batches: int = ADD_DATA_MAX_CONCURRENT_BATCHES,
+        on_batch_done: Optional[Callable[[dict], None]] = None) -> dict:
+    """
+    Importar paths a un corpus en lotes paralelos limitados por la cuota de embeddings
+    :param corpus_resource_name: Nombre de recurso del corpus
+    :param paths: Paths ya validados
+    :param batch_size: Cantidad de paths por llamada a import_files
+    :param max_concurrent_batches: Lotes que se importan al mismo tiempo
+    :param on_batch_done: Funcion opcional que recibe el resultado de cada lote al terminar
+    :return:
+        dict: Totales (imported, failed, skipped), resultado por lote (contadores y status) y
+            path_results. El status de cada path sale de su lote: import_files solo devuelve
+            contadores, asi que con un lote mezclado ('partial') sus paths quedan como 'unknown'
+    """
+    batches = [paths[i:i + batch_size] for i in range(0, len(paths), batch_size)]
+
+    def _run(item):
+        index, batch_paths = item
+        batch = _import_batch(corpus_resource_name, index, batch_paths, max_concurrent_batches)
+        if on_batch_done:
+            on_batch_done(batch)
+        return batch
+
+    outcomes = run_concurrently(_run, list(enumerate(batches)), max_workers=max_concurrent_batches)
+
+    batch_results = []
+    for (index, batch_paths), (ok, value) in zip(enumerate(batches), outcomes):
+        if ok:
+            batch_results.append(value)
+        else:
+            batch_results.append({
+                "batch": index, "paths": batch_paths, "attempts": 0,
+                "imported": 0, "failed": len(batch_paths), "skipped": 0,
+                "error": str(value) or type(value).__name__,
+            })
+
+    path_results = []
+    for batch in batch_results:
+        batch["status"] = _batch_status(batch)
+        status = _path_status(batch)
+        for path in batch["paths"]:
+            path_results.append({
+                "path": path,
+                "status": status,
+                "batch": batch["batch"],
+                "attempts": batch["attempts"],
+                "error": batch["error"],
+            })
+
+    return {
+        "imported": sum(batch["imported"] for batch in batch_results),
+        "failed": sum(batch["failed"] for batch in batch_results),
+        "skipped": sum(batch["skipped"] for batch in batch_results),
+        "batches": batch_results,
+        "path_results": path_results,
+    }
+
+
+def analyze_sources(corpus_resource_name: str, source_uris: List[str], index_lexical: bool) -> int:
+    """
+    Leer una vez cada archivo importado para guardar sus metadatos (materia, nivel, eje) y,
+    con la busqueda hibrida, agregar sus chunks al indice lexico local
+    :param corpus_resource_name: Nombre de recurso del corpus
+    :param source_uris: Archivos a analizar; los que no se pueden leer se omiten
+    :param index_lexical: Agregar los chunks al indice lexico
+    :return:
+        int: Cantidad de archivos analizados
+    """
+    index = lexical_indexes.get(corpus_resource_name)
+    analyzed = 0
+    with span("analyze", files=len(source_uris)):
+        for source_uri in source_uris:
+            try:
+                text = read_source(source_uri)
+            except Exception as e:
+                logger.warning(f"Error reading {source_uri}: {str(e)}")
+                continue
+            records = json_records(text) if source_uri.lower().endswith(".json") else None
+            metadata_index.set_metadata(corpus_resource_name, source_uri, document_metadata(source_uri, records))
+            if index_lexical:
+                if records and JSON_CHUNKING_ENABLED:
+                    chunks = chunk_records(records, DEFAULT_CHUNK_SIZE, DEFAULT_CHUNK_OVERLAP)
+                else:
+                    chunks = chunk_text(text, DEFAULT_CHUNK_SIZE, DEFAULT_CHUNK_OVERLAP)
+                index.add(source_uri, chunks)
+            analyzed += 1
+        if index_lexical:
+            lexical_indexes.flush(corpus_resource_name)
+    return analyzed
+
+
+def plan_incremental_import(corpus_resource_name: str, paths: List[str]) -> dict:
+    """
+    Comparar los archivos de cada path con el manifiesto del corpus
+    :param corpus_resource_name: Nombre de recurso del corpus
+    :param paths: Paths ya validados (los prefijos gs:// se expanden a sus archivos)
+    :return:
+        dict: to_import (paths a importar), unchanged (archivos sin cambios), stale (archivo
+            modificado -> archivo rag a reemplazar), fingerprints y adopted (entradas sembradas
+            a las que se les registra la huella actual)
+    """
+    entries = ingestion_manifest.entries(corpus_resource_name)
+    plan = {"to_import": [], "unchanged": [], "stale": {}, "fingerprints": {}, "adopted": []}
+
+    for path in paths:
+        # Solo los archivos de GCS tienen huella; Drive se delega a import_files
+        if not path.startswith("gs://"):
+            plan["to_import"].append(path)
+            continue
+        try:
+            found = source_fingerprints(path)
+        except Exception as e:
+            logger.warning(f"Error fingerprinting {path}: {str(e)}")
+            found = {}
+        if not found:
+            plan["to_import"].append(path)
+            continue
+
+        for uri, fingerprint in found.items():
+            plan["fingerprints"][uri] = fingerprint
+            known_fingerprint, rag_file_name = entries.get(uri, (None, ""))
+            if known_fingerprint is None:
+                plan["to_import"].append(uri)
+            elif not known_fingerprint:
+                # Sembrado desde list_files: se asume al dia y se registra su huella actual
+                plan["unchanged"].append(uri)
+                plan["adopted"].append((uri, fingerprint, rag_file_name))
+            elif known_fingerprint == fingerprint:
+                plan["unchanged"].append(uri)
+            else:
+                plan["stale"][uri] = rag_file_name
+                plan["to_import"].append(uri)
+
+    plan["to_import"] = list(dict.fromkeys(plan["to_import"]))
+    plan["unchanged"] = list(dict.fromkeys(plan["unchanged"]))
+    return plan
+
+
+def import_paths_incremental(
+        corpus_resource_name: str,
+        paths: List[str],
+        on_plan: Optional[Callable[[dict], None]] = None,
+        on_batch_done: Optional[Callable[[dict], None]] = None) -> dict:
+    """
+    Importar solo los archivos nuevos o modificados segun el manifiesto del corpus
+    :param corpus_resource_name: Nombre de recurso del corpus
+    :param paths: Paths ya validados
+    :param on_plan: Funcion opcional que recibe el plan antes de empezar a importar
+    :param on_batch_done: Funcion opcional que recibe el resultado de cada lote al terminar
+    :return:
+        dict: Igual que import_paths_in_batches, mas 'unchanged' y 'replaced'. Los archivos sin
+            cambios se cuentan tambien en 'skipped' y aparecen en path_results con status 'unchanged'
+    """
+    if not ADD_DATA_INCREMENTAL:
+        if on_plan:
+            on_plan({"to_import": paths, "unchanged": [], "stale": {}})
+        result = import_paths_in_batches(corpus_resource_name, paths, on_batch_done=on_batch_done)
+        if result["imported"]:
+            metadata_index.refresh(corpus_resource_name, force=True)
+        return {**result, "unchanged": 0, "replaced": 0}
+
+    with span("plan"):
+        plan = plan_incremental_import(corpus_resource_name, paths)
+    if plan["adopted"]:
+        ingestion_manifest.record(corpus_resource_name, plan["adopted"])
+
+    # Borrar la version anterior de los archivos modificados (import_files omitiria el source_uri)
+    delete_errors = {}
+    for uri, rag_file_name in plan["stale"].items():
+        try:
+            with span("remote", method="delete_file"):
+                rag.delete_file(rag_file_name)
+            ingestion_manifest.forget(corpus_resource_name, [uri])
+        except Exception as e:
+            logger.warning(f"Error deleting stale file {rag_file_name}: {str(e)}")
+            delete_errors[uri] = str(e) or type(e).__name__
+    to_import = [path for path in plan["to_import"] if path not in delete_errors]
+
+    if on_plan:
+        on_plan({**plan, "to_import": to_import})
+
+    result = import_paths_in_batches(corpus_resource_name, to_import, on_batch_done=on_batch_done)
+
+    # Un unico listado actualiza la copia local de metadatos y la huella de los archivos importados.
+    # Los archivos de lotes mezclados ('unknown') se registran solo si aparecen en el listado
+    completed = [
+        path_result["path"] for path_result in result["path_results"]
+        if path_result["status"] in ("imported", "skipped", "unknown") and path_result["path"] in plan["fingerprints"]
+    ]
+    if completed or result["imported"] or plan["stale"]:
+        with span("remote", method="list_files"):
+            listing = list(rag.list_files(corpus_resource_name))
+        metadata_index.sync_files(corpus_resource_name, listing)
+        rag_files = {rag_file_source_uri(rag_file): rag_file.name for rag_file in listing}
+        completed = [uri for uri in completed if uri in rag_files]
+        ingestion_manifest.record(corpus_resource_name, [
+            (uri, plan["fingerprints"][uri], rag_files[uri]) for uri in completed
+        ])
+
+    # Analizar lo importado y los archivos sin cambios que todavia no tengan metadatos o indice lexico
+    imported = {
+        path_result["path"] for path_result in result["path_results"]
+        if path_result["status"] in ("imported", "unknown")
+    }
+    analyzed = metadata_index.analyzed_sources(corpus_resource_name)
+    index = lexical_indexes.get(corpus_resource_name) if HYBRID_RETRIEVAL_ENABLED else None
+    pending = [
+        uri for uri in completed + plan["unchanged"]
+        if uri in imported or uri not in analyzed or (index is not None and not index.has_source(uri))
+    ]
+    if pending:
+        analyze_sources(corpus_resource_name, pending, index_lexical=HYBRID_RETRIEVAL_ENABLED)
+
+    path_results = result["path_results"]
+    path_results += [
+        {"path": uri, "status": "failed", "batch": None, "attempts": 0,
+         "error": f"No se pudo borrar la version anterior: {error}"}
+        for uri, error in delete_errors.items()
+    ]
+    path_results += [
+        {"path": uri, "status": "unchanged", "batch": None, "attempts": 0, "error": ""}
+        for uri in plan["unchanged"]
+    ]
+
+    return {
+        **result,
+        "failed": result["failed"] + len(delete_errors),
+        "skipped": result["skipped"] + len(plan["unchanged"]),
+        "unchanged": len(plan["unchanged"]),
+        "replaced": len(plan["stale"]) - len(delete_errors),
+        "path_results": path_results,
+    }
@@ -0,0 +1,251 @@
+import json
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from ..state_store import connect
+from .ingestion import import_paths_incremental
+from .query_cache import query_cache
+
+from ..config import (
+    ADD_DATA_BATCH_SIZE,
+    INGESTION_JOB_HISTORY,
+    INGESTION_MAX_CONCURRENT_JOBS,
+    INGESTION_MAX_PENDING_JOBS,
+)
+
+logger = logging.getLogger(__name__)
+
+_ACTIVE_STATES = ("queued", "running")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ingestion_jobs (
+    job_id TEXT PRIMARY KEY,
+    corpus_name TEXT NOT NULL,
+    corpus_resource_name TEXT NOT NULL,
+    paths TEXT NOT NULL,
+    state TEXT NOT NULL,
+    total_paths INTEGER NOT NULL,
+    batches_total INTEGER NOT NULL,
+    batches_done INTEGER NOT NULL DEFAULT 0,
+    imported INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    skipped INTEGER NOT NULL DEFAULT 0,
+    unchanged INTEGER NOT NULL DEFAULT 0,
+    replaced INTEGER NOT NULL DEFAULT 0,
+    error TEXT NOT NULL DEFAULT '',
+    path_results TEXT NOT NULL DEFAULT '[]',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+# Columnas agregadas despues de la primera version de la tabla
+_MIGRATIONS = (
+    "ALTER TABLE ingestion_jobs ADD COLUMN unchanged INTEGER NOT NULL DEFAULT 0",
+    "ALTER TABLE ingestion_jobs ADD COLUMN replaced INTEGER NOT NULL DEFAULT 0",
+)
+
+
+class IngestionJobManager:
+    """
+    Jobs de ingesta en segundo plano con una tabla SQLite persistida.
+    Un pool acotado ejecuta los jobs; al iniciar se retoman los que quedaron en cola o en ejecucion.
+    """
+
+    def __init__(
+            self,
+            db_file: str = "ingestion_jobs.sqlite",
+            max_concurrent_jobs: int = INGESTION_MAX_CONCURRENT_JOBS,
+            max_pending_jobs: int = INGESTION_MAX_PENDING_JOBS):
+        self.db_file = db_file
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self.max_pending_jobs = max_pending_jobs
+        self._conn = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.RLock()
+
+    def _db(self):
+        # Se abre en el primer uso y se retoman los jobs interrumpidos por un reinicio
+        if self._conn is None:
+            with self._lock:
+                if self._conn is None:
+                    conn = connect(self.db_file)
+                    conn.execute(_SCHEMA)
+                    columns = {row["name"] for row in conn.execute("PRAGMA table_info(ingestion_jobs)")}
+                    for migration in _MIGRATIONS:
+                        if migration.split()[5] not in columns:
+                            conn.execute(migration)
+                    self._conn = conn
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_concurrent_jobs,
+                        thread_name_prefix="rag-ingest",
+                    )
+                    self._resume()
+        return self._conn
+
+    def _resume(self) -> None:
+        rows = self._conn.execute(
+            "SELECT job_id FROM ingestion_jobs WHERE state IN (?, ?) ORDER BY created_at",
+            _ACTIVE_STATES,
+        ).fetchall()
+        for row in rows:
+            logger.info(f"Resuming ingestion job {row['job_id']}")
+            self._conn.execute(
+                "UPDATE ingestion_jobs SET state = 'queued', updated_at = ? WHERE job_id = ?",
+                (time.time(), row["job_id"]),
+            )
+            self._executor.submit(self._run, row["job_id"])
+
+    def _update(self, job_id: str, **fields) -> None:
+        fields["updated_at"] = time.time()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._db().execute(
+                f"UPDATE ingestion_jobs SET {columns} WHERE job_id = ?",
+                (*fields.values(), job_id),
+            )
+
+    @staticmethod
+    def _to_dict(row) -> dict:
+        job = dict(row)
+        job["paths"] = json.loads(job["paths"])
+        job["path_results"] = json.loads(job["path_results"])
+        return job
+
+    def submit(self, corpus_name: str, corpus_resource_name: str, paths: List[str]) -> dict:
+        """
+        Registrar un job de ingesta y encolarlo para su ejecucion en segundo plano
+
+        Args:
+            corpus_name (str): Nombre del corpus indicado por el usuario
+            corpus_resource_name (str): Nombre de recurso del corpus
+            paths (List[str]): Paths ya validados
+
+        Returns:
+            dict: Job registrado
+
+        Raises:
+            RuntimeError: Si ya hay demasiados jobs en cola o en ejecucion
+        """
+        now = time.time()
+        job_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            conn = self._db()
+            pending = conn.execute(
+                "SELECT COUNT(*) FROM ingestion_jobs WHERE state IN (?, ?)", _ACTIVE_STATES
+            ).fetchone()[0]
+            if pending >= self.max_pending_jobs:
+                raise RuntimeError(
+                    f"Hay {pending} importaciones pendientes, intentar nuevamente cuando terminen"
+                )
+            conn.execute(
+                "INSERT INTO ingestion_jobs (job_id, corpus_name, corpus_resource_name, paths, state,"
+                " total_paths, batches_total, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, 'queued', ?, ?, ?, ?)",
+                (
+                    job_id, corpus_name, corpus_resource_name, json.dumps(paths), len(paths),
+                    -(-len(paths) // ADD_DATA_BATCH_SIZE), now, now,
+                ),
+            )
+            self._executor.submit(self._run, job_id)
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Job con el id indicado, o None si no existe."""
+        with self._lock:
+            row = self._db().execute(
+                "SELECT * FROM ingestion_jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def recent(self, limit: int = 10, corpus_name: str = "") -> List[dict]:
+        """Jobs mas recientes, opcionalmente solo los de un corpus."""
+        query = "SELECT * FROM ingestion_jobs"
+        params: tuple = ()
+        if corpus_name:
+            query += " WHERE corpus_name = ?"
+            params = (corpus_name,)
+        with self._lock:
+            rows = self._db().execute(
+                query + " ORDER BY created_at DESC LIMIT ?", (*params, limit)
+            ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def _run(self, job_id: str) -> None:
+        job = self.get(job_id)
+        if job is None or job["state"] not in _ACTIVE_STATES:
+            return
+        self._update(job_id, state="running", attempts=job["attempts"] + 1,
+                     batches_done=0, imported=0, failed=0, skipped=0, unchanged=0, replaced=0, error="")
+
+        progress = {"batches_done": 0, "imported": 0, "failed": 0, "skipped": 0}
+        progress_lock = threading.Lock()
+
+        def on_batch_done(batch: dict) -> None:
+            # Publicar el avance de cada lote para la tool de estado
+            with progress_lock:
+                progress["batches_done"] += 1
+                for key in ("imported", "failed", "skipped"):
+                    progress[key] += batch[key]
+                snapshot = dict(progress)
+            self._update(job_id, **snapshot)
+
+        def on_plan(plan: dict) -> None:
+            # Los prefijos se expanden a archivos: recalcular la cantidad de lotes
+            self._update(
+                job_id,
+                batches_total=-(-len(plan["to_import"]) // ADD_DATA_BATCH_SIZE),
+                unchanged=len(plan["unchanged"]),
+            )
+
+        try:
+            ingestion = import_paths_incremental(
+                job["corpus_resource_name"], job["paths"], on_plan=on_plan, on_batch_done=on_batch_done
+            )
+        except Exception as e:
+            logger.error(f"Error in ingestion job {job_id}: {str(e)}")
+            self._update(job_id, state="error", error=str(e) or type(e).__name__)
+            return
+        finally:
+            # Los resultados cacheados de este corpus ya no son validos
+            query_cache.invalidate_corpus(job["corpus_resource_name"])
+
+        if ingestion["failed"] and not ingestion["imported"] and not ingestion["skipped"]:
+            state = "error"
+        elif ingestion["failed"]:
+            state = "partial"
+        else:
+            state = "success"
+        errors = sorted({batch["error"] for batch in ingestion["batches"] if batch["error"]})
+        self._update(
+            job_id,
+            state=state,
+            batches_done=len(ingestion["batches"]),
+            imported=ingestion["imported"],
+            failed=ingestion["failed"],
+            skipped=ingestion["skipped"],
+            unchanged=ingestion["unchanged"],
+            replaced=ingestion["replaced"],
+            error="; ".join(errors),
+            path_results=json.dumps(ingestion["path_results"]),
+        )
+        self._prune()
+
+    def _prune(self) -> None:
+        # Conservar solo los INGESTION_JOB_HISTORY jobs terminados mas recientes
+        with self._lock:
+            self._db().execute(
+                "DELETE FROM ingestion_jobs WHERE state NOT IN (?, ?) AND job_id NOT IN ("
+                " SELECT job_id FROM ingestion_jobs WHERE state NOT IN (?, ?)"
+                " ORDER BY created_at DESC LIMIT ?)",
+                (*_ACTIVE_STATES, *_ACTIVE_STATES, INGESTION_JOB_HISTORY),
+            )
+
+
+# Jobs de ingesta compartidos por todas las sesiones del proceso
+ingestion_jobs = IngestionJobManager()
@@ -0,0 +1,125 @@
+import threading
+import time
+from typing import Dict, Iterable, Tuple
+
+from ..rag_backend import rag
+from ..state_store import connect
+from ..telemetry import span
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS manifest_entries (
+        corpus TEXT NOT NULL,
+        source_uri TEXT NOT NULL,
+        fingerprint TEXT NOT NULL,
+        rag_file_name TEXT NOT NULL,
+        updated_at REAL NOT NULL,
+        PRIMARY KEY (corpus, source_uri)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS manifest_corpora (
+        corpus TEXT PRIMARY KEY,
+        seeded_at REAL NOT NULL
+    )
+    """,
+)
+
+
+def rag_file_source_uri(rag_file) -> str:
+    """URI de origen de un archivo del corpus ('' si el backend no la informa)."""
+    return rag_file.source_uri if hasattr(rag_file, "source_uri") else ""
+
+
+class IngestionManifest:
+    """
+    Manifiesto de ingesta por corpus: source_uri -> (huella del contenido, archivo rag).
+    Se persiste en SQLite y la primera vez se siembra con los source_uri de rag.list_files.
+    """
+
+    def __init__(self, db_file: str = "ingestion_manifest.sqlite"):
+        self.db_file = db_file
+        self._conn = None
+        self._lock = threading.RLock()
+
+    def _db(self):
+        if self._conn is None:
+            with self._lock:
+                if self._conn is None:
+                    conn = connect(self.db_file)
+                    for statement in _SCHEMA:
+                        conn.execute(statement)
+                    self._conn = conn
+        return self._conn
+
+    def _seed(self, corpus: str) -> None:
+        # Los archivos ya importados quedan registrados sin huella conocida
+        with span("remote", method="list_files"):
+            files = list(rag.list_files(corpus))
+        now = time.time()
+        self._db().executemany(
+            "INSERT OR IGNORE INTO manifest_entries VALUES (?, ?, '', ?, ?)",
+            [
+                (corpus, rag_file_source_uri(rag_file), rag_file.name, now)
+                for rag_file in files if rag_file_source_uri(rag_file)
+            ],
+        )
+        self._db().execute("INSERT OR REPLACE INTO manifest_corpora VALUES (?, ?)", (corpus, now))
+
+    def entries(self, corpus: str) -> Dict[str, Tuple[str, str]]:
+        """
+        Entradas del manifiesto de un corpus, sembrandolo si es la primera vez
+
+        Args:
+            corpus (str): Nombre de recurso del corpus
+
+        Returns:
+            Dict[str, Tuple[str, str]]: source_uri -> (huella, nombre del archivo rag)
+        """
+        with self._lock:
+            conn = self._db()
+            seeded = conn.execute(
+                "SELECT 1 FROM manifest_corpora WHERE corpus = ?", (corpus,)
+            ).fetchone()
+            if not seeded:
+                self._seed(corpus)
+            rows = conn.execute(
+                "SELECT source_uri, fingerprint, rag_file_name FROM manifest_entries WHERE corpus = ?",
+                (corpus,),
+            ).fetchall()
+        return {row["source_uri"]: (row["fingerprint"], row["rag_file_name"]) for row in rows}
+
+    def record(self, corpus: str, entries: Iterable[Tuple[str, str, str]]) -> None:
+        """Registrar (source_uri, huella, archivo rag) de archivos importados."""
+        now = time.time()
+        with self._lock:
+            self._db().executemany(
+                "INSERT OR REPLACE INTO manifest_entries VALUES (?, ?, ?, ?, ?)",
+                [(corpus, uri, fingerprint, rag_file_name, now) for uri, fingerprint, rag_file_name in entries],
+            )
+
+    def forget(self, corpus: str, source_uris: Iterable[str]) -> None:
+        """Quitar archivos del manifiesto (por ejemplo al borrarlos del corpus)."""
+        with self._lock:
+            self._db().executemany(
+                "DELETE FROM manifest_entries WHERE corpus = ? AND source_uri = ?",
+                [(corpus, uri) for uri in source_uris],
+            )
+
+    def forget_rag_files(self, corpus: str, rag_file_names: Iterable[str]) -> None:
+        """Quitar del manifiesto las entradas de los archivos rag indicados."""
+        with self._lock:
+            self._db().executemany(
+                "DELETE FROM manifest_entries WHERE corpus = ? AND rag_file_name = ?",
+                [(corpus, name) for name in rag_file_names],
+            )
+
+    def drop_corpus(self, corpus: str) -> None:
+        """Borrar el manifiesto completo de un corpus."""
+        with self._lock:
+            self._db().execute("DELETE FROM manifest_entries WHERE corpus = ?", (corpus,))
+            self._db().execute("DELETE FROM manifest_corpora WHERE corpus = ?", (corpus,))
+
+
+# Manifiesto compartido por todas las ingestas del proceso
+ingestion_manifest = IngestionManifest()
@@ -0,0 +1,261 @@
+"""
+Indice invertido BM25 local sobre el texto de los chunks ingresados con add_data, para la busqueda hibrida.
+Las postings de cada termino son dos arrays compactos (ids de chunk y frecuencias); borrar un archivo marca
+sus chunks como eliminados y el indice se reconstruye cuando los eliminados superan LEXICAL_COMPACT_RATIO.
+Cada corpus se guarda en su propio archivo dentro de LOCAL_STATE_DIR.
+"""
+import hashlib
+import logging
+import math
+import os
+import pickle
+import threading
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..state_store import state_path
+from ..text import tokenize
+
+from ..config import (
+    BM25_B,
+    BM25_K1,
+    LEXICAL_COMPACT_RATIO,
+)
+
+logger = logging.getLogger(__name__)
+
+_FORMAT_VERSION = 1
+
+
+class LexicalIndex:
+    """Indice invertido de un corpus: termino -> (ids de chunk, frecuencias)."""
+
+    def __init__(self):
+        self._vocab: Dict[str, int] = {}
+        self._post_docs: List[array] = []
+        self._post_tfs: List[array] = []
+        self._df = array("I")  # Chunks vivos que contienen cada termino (las postings incluyen eliminados)
+        self._doc_len = array("I")
+        self._doc_source: List[str] = []
+        self._texts: List[str] = []
+        self._deleted: set = set()
+        self._by_source: Dict[str, List[int]] = {}
+        self._total_len = 0
+        self._lock = threading.RLock()
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self._texts) - len(self._deleted)
+
+    def has_source(self, source_uri: str) -> bool:
+        """True si el archivo ya tiene chunks indexados."""
+        with self._lock:
+            return source_uri in self._by_source
+
+    def _add_chunk(self, source_uri: str, text: str) -> None:
+        doc_id = len(self._texts)
+        counts = Counter(tokenize(text))
+        for term, tf in counts.items():
+            term_id = self._vocab.get(term)
+            if term_id is None:
+                term_id = self._vocab[term] = len(self._post_docs)
+                self._post_docs.append(array("I"))
+                self._post_tfs.append(array("I"))
+                self._df.append(0)
+            self._post_docs[term_id].append(doc_id)
+            self._post_tfs[term_id].append(tf)
+            self._df[term_id] += 1
+        length = sum(counts.values())
+        self._doc_len.append(length)
+        self._total_len += length
+        self._doc_source.append(source_uri)
+        self._texts.append(text)
+        self._by_source.setdefault(source_uri, []).append(doc_id)
+
+    def add(self, source_uri: str, chunks: Iterable[str]) -> int:
+        """
+        Indexar los chunks de un archivo, reemplazando los que ya tuviera
+
+        Args:
+            source_uri (str): URI de origen del archivo
+            chunks (Iterable[str]): Texto de cada chunk
+
+        Returns:
+            int: Cantidad de chunks indexados
+        """
+        with self._lock:
+            self.remove(source_uri)
+            added = 0
+            for chunk in chunks:
+                self._add_chunk(source_uri, chunk)
+                added += 1
+            self.dirty = True
+            return added
+
+    def remove(self, source_uri: str) -> int:
+        """Marcar como eliminados los chunks de un archivo; devuelve la cantidad."""
+        with self._lock:
+            doc_ids = self._by_source.pop(source_uri, [])
+            for doc_id in doc_ids:
+                self._deleted.add(doc_id)
+                self._total_len -= self._doc_len[doc_id]
+                for term in set(tokenize(self._texts[doc_id])):
+                    self._df[self._vocab[term]] -= 1
+            if doc_ids:
+                self.dirty = True
+                if len(self._deleted) > LEXICAL_COMPACT_RATIO * len(self._texts):
+                    self.compact()
+            return len(doc_ids)
+
+    def compact(self) -> None:
+        """Reconstruir el indice sin los chunks eliminados."""
+        with self._lock:
+            rebuilt = LexicalIndex()
+            for doc_id, (source_uri, text) in enumerate(zip(self._doc_source, self._texts)):
+                if doc_id not in self._deleted:
+                    rebuilt._add_chunk(source_uri, text)
+            for name in ("_vocab", "_post_docs", "_post_tfs", "_df", "_doc_len", "_doc_source",
+                         "_texts", "_deleted", "_by_source", "_total_len"):
+                setattr(self, name, getattr(rebuilt, name))
+            self.dirty = True
+
+    def search(
+            self,
+            query: str,
+            top_k: int,
+            k1: float = BM25_K1,
+            b: float = BM25_B,
+            sources: Optional[Iterable[str]] = None) -> List[Tuple[str, str, float]]:
+        """
+        Chunks con mayor puntaje BM25 para la consulta
+
+        Args:
+            query (str): Texto de la consulta
+            top_k (int): Cantidad de resultados
+            sources (Optional[Iterable[str]]): Limitar la busqueda a los chunks de estos archivos
+
+        Returns:
+            List[Tuple[str, str, float]]: (source_uri, texto, puntaje) de mayor a menor puntaje
+        """
+        # numpy se importa en el primer uso para no demorar el arranque del agente
+        import numpy as np
+
+        with self._lock:
+            live = len(self)
+            if not live or top_k <= 0:
+                return []
+            doc_len = np.frombuffer(self._doc_len, dtype=np.uintc).astype(np.float32)
+            avg_len = max(self._total_len / live, 1.0)
+            scores = np.zeros(len(self._texts), dtype=np.float32)
+            for term in set(tokenize(query)):
+                term_id = self._vocab.get(term)
+                if term_id is None:
+                    continue
+                docs = np.frombuffer(self._post_docs[term_id], dtype=np.uintc)
+                tfs = np.frombuffer(self._post_tfs[term_id], dtype=np.uintc).astype(np.float32)
+                df = self._df[term_id]
+                idf = math.log1p((live - df + 0.5) / (df + 0.5))
+                scores[docs] += idf * tfs * (k1 + 1.0) / (tfs + k1 * (1.0 - b + b * doc_len[docs] / avg_len))
+            if self._deleted:
+                scores[np.fromiter(self._deleted, dtype=np.int64)] = 0.0
+            if sources is not None:
+                allowed = np.zeros(len(self._texts), dtype=bool)
+                for source_uri in sources:
+                    allowed[self._by_source.get(source_uri, [])] = True
+                scores[~allowed] = 0.0
+
+            candidates = np.flatnonzero(scores > 0)
+            if len(candidates) > top_k:
+                candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+            order = candidates[np.argsort(-scores[candidates], kind="stable")]
+            return [(self._doc_source[i], self._texts[i], float(scores[i])) for i in order]
+
+    def to_state(self) -> dict:
+        with self._lock:
+            return {
+                "version": _FORMAT_VERSION,
+                "vocab": self._vocab,
+                "post_docs": self._post_docs,
+                "post_tfs": self._post_tfs,
+                "doc_len": self._doc_len,
+                "doc_source": self._doc_source,
+                "texts": self._texts,
+                "deleted": self._deleted,
+            }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "LexicalIndex":
+        index = cls()
+        index._vocab = state["vocab"]
+        index._post_docs = state["post_docs"]
+        index._post_tfs = state["post_tfs"]
+        index._doc_len = state["doc_len"]
+        index._doc_source = state["doc_source"]
+        index._texts = state["texts"]
+        index._deleted = state["deleted"]
+        for doc_id, source_uri in enumerate(index._doc_source):
+            if doc_id not in index._deleted:
+                index._by_source.setdefault(source_uri, []).append(doc_id)
+                index._total_len += index._doc_len[doc_id]
+        # Frecuencia de documento solo con los chunks vivos
+        index._df = array("I", (
+            sum(1 for doc_id in docs if doc_id not in index._deleted) for docs in index._post_docs
+        ))
+        return index
+
+
+class LexicalIndexRegistry:
+    """Indices lexicos por corpus, cargados desde disco en el primer uso."""
+
+    def __init__(self, folder: str = "lexical_index"):
+        self.folder = folder
+        self._indexes: Dict[str, LexicalIndex] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, corpus: str) -> str:
+        digest = hashlib.sha1(corpus.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(state_path(self.folder), f"{digest}.idx")
+
+    def get(self, corpus: str) -> LexicalIndex:
+        """Indice del corpus (vacio si todavia no se indexo nada)."""
+        with self._lock:
+            index = self._indexes.get(corpus)
+            if index is None:
+                index = LexicalIndex()
+                path = self._path(corpus)
+                if os.path.exists(path):
+                    try:
+                        with open(path, "rb") as f:
+                            state = pickle.load(f)
+                        if state.get("version") == _FORMAT_VERSION:
+                            index = LexicalIndex.from_state(state)
+                    except Exception as e:
+                        logger.warning(f"Error loading lexical index for {corpus}: {str(e)}")
+                self._indexes[corpus] = index
+            return index
+
+    def flush(self, corpus: str) -> None:
+        """Guardar el indice del corpus si tuvo cambios (escritura atomica)."""
+        index = self._indexes.get(corpus)
+        if index is None or not index.dirty:
+            return
+        path = self._path(corpus)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with index._lock:
+            with open(path + ".tmp", "wb") as f:
+                pickle.dump(index.to_state(), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(path + ".tmp", path)
+            index.dirty = False
+
+    def drop(self, corpus: str) -> None:
+        """Borrar el indice de un corpus eliminado."""
+        with self._lock:
+            self._indexes.pop(corpus, None)
+            path = self._path(corpus)
+            if os.path.exists(path):
+                os.remove(path)
+
+
+# Indices lexicos compartidos por todas las tools del proceso
+lexical_indexes = LexicalIndexRegistry()
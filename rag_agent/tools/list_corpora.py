@@ -1,6 +1,12 @@
-from vertexai import rag
+from ..rag_backend import rag
+from ..telemetry import instrument_tool, span
+from .metadata_index import metadata_index
+from .resilience import is_unavailable, resilient_calls, with_deadline
+from .stale_cache import mark_stale, stale_cache
 from typing import Dict, List, Union
 
+@instrument_tool
+@with_deadline
 def list_corpora() -> dict:
     """
     Lista todos corpus disponibles en Vertex AI
@@ -11,10 +17,15 @@ def list_corpora() -> dict:
             - display_name: nombre del corpus leible para una persona
             - create_time: cuando el corpus fue creado
             - update_time: cuando fue la ultima actualizacion del corpus
+            Si Vertex AI no responde se devuelve el ultimo listado bueno con 'stale' en True
     """
     try:
         # Obtener lista de corpus
-        corpora = rag.list_corpora()
+        with span("remote", method="list_corpora"):
+            corpora = resilient_calls.call("list_corpora", lambda: list(rag.list_corpora()))
+
+        # Mantener la copia local de metadatos al dia con el listado completo
+        metadata_index.sync_corpora(corpora)
 
         # Procesar todo la informaicon del corpus en un formato mas legible
         corpus_info: List[Dict[str, Union[str, int]]] = []
@@ -27,13 +38,20 @@ def list_corpora() -> dict:
             }
             corpus_info.append(corpus_data)
 
-        return {
+        response = {
             "status": "success",
             "message": f"Encontrado {len(corpus_info)} corpora disponible",
             "corpora": corpus_info,
         }
+        stale_cache.put(stale_cache.make_key("list_corpora"), response)
+        return response
 
     except Exception as e:
+        # Con Vertex caido o el circuito abierto, responder con el ultimo listado bueno
+        if is_unavailable(e):
+            cached = stale_cache.get(stale_cache.make_key("list_corpora"), tool="list_corpora")
+            if cached is not None:
+                return mark_stale(*cached, e)
         return {
             "status": "error",
             "message": f"Error al listar corpus: {str(e)}",
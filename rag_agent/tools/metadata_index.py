@@ -0,0 +1,344 @@
+import logging
+import threading
+import time
+from types import SimpleNamespace
+from typing import Dict, Iterable, List, Optional
+
+from ..rag_backend import rag
+from ..state_store import connect
+from ..telemetry import span
+from .resilience import is_unavailable, resilient_calls
+
+from ..config import (
+    METADATA_INDEX_MAX_RESULTS,
+    METADATA_INDEX_TTL_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS corpora (
+        resource_name TEXT PRIMARY KEY,
+        display_name TEXT NOT NULL,
+        create_time TEXT NOT NULL DEFAULT '',
+        update_time TEXT NOT NULL DEFAULT '',
+        files_refreshed_at REAL NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS rag_files (
+        corpus TEXT NOT NULL,
+        name TEXT NOT NULL,
+        file_id TEXT NOT NULL,
+        display_name TEXT NOT NULL,
+        source_uri TEXT NOT NULL,
+        create_time TEXT NOT NULL,
+        update_time TEXT NOT NULL,
+        PRIMARY KEY (corpus, name)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS rag_files_display_name ON rag_files (corpus, display_name COLLATE NOCASE)",
+    "CREATE INDEX IF NOT EXISTS rag_files_source_uri ON rag_files (corpus, source_uri)",
+    """
+    CREATE TABLE IF NOT EXISTS file_metadata (
+        corpus TEXT NOT NULL,
+        source_uri TEXT NOT NULL,
+        field TEXT NOT NULL,
+        value TEXT NOT NULL,
+        PRIMARY KEY (corpus, source_uri, field, value)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS file_metadata_value ON file_metadata (corpus, field, value)",
+)
+
+
+def _file_row(corpus: str, rag_file) -> tuple:
+    return (
+        corpus,
+        rag_file.name,
+        rag_file.name.split("/")[-1],
+        str(getattr(rag_file, "display_name", "") or ""),
+        str(getattr(rag_file, "source_uri", "") or ""),
+        str(getattr(rag_file, "create_time", "") or ""),
+        str(getattr(rag_file, "update_time", "") or ""),
+    )
+
+
+class MetadataIndex:
+    """
+    Copia local en SQLite de los corpora y sus archivos, para buscar documentos sin listar el corpus remoto.
+    Los archivos de un corpus se vuelven a sincronizar con rag.list_files cuando pasan
+    METADATA_INDEX_TTL_SECONDS, y las tools que crean o borran archivos la actualizan al momento.
+    """
+
+    def __init__(self, db_file: str = "metadata_index.sqlite", ttl_seconds: float = METADATA_INDEX_TTL_SECONDS):
+        self.db_file = db_file
+        self.ttl_seconds = ttl_seconds
+        self._conn = None
+        self._lock = threading.RLock()
+
+    def _db(self):
+        if self._conn is None:
+            with self._lock:
+                if self._conn is None:
+                    conn = connect(self.db_file)
+                    for statement in _SCHEMA:
+                        conn.execute(statement)
+                    self._conn = conn
+        return self._conn
+
+    def upsert_corpus(self, corpus) -> None:
+        """Registrar o actualizar un corpus (objeto devuelto por rag.create_corpus / rag.list_corpora)."""
+        with self._lock:
+            self._db().execute(
+                "INSERT INTO corpora (resource_name, display_name, create_time, update_time) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT (resource_name) DO UPDATE SET display_name = excluded.display_name,"
+                " create_time = excluded.create_time, update_time = excluded.update_time",
+                (
+                    corpus.name,
+                    str(getattr(corpus, "display_name", "") or ""),
+                    str(getattr(corpus, "create_time", "") or ""),
+                    str(getattr(corpus, "update_time", "") or ""),
+                ),
+            )
+
+    def sync_corpora(self, corpora: Iterable) -> None:
+        """Reemplazar la lista de corpora por un listado completo de rag.list_corpora."""
+        corpora = list(corpora)
+        with self._lock:
+            conn = self._db()
+            conn.execute("BEGIN")
+            try:
+                for corpus in corpora:
+                    self.upsert_corpus(corpus)
+                names = {corpus.name for corpus in corpora}
+                stale = [
+                    row["resource_name"] for row in conn.execute("SELECT resource_name FROM corpora")
+                    if row["resource_name"] not in names
+                ]
+                for name in stale:
+                    self._drop(name)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def corpora(self) -> List[SimpleNamespace]:
+        """Corpora de la copia local, con los mismos atributos que los de rag.list_corpora (name, display_name, ...)."""
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT resource_name, display_name, create_time, update_time FROM corpora ORDER BY resource_name"
+            ).fetchall()
+        return [
+            SimpleNamespace(
+                name=row["resource_name"],
+                display_name=row["display_name"],
+                create_time=row["create_time"],
+                update_time=row["update_time"],
+            )
+            for row in rows
+        ]
+
+    def sync_files(self, corpus: str, rag_files: Iterable) -> None:
+        """
+        Sincronizar los archivos de un corpus con un listado completo de rag.list_files:
+        se insertan o actualizan los que cambiaron y se quitan los que ya no existen
+
+        Args:
+            corpus (str): Nombre de recurso del corpus
+            rag_files (Iterable): Archivos del corpus (se recorren una sola vez)
+        """
+        # Recorrer el listado remoto antes de tomar el lock para no bloquear las busquedas
+        rows = [_file_row(corpus, rag_file) for rag_file in rag_files]
+        with self._lock:
+            conn = self._db()
+            conn.execute("BEGIN")
+            try:
+                conn.execute("CREATE TEMP TABLE IF NOT EXISTS seen_files (name TEXT PRIMARY KEY)")
+                conn.execute("DELETE FROM seen_files")
+                for row in rows:
+                    conn.execute(
+                        "INSERT INTO rag_files VALUES (?, ?, ?, ?, ?, ?, ?)"
+                        " ON CONFLICT (corpus, name) DO UPDATE SET display_name = excluded.display_name,"
+                        " source_uri = excluded.source_uri, create_time = excluded.create_time,"
+                        " update_time = excluded.update_time"
+                        " WHERE rag_files.update_time != excluded.update_time"
+                        " OR rag_files.display_name != excluded.display_name",
+                        row,
+                    )
+                    conn.execute("INSERT OR IGNORE INTO seen_files VALUES (?)", (row[1],))
+                conn.execute(
+                    "DELETE FROM rag_files WHERE corpus = ? AND name NOT IN (SELECT name FROM seen_files)",
+                    (corpus,),
+                )
+                conn.execute(
+                    "INSERT INTO corpora (resource_name, display_name, files_refreshed_at) VALUES (?, '', ?)"
+                    " ON CONFLICT (resource_name) DO UPDATE SET files_refreshed_at = excluded.files_refreshed_at",
+                    (corpus, time.time()),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def refresh(self, corpus: str, force: bool = False) -> bool:
+        """
+        Volver a listar los archivos del corpus si la copia local vencio
+
+        Args:
+            corpus (str): Nombre de recurso del corpus
+            force (bool): Listar aunque la copia local siga vigente
+
+        Returns:
+            bool: True si se hizo el listado remoto; False si la copia local seguia vigente, o si Vertex no
+                respondio y se siguio usando la copia local vencida (sin force)
+        """
+        with self._lock:
+            row = self._db().execute(
+                "SELECT files_refreshed_at FROM corpora WHERE resource_name = ?", (corpus,)
+            ).fetchone()
+        if not force and row and time.time() - row["files_refreshed_at"] < self.ttl_seconds:
+            return False
+        try:
+            with span("remote", method="list_files"):
+                rag_files = resilient_calls.call("list_files", lambda: list(rag.list_files(corpus)))
+        except Exception as e:
+            # Con Vertex caido o el circuito abierto, una copia local ya sincronizada sirve mejor que un error
+            if is_unavailable(e) and not force and row and row["files_refreshed_at"]:
+                logger.warning(f"Using stale file list for {corpus}, list_files failed: {str(e)}")
+                return False
+            raise
+        self.sync_files(corpus, rag_files)
+        return True
+
+    def remove_files(self, corpus: str, names: Iterable[str]) -> None:
+        """Quitar archivos borrados del corpus."""
+        params = [(corpus, name) for name in names]
+        with self._lock:
+            self._db().executemany(
+                "DELETE FROM file_metadata WHERE corpus = ?1 AND source_uri IN"
+                " (SELECT source_uri FROM rag_files WHERE corpus = ?1 AND name = ?2)",
+                params,
+            )
+            self._db().executemany("DELETE FROM rag_files WHERE corpus = ? AND name = ?", params)
+
+    def set_metadata(self, corpus: str, source_uri: str, metadata: Dict[str, List[str]]) -> None:
+        """
+        Reemplazar los metadatos (materia, nivel, eje, ...) de un archivo
+
+        Args:
+            corpus (str): Nombre de recurso del corpus
+            source_uri (str): URI de origen del archivo
+            metadata (Dict[str, List[str]]): Valores normalizados de cada campo
+        """
+        with self._lock:
+            conn = self._db()
+            conn.execute("BEGIN")
+            try:
+                conn.execute("DELETE FROM file_metadata WHERE corpus = ? AND source_uri = ?", (corpus, source_uri))
+                conn.executemany(
+                    "INSERT OR IGNORE INTO file_metadata VALUES (?, ?, ?, ?)",
+                    [(corpus, source_uri, field, value) for field, values in metadata.items() for value in values],
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def analyzed_sources(self, corpus: str) -> set:
+        """source_uri de los archivos del corpus que ya tienen metadatos."""
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT DISTINCT source_uri FROM file_metadata WHERE corpus = ?", (corpus,)
+            ).fetchall()
+        return {row["source_uri"] for row in rows}
+
+    def filter_files(self, corpus: str, filters: Dict[str, str]) -> List[dict]:
+        """
+        Archivos del corpus que tienen todos los metadatos indicados (el filtro es por archivo, no por chunk)
+
+        Args:
+            corpus (str): Nombre de recurso del corpus
+            filters (Dict[str, str]): Campo -> valor normalizado, por ejemplo {"subject": "matematica", "level": "2"}
+
+        Returns:
+            List[dict]: Archivos encontrados (file_id, source_uri)
+        """
+        query = "SELECT f.file_id, f.source_uri FROM rag_files f WHERE f.corpus = ?"
+        params: list = [corpus]
+        for field, value in filters.items():
+            query += (
+                " AND EXISTS (SELECT 1 FROM file_metadata m WHERE m.corpus = f.corpus"
+                " AND m.field = ? AND m.value = ? AND m.source_uri = f.source_uri)"
+            )
+            params += [field, value]
+        with self._lock:
+            rows = self._db().execute(query, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def _drop(self, corpus: str) -> None:
+        self._db().execute("DELETE FROM file_metadata WHERE corpus = ?", (corpus,))
+        self._db().execute("DELETE FROM rag_files WHERE corpus = ?", (corpus,))
+        self._db().execute("DELETE FROM corpora WHERE resource_name = ?", (corpus,))
+
+    def drop_corpus(self, corpus: str) -> None:
+        """Quitar un corpus borrado y todos sus archivos."""
+        with self._lock:
+            self._drop(corpus)
+
+    def find_files(
+            self,
+            corpus: str,
+            display_name: str = "",
+            source_prefix: str = "",
+            limit: int = METADATA_INDEX_MAX_RESULTS,
+            name_glob: str = "") -> List[dict]:
+        """
+        Buscar archivos de un corpus en la copia local
+
+        Args:
+            corpus (str): Nombre de recurso del corpus
+            display_name (str): Texto contenido en el nombre del archivo (sin distinguir mayusculas)
+            source_prefix (str): Prefijo del source_uri, por ejemplo "gs://bucket/matematica/"
+            limit (int): Cantidad maxima de resultados
+            name_glob (str): Patron glob sobre el nombre completo del archivo, por ejemplo "nivel_4_*.json"
+
+        Returns:
+            List[dict]: Archivos encontrados (file_id, name, display_name, source_uri, create_time, update_time)
+        """
+        query = (
+            "SELECT file_id, name, display_name, source_uri, create_time, update_time"
+            " FROM rag_files WHERE corpus = ?"
+        )
+        params: list = [corpus]
+        if display_name:
+            query += " AND display_name LIKE ? ESCAPE '\\'"
+            escaped = display_name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params.append(f"%{escaped}%")
+        if name_glob:
+            query += " AND display_name GLOB ?"
+            params.append(name_glob)
+        if source_prefix:
+            # Rango sobre el indice (corpus, source_uri) en lugar de LIKE
+            query += " AND source_uri >= ? AND source_uri < ?"
+            params += [source_prefix, source_prefix + "\U0010ffff"]
+        query += " ORDER BY display_name LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._db().execute(query, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_file(self, corpus: str, file_id: str) -> Optional[dict]:
+        """Archivo con el id indicado, o None si no esta en la copia local."""
+        with self._lock:
+            row = self._db().execute(
+                "SELECT file_id, name, display_name, source_uri, create_time, update_time"
+                " FROM rag_files WHERE corpus = ? AND file_id = ?",
+                (corpus, file_id),
+            ).fetchone()
+        return dict(row) if row else None
+
+
+# Copia local de metadatos compartida por todas las tools del proceso
+metadata_index = MetadataIndex()
@@ -0,0 +1,112 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from ..config import (
+    QUERY_CACHE_MAX_ENTRIES,
+    QUERY_CACHE_TTL_SECONDS,
+)
+
+
+def normalize_query(query: str) -> str:
+    """Normalizar el texto de la consulta para que variaciones triviales compartan la misma entrada."""
+    return " ".join(query.casefold().split())
+
+
+class QueryCache:
+    """
+    Cache LRU con TTL para los resultados de rag_query.
+    Cada corpus tiene un numero de version que forma parte de la llave; al invalidar un corpus
+    su version aumenta y las entradas anteriores dejan de ser visibles (y se eliminan).
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+        }
+
+    def make_key(self, corpus_resource_name: str, query: str, *config: Hashable) -> Tuple:
+        """
+        Construir la llave de cache
+
+        Args:
+            corpus_resource_name (str): Nombre de recurso del corpus ya resuelto
+            query (str): Texto de la consulta
+            config: Parametros de recuperacion (top_k, umbral de distancia, ...)
+
+        Returns:
+            Tuple: Llave que incluye la version actual del corpus
+        """
+        with self._lock:
+            version = self._versions.get(corpus_resource_name, 0)
+        return (corpus_resource_name, version, normalize_query(query)) + tuple(config)
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        if self.max_entries <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at >= self.ttl_seconds:
+                del self._entries[key]
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return value
+
+    def put(self, key: Tuple, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            # Descartar resultados calculados con una version anterior del corpus
+            if key[1] != self._versions.get(key[0], 0):
+                return
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate_corpus(self, corpus_resource_name: str) -> None:
+        """Invalidar todas las entradas de un corpus (por ejemplo despues de add_data o delete_document)."""
+        with self._lock:
+            self._versions[corpus_resource_name] = self._versions.get(corpus_resource_name, 0) + 1
+            self._stats["invalidations"] += 1
+            for key in [k for k in self._entries if k[0] == corpus_resource_name]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Contadores de la cache para poder dimensionarla."""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hit_rate": (self._stats["hits"] / lookups) if lookups else 0.0,
+            }
+
+
+query_cache = QueryCache(
+    max_entries=QUERY_CACHE_MAX_ENTRIES,
+    ttl_seconds=QUERY_CACHE_TTL_SECONDS,
+)
@@ -1,52 +1,65 @@
 import logging
+from typing import Dict, List, Optional, Tuple
 
 from google.adk.tools.tool_context import ToolContext
-from vertexai import rag
+from ..rag_backend import rag
+from ..telemetry import instrument_tool, span
+from .concurrency import run_concurrently
+from .context_merge import compact_contexts, context_tokens, reciprocal_rank_fusion
+from .document_metadata import normalize_value
+from .lexical_index import lexical_indexes
+from .metadata_index import metadata_index
+from .query_cache import normalize_query, query_cache
+from .rerank import rerank
+from .resilience import is_unavailable, resilient_calls, with_deadline
+from .stale_cache import mark_stale, stale_cache
 from .utils import check_corpus_exists, get_corpus_resource_name
 
 from ..config import (
+    ADAPTIVE_MIN_RESULTS,
+    ADAPTIVE_RETRIEVAL_ENABLED,
+    ADAPTIVE_RETRIEVAL_STEPS,
     DEFAULT_DISTANCE_THRESHOLD,
     DEFAULT_TOP_K,
+    HYBRID_RETRIEVAL_ENABLED,
+    RERANK_ENABLED,
+    RERANK_FETCH_K,
+    RERANK_WEIGHT,
+    RETRIEVAL_MAX_DISTANCE_THRESHOLD,
+    RETRIEVAL_MAX_TOP_K,
 )
 
-def rag_query(
-        corpus_name: str,
+logger = logging.getLogger(__name__)
+
+def _vector_contexts(
+        corpus_resource_name: str,
         query: str,
-        tool_context: ToolContext) -> dict:
-    """
-    Ai Vertex Rag Corpus tenga la capacidad de responder onsultas sobre la informacion almacenada en un corpus
-    :param corpus_name: Nombre del corpus con el que se esta respondiendo u obteniendo respuesta
-    :param query: Texto que se estara buscando en el corpus para la respuesta
-    :param tool_context: Contexto de la herramienta
-    :return:
-        dict: Informacion sobre la respuesta y su status
-    """
-    try:
-        # Verificar si el corpus existe
-        if not check_corpus_exists(corpus_name, tool_context):
-            return {
-                "status": "error",
-                "message": f"Corpus '{corpus_name}' no existe",
-                "corpus_name": corpus_name
-            }
-        # Obtener el nombre de recurso del corpus
-        corpus_resource_name = get_corpus_resource_name(corpus_name)
-
-        # Configurar parametros de recuperacion (retrieval)
-        rag_retrieval_config = rag.RagRetrievalConfig(
-            top_k=DEFAULT_TOP_K,
-            filter=rag.Filter(vector_distance_threshold=DEFAULT_DISTANCE_THRESHOLD)  # Se refiere a la busqueda de vectores en relacion a nuestra consulta
-        )
+        top_k: int,
+        distance_threshold: float,
+        files: Optional[List[dict]] = None) -> List[dict]:
+    """Contextos de la busqueda vectorial de rag.retrieval_query (solo sobre files si se indica)."""
+    # Configurar parametros de recuperacion (retrieval)
+    rag_retrieval_config = rag.RagRetrievalConfig(
+        top_k=top_k,
+        filter=rag.Filter(vector_distance_threshold=distance_threshold)  # Se refiere a la busqueda de vectores en relacion a nuestra consulta
+    )
 
-        # Realizar la consulta
-        print("Realizando la recuperacion de la consulta...")
-        response = rag.retrieval_query(
-            rag_resources=[rag.RagResource(rag_corpus=corpus_resource_name)],
+    # Realizar la consulta
+    logger.debug("Realizando la recuperacion de la consulta...")
+    rag_resources = [rag.RagResource(
+        rag_corpus=corpus_resource_name,
+        rag_file_ids=[rag_file["file_id"] for rag_file in files] if files is not None else None
+    )]
+    with span("remote", method="retrieval_query"):
+        # Con plazo, reintentos de errores transitorios y hedging opcional
+        response = resilient_calls.call("retrieval_query", lambda: rag.retrieval_query(
+            rag_resources=rag_resources,
             text=query,
             rag_retrieval_config=rag_retrieval_config
-        )
-        # Procesar la respuesta de la consulta de una manera mas vistoza
-        results = []
+        ))
+    # Procesar la respuesta de la consulta de una manera mas vistoza
+    results = []
+    with span("post_process"):
         if hasattr(response, 'contexts') and response.contexts:
             for ctx_group in response.contexts.contexts:
                 result = {
@@ -62,27 +75,243 @@ def rag_query(
                     "score": ctx_group.score if hasattr(ctx_group, "score") else 0.0
                 }
                 results.append(result)
-        # Si no se consigue ningun resultado
-        if not results:
-            return {
-                "status": "error",
-                "message": f"No se encontraron resultados para la consulta en el corpus {corpus_name} para la consulta {query}",
-                "query": query,
-                "corpus_name": corpus_name,
-                "results": [],
-                "results_count": 0
-            }
+    return results
+
+
+def _lexical_contexts(
+        corpus_resource_name: str,
+        query: str,
+        top_k: int,
+        distance_threshold: float,
+        files: Optional[List[dict]] = None) -> List[dict]:
+    """Contextos del indice BM25 local; su score es None porque no tienen distancia vectorial."""
+    sources = [rag_file["source_uri"] for rag_file in files] if files is not None else None
+    with span("lexical"):
+        hits = lexical_indexes.get(corpus_resource_name).search(query, top_k, sources=sources)
+    return [
+        {
+            "source_uri": source_uri,
+            "source_name": source_uri.rstrip("/").split("/")[-1],
+            "text": text,
+            "score": None,
+            "lexical_score": round(lexical_score, 4),
+        }
+        for source_uri, text, lexical_score in hits
+    ]
+
+
+def retrieve_contexts(
+        corpus_resource_name: str,
+        query: str,
+        top_k: int = DEFAULT_TOP_K,
+        distance_threshold: float = DEFAULT_DISTANCE_THRESHOLD,
+        filters: Optional[Dict[str, str]] = None) -> List[dict]:
+    """
+    Recuperar los contextos de un corpus para una consulta, usando la cache de consultas
+    :param corpus_resource_name: Nombre de recurso del corpus ya resuelto
+    :param query: Texto de la consulta
+    :param top_k: Cantidad maxima de contextos a recuperar
+    :param distance_threshold: Distancia vectorial maxima aceptada
+    :param filters: Metadatos que deben tener los archivos (campo -> valor normalizado); la busqueda
+        se limita a esos archivos antes de puntuar. Los metadatos son por archivo: en un .json con
+        registros de varias materias o niveles se devuelven chunks de cualquiera de sus registros
+    :return:
+        List[dict]: Contextos recuperados y compactados (source_uri, source_name, text, score, merged_chunks);
+            con busqueda hibrida incluyen 'fused_score' (RRF) y los encontrados solo por BM25 tienen score None
+    """
+    # Con reordenamiento se piden mas candidatos de los que se devuelven
+    fetch_k = max(RERANK_FETCH_K, top_k) if RERANK_ENABLED else top_k
+    cache_key = query_cache.make_key(
+        corpus_resource_name, query, top_k, distance_threshold, fetch_k, RERANK_WEIGHT, HYBRID_RETRIEVAL_ENABLED,
+        tuple(sorted((filters or {}).items()))
+    )
+    cached = query_cache.get(cache_key)
+    if cached is not None:
+        return [dict(result) for result in cached]
+
+    files = None
+    if filters:
+        # Archivos con los metadatos pedidos, desde la copia local
+        with span("filter"):
+            metadata_index.refresh(corpus_resource_name)
+            files = metadata_index.filter_files(corpus_resource_name, filters)
+        if not files:
+            return []
+
+    if HYBRID_RETRIEVAL_ENABLED:
+        # Busqueda vectorial (remota) y lexica (local) en paralelo, combinadas por RRF
+        (vector_ok, vector), (lexical_ok, lexical) = run_concurrently(
+            lambda search: search(corpus_resource_name, query, fetch_k, distance_threshold, files),
+            [_vector_contexts, _lexical_contexts],
+            max_workers=2,
+        )
+        if not vector_ok:
+            raise vector
+        if not lexical_ok:
+            logger.warning(f"Error in lexical search for {corpus_resource_name}: {str(lexical)}")
+            lexical = []
+        with span("post_process", method="rrf"):
+            results = reciprocal_rank_fusion([vector, lexical], fetch_k)
+    else:
+        results = _vector_contexts(corpus_resource_name, query, fetch_k, distance_threshold, files)
+
+    if RERANK_ENABLED:
+        with span("rerank", candidates=len(results)):
+            results = rerank(query, results, top_k)
+
+    with span("post_process"):
+        # Unir chunks solapados, quitar casi duplicados y respetar el presupuesto de tokens
+        results = compact_contexts(results)
+
+    query_cache.put(cache_key, tuple(results))
+    return results
+
+
+def threshold_hits(results: List[dict]) -> int:
+    """Contextos que pasaron el umbral de distancia vectorial (los encontrados solo por BM25 no cuentan)."""
+    return sum(1 for result in results if result.get("score") is not None)
+
+
+def retrieval_steps(top_k: int, distance_threshold: float, adaptive: bool) -> List[Tuple[int, float]]:
+    """
+    Pares (top_k, distance_threshold) a probar en orden
+    :param top_k: top_k pedido en la llamada (0 para el valor por defecto)
+    :param distance_threshold: Umbral pedido en la llamada (0 para el valor por defecto)
+    :param adaptive: Empezar por los pasos estrictos de ADAPTIVE_RETRIEVAL_STEPS; los valores pedidos son el limite
+    :return:
+        List[Tuple[int, float]]: Un solo par sin modo adaptativo; los pasos sin repetir con modo adaptativo
+    """
+    if not adaptive:
+        return [(
+            min(top_k, RETRIEVAL_MAX_TOP_K) if top_k > 0 else DEFAULT_TOP_K,
+            min(distance_threshold, RETRIEVAL_MAX_DISTANCE_THRESHOLD) if distance_threshold > 0 else DEFAULT_DISTANCE_THRESHOLD,
+        )]
+
+    max_top_k = min(top_k, RETRIEVAL_MAX_TOP_K) if top_k > 0 else RETRIEVAL_MAX_TOP_K
+    max_threshold = (
+        min(distance_threshold, RETRIEVAL_MAX_DISTANCE_THRESHOLD) if distance_threshold > 0
+        else RETRIEVAL_MAX_DISTANCE_THRESHOLD
+    )
+    steps = []
+    for step_top_k, step_threshold in ADAPTIVE_RETRIEVAL_STEPS:
+        step = (min(step_top_k, max_top_k), min(step_threshold, max_threshold))
+        if step not in steps:
+            steps.append(step)
+    return steps
 
+
+def build_query_response(corpus_name: str, query: str, results: List[dict]) -> dict:
+    """
+    Construir la respuesta de rag_query a partir de los contextos recuperados
+    :param corpus_name: Nombre del corpus consultado
+    :param query: Texto de la consulta
+    :param results: Contextos recuperados
+    :return:
+        dict: Informacion sobre la respuesta y su status
+    """
+    # Si no se consigue ningun resultado
+    if not results:
         return {
-            "status": "success",
-            "message": f"Respuesta encontrada para la consulta '{query}' en el corpus '{corpus_name}'",
+            "status": "error",
+            "message": f"No se encontraron resultados para la consulta en el corpus {corpus_name} para la consulta {query}",
             "query": query,
             "corpus_name": corpus_name,
-            "results": results,
-            "results_count": len(results)
+            "results": [],
+            "results_count": 0
+        }
+
+    return {
+        "status": "success",
+        "message": f"Respuesta encontrada para la consulta '{query}' en el corpus '{corpus_name}'",
+        "query": query,
+        "corpus_name": corpus_name,
+        "results": results,
+        "results_count": len(results),
+        "context_tokens": context_tokens(results)
+    }
+
+
+@instrument_tool
+@with_deadline
+def rag_query(
+        corpus_name: str,
+        query: str,
+        tool_context: ToolContext,
+        subject: str = "",
+        level: str = "",
+        eje: str = "",
+        top_k: int = 0,
+        distance_threshold: float = 0.0,
+        adaptive: bool = ADAPTIVE_RETRIEVAL_ENABLED) -> dict:
+    """
+    Ai Vertex Rag Corpus tenga la capacidad de responder onsultas sobre la informacion almacenada en un corpus
+    :param corpus_name: Nombre del corpus con el que se esta respondiendo u obteniendo respuesta
+    :param query: Texto que se estara buscando en el corpus para la respuesta
+    :param tool_context: Contexto de la herramienta
+    :param subject: Materia de los documentos a consultar, "Matematica" o "Lenguaje" ('' para no filtrar)
+    :param level: Nivel de los documentos a consultar, de "0" a "4" ('' para no filtrar)
+    :param eje: Eje o topico de evaluacion de los documentos a consultar ('' para no filtrar)
+    :param top_k: Cantidad maxima de contextos a devolver (0 para el valor por defecto)
+    :param distance_threshold: Distancia vectorial maxima aceptada (0 para el valor por defecto)
+    :param adaptive: Empezar con pocos contextos y un umbral estricto, y ampliar solo si pasan muy pocos resultados
+    :return:
+        dict: Informacion sobre la respuesta, su status y los parametros de recuperacion usados. Si Vertex AI
+            no responde se devuelve la ultima respuesta buena para la misma consulta con 'stale' en True
+    """
+    if top_k < 0 or distance_threshold < 0:
+        return {
+            "status": "error",
+            "message": "top_k y distance_threshold no pueden ser negativos",
+            "query": query,
+            "corpus_name": corpus_name
+        }
+
+    stale_key = None
+    try:
+        with span("resolve"):
+            # Verificar si el corpus existe
+            if not check_corpus_exists(corpus_name, tool_context):
+                return {
+                    "status": "error",
+                    "message": f"Corpus '{corpus_name}' no existe",
+                    "corpus_name": corpus_name
+                }
+            # Obtener el nombre de recurso del corpus
+            corpus_resource_name = get_corpus_resource_name(corpus_name, tool_context)
+
+        filters = {
+            field: normalize_value(field, value)
+            for field, value in (("subject", subject), ("level", level), ("eje", eje)) if str(value).strip()
+        }
+        stale_key = stale_cache.make_key(
+            "rag_query", corpus_resource_name, normalize_query(query), sorted(filters.items()),
+            top_k, distance_threshold, adaptive
+        )
+        # Ampliar top_k y el umbral solo mientras pasen el umbral vectorial menos de ADAPTIVE_MIN_RESULTS contextos
+        steps = retrieval_steps(top_k, distance_threshold, adaptive)
+        for attempt, (step_top_k, step_threshold) in enumerate(steps, start=1):
+            results = retrieve_contexts(corpus_resource_name, query, step_top_k, step_threshold, filters=filters)
+            if threshold_hits(results) >= min(ADAPTIVE_MIN_RESULTS, step_top_k):
+                break
+
+        response = build_query_response(corpus_name, query, results)
+        response["retrieval"] = {
+            "top_k": step_top_k,
+            "distance_threshold": step_threshold,
+            "adaptive": adaptive,
+            "attempts": attempt
         }
+        if filters:
+            response["filters"] = filters
+        stale_cache.put(stale_key, response)
+        return response
 
     except Exception as e:
+        # Con Vertex caido o el circuito abierto, responder con la ultima respuesta buena a la misma consulta
+        if stale_key is not None and is_unavailable(e):
+            cached = stale_cache.get(stale_key, tool="rag_query")
+            if cached is not None:
+                return mark_stale(*cached, e)
         error_msg = f"Error querying corpus {str(e)}"
         logging.error(error_msg)
         return {
@@ -0,0 +1,112 @@
+import logging
+from typing import List
+
+from google.adk.tools.tool_context import ToolContext
+from ..telemetry import instrument_tool, span
+from .concurrency import run_concurrently
+from .rag_query import build_query_response, retrieve_contexts
+from .utils import check_corpus_exists, get_corpus_resource_name
+from .resilience import with_deadline
+
+from ..config import (
+    BATCH_QUERY_MAX_CONCURRENCY,
+    BATCH_QUERY_MAX_QUERIES,
+    BATCH_QUERY_TIMEOUT_SECONDS,
+    DEFAULT_DISTANCE_THRESHOLD,
+    DEFAULT_TOP_K,
+)
+
+
+@instrument_tool
+@with_deadline
+def rag_query_batch(
+        corpus_name: str,
+        queries: List[str],
+        tool_context: ToolContext) -> dict:
+    """
+    Responder varias consultas sobre un mismo corpus en una sola llamada
+    :param corpus_name: Nombre del corpus con el que se esta respondiendo u obteniendo respuesta
+    :param queries: Lista de textos que se estaran buscando en el corpus
+    :param tool_context: Contexto de la herramienta
+    :return:
+        dict: Status general y, en el mismo orden de las consultas, la respuesta de cada una
+            con el mismo formato que 'rag_query'
+    """
+    if not queries or not all(isinstance(query, str) and query for query in queries):
+        return {
+            "status": "error",
+            "message": "Se debe indicar una lista de consultas validas",
+            "corpus_name": corpus_name,
+            "queries": queries
+        }
+
+    if len(queries) > BATCH_QUERY_MAX_QUERIES:
+        return {
+            "status": "error",
+            "message": f"Se permiten como maximo {BATCH_QUERY_MAX_QUERIES} consultas por llamada",
+            "corpus_name": corpus_name,
+            "queries": queries
+        }
+
+    try:
+        # Verificar si el corpus existe (una sola vez para todo el lote)
+        with span("resolve"):
+            corpus_exists = check_corpus_exists(corpus_name, tool_context)
+        if not corpus_exists:
+            return {
+                "status": "error",
+                "message": f"Corpus '{corpus_name}' no existe",
+                "corpus_name": corpus_name,
+                "queries": queries
+            }
+        corpus_resource_name = get_corpus_resource_name(corpus_name, tool_context)
+    except Exception as e:
+        error_msg = f"Error querying corpus {str(e)}"
+        logging.error(error_msg)
+        return {
+            "status": "error",
+            "message": error_msg,
+            "corpus_name": corpus_name,
+            "queries": queries
+        }
+
+    # Realizar todas las consultas en paralelo
+    outcomes = run_concurrently(
+        lambda query: retrieve_contexts(
+            corpus_resource_name, query, DEFAULT_TOP_K, DEFAULT_DISTANCE_THRESHOLD
+        ),
+        queries,
+        max_workers=BATCH_QUERY_MAX_CONCURRENCY,
+        timeout=BATCH_QUERY_TIMEOUT_SECONDS,
+    )
+
+    responses = []
+    for query, (ok, value) in zip(queries, outcomes):
+        if ok:
+            responses.append(build_query_response(corpus_name, query, value))
+            continue
+
+        error_msg = f"Error querying corpus {str(value) or type(value).__name__}"
+        logging.error(error_msg)
+        responses.append({
+            "status": "error",
+            "message": error_msg,
+            "query": query,
+            "corpus_name": corpus_name
+        })
+
+    succeeded = sum(1 for response in responses if response["status"] == "success")
+    if succeeded == len(responses):
+        status = "success"
+    elif succeeded:
+        status = "partial"
+    else:
+        status = "error"
+
+    return {
+        "status": status,
+        "message": f"{succeeded} de {len(queries)} consultas con resultados en el corpus '{corpus_name}'",
+        "corpus_name": corpus_name,
+        "responses": responses,
+        "queries_count": len(queries)
+    }
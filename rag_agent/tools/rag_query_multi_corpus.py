@@ -0,0 +1,158 @@
+import logging
+from typing import Dict, List
+
+from google.adk.tools.tool_context import ToolContext
+from ..telemetry import instrument_tool, span
+from .concurrency import run_concurrently
+from .context_merge import apply_token_budget, context_tokens
+from .query_cache import normalize_query
+from .rag_query import retrieve_contexts
+from .utils import check_corpus_exists, get_corpus_resource_name
+from .resilience import with_deadline
+
+from ..config import (
+    DEFAULT_DISTANCE_THRESHOLD,
+    DEFAULT_TOP_K,
+    FANOUT_CORPUS_TIMEOUT_SECONDS,
+    FANOUT_MAX_CONCURRENCY,
+    FANOUT_MERGE_STRATEGY,
+    RETRIEVAL_SCORE_IS_DISTANCE,
+    RRF_K,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _score_order(result: dict) -> float:
+    """Puntaje vectorial para ordenar de mejor a peor (menor primero); sin puntaje (solo BM25) va al final."""
+    score = result.get("score")
+    if score is None:
+        return float("inf")
+    return score if RETRIEVAL_SCORE_IS_DISTANCE else -score
+
+
+def merge_results(
+        results_by_corpus: Dict[str, List[dict]],
+        top_k: int,
+        strategy: str = FANOUT_MERGE_STRATEGY) -> List[dict]:
+    """
+    Unir los resultados de varios corpora en un unico top-k, eliminando chunks identicos
+    :param results_by_corpus: Resultados de cada corpus, en el orden en que fueron recuperados
+    :param top_k: Cantidad de resultados a devolver
+    :param strategy: "rrf" (reciprocal rank fusion) o "score" (puntaje vectorial original; los contextos
+        encontrados solo por BM25 no lo tienen y van al final)
+    :return:
+        List[dict]: Resultados combinados, cada uno con el corpus de origen
+    """
+    merged: Dict[tuple, dict] = {}
+    for corpus_name, results in results_by_corpus.items():
+        for rank, result in enumerate(results):
+            key = (result.get("source_uri", ""), normalize_query(result.get("text", "")))
+            fused = 1.0 / (RRF_K + rank + 1)
+            current = merged.get(key)
+            if current is None:
+                merged[key] = {**result, "corpus_name": corpus_name, "_fused": fused}
+                continue
+
+            # Chunk duplicado: acumular RRF y conservar el mejor puntaje original
+            current["_fused"] += fused
+            if _score_order(result) < _score_order(current):
+                current["score"] = result.get("score")
+                current["corpus_name"] = corpus_name
+
+    if strategy == "score":
+        # Orden estable: entre contextos sin puntaje vectorial se respeta el orden RRF
+        ordered = sorted(
+            sorted(merged.values(), key=lambda r: r["_fused"], reverse=True),
+            key=_score_order,
+        )
+    else:
+        ordered = sorted(merged.values(), key=lambda r: r["_fused"], reverse=True)
+
+    final = []
+    for result in ordered[:top_k]:
+        result = dict(result)
+        result.pop("_fused", None)
+        final.append(result)
+    return final
+
+
+@instrument_tool
+@with_deadline
+def rag_query_multi_corpus(
+        corpus_names: List[str],
+        query: str,
+        tool_context: ToolContext) -> dict:
+    """
+    Consultar varios corpora a la vez y devolver un unico conjunto de resultados combinados
+    :param corpus_names: Lista de nombres de los corpora a consultar
+    :param query: Texto que se estara buscando en los corpora para la respuesta
+    :param tool_context: Contexto de la herramienta
+    :return:
+        dict: Informacion sobre la respuesta combinada, su status y los corpora que fallaron
+    """
+    if not corpus_names or not all(isinstance(name, str) and name for name in corpus_names):
+        return {
+            "status": "error",
+            "message": "Se debe indicar al menos un nombre de corpus valido",
+            "query": query,
+            "corpus_names": corpus_names
+        }
+
+    # Eliminar nombres repetidos conservando el orden
+    corpus_names = list(dict.fromkeys(corpus_names))
+
+    corpus_errors = {}
+    resource_names = {}
+    with span("resolve"):
+        for corpus_name in corpus_names:
+            if check_corpus_exists(corpus_name, tool_context):
+                resource_names[corpus_name] = get_corpus_resource_name(corpus_name, tool_context)
+            else:
+                corpus_errors[corpus_name] = f"Corpus '{corpus_name}' no existe"
+
+    # Consultar todos los corpora en paralelo, con un plazo por corpus
+    names = list(resource_names)
+    outcomes = run_concurrently(
+        lambda name: retrieve_contexts(
+            resource_names[name], query, DEFAULT_TOP_K, DEFAULT_DISTANCE_THRESHOLD
+        ),
+        names,
+        max_workers=FANOUT_MAX_CONCURRENCY,
+        timeout=FANOUT_CORPUS_TIMEOUT_SECONDS,
+    )
+
+    results_by_corpus = {}
+    for corpus_name, (ok, value) in zip(names, outcomes):
+        if ok:
+            results_by_corpus[corpus_name] = value
+        else:
+            logger.error(f"Error querying corpus {corpus_name}: {str(value)}")
+            corpus_errors[corpus_name] = f"Error al consultar el corpus: {str(value) or type(value).__name__}"
+
+    with span("post_process"):
+        results = merge_results(results_by_corpus, DEFAULT_TOP_K)
+        # El presupuesto de tokens aplica a la respuesta combinada, no a cada corpus
+        results = apply_token_budget(results)
+
+    if not results:
+        return {
+            "status": "error",
+            "message": f"No se encontraron resultados para la consulta {query} en los corpora {', '.join(corpus_names)}",
+            "query": query,
+            "corpus_names": corpus_names,
+            "results": [],
+            "results_count": 0,
+            "corpus_errors": corpus_errors
+        }
+
+    return {
+        "status": "success",
+        "message": f"Respuesta encontrada para la consulta '{query}' en los corpora '{', '.join(results_by_corpus)}'",
+        "query": query,
+        "corpus_names": corpus_names,
+        "results": results,
+        "results_count": len(results),
+        "context_tokens": context_tokens(results),
+        "corpus_errors": corpus_errors
+    }
@@ -0,0 +1,55 @@
+import threading
+import time
+from typing import Optional
+
+from ..config import DEFAULT_EMBEDDING_REQUESTS_PER_MIN
+
+
+class TokenBucket:
+    """
+    Limitador token bucket compartido entre hilos.
+    Se recargan rate_per_minute tokens por minuto, hasta un maximo de capacity.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate_per_second)
+        self._updated_at = now
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """
+        Esperar hasta tener los tokens solicitados
+
+        Args:
+            tokens (float): Tokens a consumir (se limita a la capacidad del bucket)
+            timeout (float): Espera maxima en segundos; None espera indefinidamente
+
+        Returns:
+            bool: True si se consumieron los tokens, False si se agoto el tiempo
+        """
+        tokens = min(tokens, self.capacity)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self.rate_per_second
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+
+# Cuota de embeddings compartida por todas las ingestas del proceso
+embedding_rate_limiter = TokenBucket(DEFAULT_EMBEDDING_REQUESTS_PER_MIN)
@@ -0,0 +1,145 @@
+"""
+Reordenamiento local de los contextos recuperados.
+Un scorer es cualquier objeto con un metodo score(query, texts) -> secuencia de floats (mayor es mas relevante);
+por defecto se usa BM25 sobre los candidatos, y con RERANK_SCORER="modulo:fabrica" se puede usar un cross-encoder.
+"""
+import importlib
+import threading
+from collections import Counter
+from typing import TYPE_CHECKING, List, Optional, Sequence
+
+from ..text import tokenize
+
+from ..config import (
+    BM25_B,
+    BM25_K1,
+    RERANK_SCORER,
+    RERANK_WEIGHT,
+    RETRIEVAL_SCORE_IS_DISTANCE,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class BM25Scorer:
+    """BM25 calculado sobre el conjunto de candidatos (las estadisticas de documento salen de ellos)."""
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+
+    def score(self, query: str, texts: Sequence[str]) -> "np.ndarray":
+        # numpy se importa en el primer uso para no demorar el arranque del agente
+        import numpy as np
+
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not texts:
+            return np.zeros(len(texts), dtype=np.float32)
+
+        # Matriz de frecuencias (documentos x terminos de la consulta)
+        tf = np.zeros((len(texts), len(terms)), dtype=np.float32)
+        lengths = np.zeros(len(texts), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            lengths[row] = len(tokens)
+            counts = Counter(tokens)
+            tf[row] = [counts.get(term, 0) for term in terms]
+
+        df = np.count_nonzero(tf, axis=0)
+        idf = np.log1p((len(texts) - df + 0.5) / (df + 0.5))
+        norm = self.k1 * (1.0 - self.b + self.b * lengths / max(float(lengths.mean()), 1.0))
+        return (idf * tf * (self.k1 + 1.0) / (tf + norm[:, None])).sum(axis=1)
+
+
+def load_scorer(spec: str):
+    """
+    Crear el scorer configurado
+
+    Args:
+        spec (str): "bm25" o "modulo:fabrica", donde fabrica() devuelve un objeto con score(query, texts)
+
+    Returns:
+        Scorer con el metodo score(query, texts)
+    """
+    if spec == "bm25":
+        return BM25Scorer()
+
+    module_name, _, attr = spec.partition(":")
+    if not attr:
+        raise ValueError(f"Scorer no soportado: {spec}")
+    return getattr(importlib.import_module(module_name), attr)()
+
+
+_scorer = None
+_scorer_lock = threading.Lock()
+
+
+def get_scorer():
+    """Scorer del proceso (se crea en el primer uso)."""
+    global _scorer
+    if _scorer is None:
+        with _scorer_lock:
+            if _scorer is None:
+                _scorer = load_scorer(RERANK_SCORER)
+    return _scorer
+
+
+def set_scorer(scorer) -> None:
+    """Reemplazar el scorer del proceso (por ejemplo por un cross-encoder ya cargado)."""
+    global _scorer
+    with _scorer_lock:
+        _scorer = scorer
+
+
+def _min_max(values: "np.ndarray") -> "np.ndarray":
+    """Normalizar a [0, 1]; los valores NaN (sin puntaje) quedan en 0 y si todos son iguales valen 1."""
+    import numpy as np
+
+    present = ~np.isnan(values)
+    normalized = np.zeros_like(values)
+    if not present.any():
+        return normalized
+    low, high = values[present].min(), values[present].max()
+    # Sin rango el componente no distingue candidatos: todos reciben el mismo puntaje y decide el otro
+    normalized[present] = (values[present] - low) / (high - low) if high > low else 1.0
+    return normalized
+
+
+def rerank(
+        query: str,
+        results: List[dict],
+        top_k: int,
+        weight: float = RERANK_WEIGHT,
+        scorer: Optional[object] = None) -> List[dict]:
+    """
+    Reordenar los candidatos combinando el puntaje del scorer con el de la busqueda vectorial
+
+    Args:
+        query (str): Texto de la consulta
+        results (List[dict]): Candidatos recuperados (sobre-pedidos) en orden vectorial
+        top_k (int): Cantidad de resultados a devolver
+        weight (float): Peso del scorer (0 mantiene el orden vectorial, 1 usa solo el scorer)
+        scorer: Scorer a usar; por defecto el del proceso
+
+    Returns:
+        List[dict]: Los top_k candidatos reordenados, cada uno con 'rerank_score' (el 'score' original se conserva)
+    """
+    if len(results) <= 1:
+        return results[:top_k]
+
+    import numpy as np
+
+    scorer = scorer or get_scorer()
+    lexical = np.asarray(scorer.score(query, [result.get("text", "") for result in results]), dtype=np.float32)
+    # Los candidatos sin distancia vectorial (encontrados solo por BM25) reciben el peor puntaje vectorial
+    vector = np.asarray(
+        [np.nan if result.get("score") is None else result["score"] for result in results], dtype=np.float32
+    )
+    if RETRIEVAL_SCORE_IS_DISTANCE:
+        vector = -vector
+
+    combined = weight * _min_max(lexical) + (1.0 - weight) * _min_max(vector)
+    # Orden estable: en empate se respeta el orden vectorial
+    order = np.argsort(-combined, kind="stable")[:top_k]
+    return [{**results[i], "rerank_score": round(float(combined[i]), 4)} for i in order]
@@ -0,0 +1,415 @@
+"""
+Plazos, reintentos y hedging para las llamadas de lectura a Vertex.
+Cada tool tiene un plazo total (TOOL_DEADLINES_SECONDS) que comparten todas sus llamadas; cada metodo rag.*
+tiene una politica (CALL_POLICIES) con la cantidad de intentos y el plazo de cada uno. Solo se reintentan
+los errores transitorios, con backoff exponencial y jitter completo. Con hedging, si la primera solicitud
+tarda mas que el percentil HEDGE_PERCENTILE de las latencias recientes se envia una segunda identica
+y se usa la que responda primero. Cada metodo tiene ademas un circuit breaker: despues de varias fallas
+transitorias seguidas las llamadas fallan de inmediato (CircuitOpenError) hasta que una llamada de prueba
+vuelve a responder, y las tools de lectura responden con su ultimo resultado bueno (stale_cache).
+Las solicitudes que se abandonan (por plazo o porque gano la otra del hedge) siguen ocupando un lugar hasta
+terminar: cada metodo tiene a lo sumo RESILIENCE_MAX_IN_FLIGHT en curso, no se envian hedges con el pool
+lleno y cada RPC recibe como timeout lo que le queda al intento (rpc_timeout), asi se corta en el servidor.
+"""
+import contextlib
+import contextvars
+import functools
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from .. import telemetry
+
+from ..config import (
+    CALL_POLICIES,
+    CIRCUIT_BREAKER_ENABLED,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_OPEN_SECONDS,
+    HEDGE_DEFAULT_DELAY_SECONDS,
+    HEDGE_LATENCY_WINDOW,
+    HEDGE_MIN_SAMPLES,
+    HEDGE_PERCENTILE,
+    HEDGING_ENABLED,
+    RAG_CLIENT_TIMEOUT_SECONDS,
+    RESILIENCE_MAX_IN_FLIGHT,
+    RESILIENCE_MAX_WORKERS,
+    RETRY_BASE_DELAY_SECONDS,
+    RETRY_MAX_DELAY_SECONDS,
+    TOOL_DEADLINES_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Errores transitorios de google.api_core / grpc / red (se comparan por nombre para no importar el SDK)
+_RETRYABLE_ERRORS = {
+    "ServiceUnavailable",
+    "DeadlineExceeded",
+    "InternalServerError",
+    "TooManyRequests",
+    "ResourceExhausted",
+    "Aborted",
+    "BadGateway",
+    "GatewayTimeout",
+    "TimeoutError",
+    "ConnectionError",
+}
+_RETRYABLE_HTTP_CODES = {429, 500, 502, 503, 504}
+
+_deadline: contextvars.ContextVar = contextvars.ContextVar("rag_tool_deadline", default=None)
+_attempt_deadline: contextvars.ContextVar = contextvars.ContextVar("rag_attempt_deadline", default=None)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """True si el error es transitorio y la llamada se puede repetir."""
+    if any(cls.__name__ in _RETRYABLE_ERRORS for cls in type(error).__mro__):
+        return True
+    return getattr(error, "code", None) in _RETRYABLE_HTTP_CODES
+
+
+class CircuitOpenError(Exception):
+    """La llamada no se hizo porque el circuito del metodo esta abierto (Vertex no esta respondiendo)."""
+
+
+def is_unavailable(error: BaseException) -> bool:
+    """True si el error indica que Vertex no esta disponible (circuito abierto o error transitorio)."""
+    return isinstance(error, CircuitOpenError) or is_retryable(error)
+
+
+def rpc_timeout(default: float) -> float:
+    """
+    Timeout para una RPC: el valor por defecto acotado a lo que le queda al intento en curso
+    (ResilientCaller) y al plazo de la tool, para que la solicitud no siga corriendo despues de abandonarla
+    """
+    deadlines = [deadline for deadline in (_attempt_deadline.get(), _deadline.get()) if deadline is not None]
+    if not deadlines:
+        return default
+    return max(0.001, min(default, min(deadlines) - time.monotonic()))
+
+
+def with_deadline(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Decorador para las tools: fija el plazo total de la tool (TOOL_DEADLINES_SECONDS, por nombre)
+    para todas las llamadas que haga, tambien las que corren en otros hilos con el contexto copiado
+    """
+    seconds = TOOL_DEADLINES_SECONDS.get(func.__name__)
+    if not seconds:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        token = _deadline.set(time.monotonic() + seconds)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _deadline.reset(token)
+
+    return wrapper
+
+
+class CircuitBreaker:
+    """
+    Circuito de un metodo: 'closed' deja pasar todas las llamadas; con failure_threshold fallas transitorias
+    seguidas pasa a 'open' y rechaza las llamadas durante open_seconds; despues pasa a 'half_open' y deja
+    pasar una sola llamada de prueba, que lo vuelve a cerrar si responde bien o lo abre de nuevo si falla.
+    """
+
+    def __init__(self, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD, open_seconds: float = CIRCUIT_OPEN_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == "open" and time.monotonic() - self._opened_at >= self.open_seconds:
+                return "half_open"
+            return self._state
+
+    def allow(self) -> bool:
+        """True si la llamada puede hacerse; en half_open solo pasa una llamada de prueba a la vez."""
+        with self._lock:
+            if self._state == "closed":
+                return True
+            if self._state == "open":
+                if time.monotonic() - self._opened_at < self.open_seconds:
+                    return False
+                self._state = "half_open"
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> bool:
+        """Registrar una falla transitoria; devuelve True si con ella el circuito se abrio."""
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                opened = self._state != "open"
+                self._state = "open"
+                self._opened_at = time.monotonic()
+                return opened
+            return False
+
+    def release(self) -> None:
+        """Liberar la llamada de prueba sin cambiar el estado (fallo no transitorio, como NotFound)."""
+        with self._lock:
+            self._probing = False
+
+
+class ResilientCaller:
+    """Ejecuta llamadas bloqueantes con plazo, reintentos y hedging, y cuenta reintentos y hedges."""
+
+    def __init__(
+            self,
+            max_workers: int = RESILIENCE_MAX_WORKERS,
+            hedging: bool = HEDGING_ENABLED,
+            circuit_breaker: bool = CIRCUIT_BREAKER_ENABLED):
+        self.hedging = hedging
+        self.circuit_breaker = circuit_breaker
+        self._max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, deque] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._slots = threading.Condition()
+        self._in_flight: Dict[str, int] = {}
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self._max_workers, thread_name_prefix="rag-call"
+                    )
+        return self._executor
+
+    def _count(self, operation: str, name: str) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(operation, {
+                "calls": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "deadline_exceeded": 0, "errors": 0,
+                "rejected": 0, "circuit_opened": 0, "hedges_skipped": 0,
+            })
+            stats[name] += 1
+        telemetry.increment(f"rag_resilience_{name}_total", operation=operation)
+
+    def breaker(self, operation: str) -> CircuitBreaker:
+        """Circuit breaker del metodo (se crea en el primer uso)."""
+        with self._lock:
+            if operation not in self._breakers:
+                self._breakers[operation] = CircuitBreaker()
+            return self._breakers[operation]
+
+    @contextlib.contextmanager
+    def guard(self, operation: str) -> Iterator[None]:
+        """
+        Ejecutar un bloque con el circuit breaker del metodo, para llamadas que no pasan por call
+        (por ejemplo los pagers de rag.list_files que piden las paginas a medida que se recorren)
+
+        Raises:
+            CircuitOpenError: Si el circuito esta abierto; el bloque no se ejecuta
+        """
+        if not self.circuit_breaker:
+            yield
+            return
+        breaker = self.breaker(operation)
+        if not breaker.allow():
+            self._count(operation, "rejected")
+            raise CircuitOpenError(f"Circuito abierto para {operation}: Vertex AI no esta respondiendo")
+        try:
+            yield
+        except Exception as e:
+            if is_retryable(e):
+                if breaker.record_failure():
+                    self._count(operation, "circuit_opened")
+                    logger.warning(f"Circuit opened for {operation}: {str(e)}")
+            else:
+                breaker.release()
+            raise
+        breaker.record_success()
+
+    def hedge_delay(self, operation: str) -> float:
+        """Demora antes de la solicitud duplicada: el percentil de las latencias recientes del metodo."""
+        with self._lock:
+            samples = sorted(self._latencies.get(operation, ()))
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY_SECONDS
+        return samples[min(len(samples) - 1, int(len(samples) * HEDGE_PERCENTILE / 100))]
+
+    def _record_latency(self, operation: str, seconds: float) -> None:
+        with self._lock:
+            self._latencies.setdefault(operation, deque(maxlen=HEDGE_LATENCY_WINDOW)).append(seconds)
+
+    def _reserve(self, operation: str, timeout: float = 0.0) -> bool:
+        """
+        Reservar un lugar para una solicitud del metodo, esperando hasta timeout segundos.
+        Sin timeout (hedges) tampoco se reserva si el pool esta lleno: el duplicado solo esperaria en la cola
+        """
+        deadline = time.monotonic() + timeout
+        with self._slots:
+            while True:
+                in_flight = self._in_flight.get(operation, 0)
+                pool_full = not timeout and sum(self._in_flight.values()) >= self._max_workers
+                if in_flight < RESILIENCE_MAX_IN_FLIGHT and not pool_full:
+                    self._in_flight[operation] = in_flight + 1
+                    return True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._slots.wait(remaining)
+
+    def _release(self, operation: str) -> None:
+        with self._slots:
+            self._in_flight[operation] -= 1
+            self._slots.notify_all()
+
+    def in_flight(self) -> Dict[str, int]:
+        """Solicitudes en curso por metodo (incluidas las abandonadas que todavia no terminaron)."""
+        with self._slots:
+            return {operation: count for operation, count in self._in_flight.items() if count}
+
+    def _submit(self, operation: str, func: Callable[[], Any], deadline: float) -> Future:
+        """Enviar una solicitud ya reservada; el lugar se libera cuando termina, aunque se haya abandonado."""
+        def timed() -> Any:
+            _attempt_deadline.set(deadline)
+            started = time.monotonic()
+            try:
+                result = func()
+                self._record_latency(operation, time.monotonic() - started)
+                return result
+            finally:
+                self._release(operation)
+
+        try:
+            return self._pool().submit(contextvars.copy_context().run, timed)
+        except BaseException:
+            self._release(operation)
+            raise
+
+    def _attempt(self, operation: str, func: Callable[[], Any], timeout: float, hedge: bool) -> Any:
+        """Un intento: la solicitud original y, si corresponde, una duplicada; gana la primera que responde bien."""
+        started = time.monotonic()
+        deadline = started + timeout
+        if not self._reserve(operation, timeout):
+            raise TimeoutError(f"Plazo de {round(timeout, 2)}s excedido esperando lugar para {operation}")
+        futures = [self._submit(operation, func, deadline)]
+        pending = set(futures)
+        error: Optional[BaseException] = None
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            wait_for = remaining
+            can_hedge = hedge and len(futures) == 1
+            if can_hedge:
+                wait_for = min(remaining, max(0.0, self.hedge_delay(operation) - (time.monotonic() - started)))
+
+            done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is not futures[0]:
+                        self._count(operation, "hedge_wins")
+                    return future.result()
+                error = future.exception()
+
+            if can_hedge and pending and time.monotonic() < deadline:
+                if not self._reserve(operation):
+                    # Con el metodo o el pool saturados un duplicado solo agregaria carga
+                    self._count(operation, "hedges_skipped")
+                    hedge = False
+                    continue
+                self._count(operation, "hedges")
+                hedged = self._submit(operation, func, deadline)
+                futures.append(hedged)
+                pending.add(hedged)
+
+        if error is not None and not pending:
+            raise error
+        raise TimeoutError(f"Plazo de {round(timeout, 2)}s excedido en {operation}")
+
+    def call(self, operation: str, func: Callable[[], Any]) -> Any:
+        """
+        Ejecutar func con la politica del metodo (CALL_POLICIES) dentro del plazo de la tool en curso
+
+        Args:
+            operation (str): Metodo rag.* ('retrieval_query', 'list_corpora', ...)
+            func (Callable[[], Any]): Llamada a ejecutar; debe ser de solo lectura para poder repetirla
+
+        Returns:
+            Any: Resultado de la primera solicitud que responde bien
+
+        Raises:
+            CircuitOpenError: Si el circuito del metodo esta abierto; la llamada no se hace
+        """
+        policy = CALL_POLICIES.get(operation, {})
+        attempts = max(1, policy.get("attempts", 1))
+        hedge = self.hedging and policy.get("hedge", False)
+        tool_deadline = _deadline.get()
+
+        with self.guard(operation):
+            self._count(operation, "calls")
+            return self._call(operation, func, policy, attempts, hedge, tool_deadline)
+
+    def _call(
+            self,
+            operation: str,
+            func: Callable[[], Any],
+            policy: dict,
+            attempts: int,
+            hedge: bool,
+            tool_deadline: Optional[float]) -> Any:
+        for attempt in range(attempts):
+            timeout = policy.get("timeout") or RAG_CLIENT_TIMEOUT_SECONDS
+            if tool_deadline is not None:
+                timeout = min(timeout, tool_deadline - time.monotonic())
+            if timeout <= 0:
+                self._count(operation, "deadline_exceeded")
+                raise TimeoutError(f"Plazo de la tool excedido en {operation}")
+            try:
+                return self._attempt(operation, func, timeout, hedge)
+            except Exception as e:
+                if isinstance(e, TimeoutError):
+                    self._count(operation, "deadline_exceeded")
+                if attempt + 1 >= attempts or not is_retryable(e):
+                    self._count(operation, "errors")
+                    raise
+                # Backoff exponencial con jitter completo, sin pasarse del plazo de la tool
+                delay = random.uniform(0, min(RETRY_MAX_DELAY_SECONDS, RETRY_BASE_DELAY_SECONDS * (2 ** attempt)))
+                if tool_deadline is not None and time.monotonic() + delay >= tool_deadline:
+                    self._count(operation, "errors")
+                    raise
+                logger.warning(f"Retrying {operation} (attempt {attempt + 2}/{attempts}): {str(e)}")
+                self._count(operation, "retries")
+                time.sleep(delay)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Contadores por metodo: llamadas, reintentos, hedges, hedges ganadores, hedges omitidos por saturacion,
+        plazos excedidos, errores, llamadas rechazadas con el circuito abierto y veces que se abrio, mas el
+        estado actual del circuito
+        """
+        with self._lock:
+            stats = {operation: dict(stats) for operation, stats in self._stats.items()}
+            breakers = dict(self._breakers)
+        for operation, breaker in breakers.items():
+            stats.setdefault(operation, {})["circuit"] = breaker.state
+        return stats
+
+
+# Politicas de llamada compartidas por todas las tools del proceso
+resilient_calls = ResilientCaller()
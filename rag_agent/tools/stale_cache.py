@@ -0,0 +1,192 @@
+"""
+Ultimas respuestas buenas de las tools de lectura (list_corpora, get_corpus_info, rag_query), guardadas en SQLite
+para servirlas marcadas como 'stale' mientras Vertex no responde o su circuito esta abierto.
+Las escrituras las hace un hilo de fondo: put solo deja la respuesta pendiente y vuelve enseguida.
+"""
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from .. import telemetry
+from ..state_store import connect
+
+from ..config import (
+    STALE_CACHE_ENABLED,
+    STALE_CACHE_MAX_AGE_SECONDS,
+    STALE_CACHE_MAX_ENTRIES,
+    STALE_CACHE_REFRESH_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS stale_responses (
+        key TEXT PRIMARY KEY,
+        stored_at REAL NOT NULL,
+        value TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS stale_responses_stored_at ON stale_responses (stored_at)",
+)
+
+
+class StaleCache:
+    """
+    Respuesta mas reciente por llave (tool y parametros). Se reemplaza cuando cambia o cuando la guardada tiene
+    mas de refresh_seconds, se limita a max_entries (se descartan las mas antiguas) y no se sirve si tiene mas
+    de max_age_seconds. Las escrituras pendientes se agrupan por llave y las guarda un hilo de fondo.
+    """
+
+    def __init__(
+            self,
+            db_file: str = "stale_cache.sqlite",
+            max_entries: int = STALE_CACHE_MAX_ENTRIES,
+            max_age_seconds: float = STALE_CACHE_MAX_AGE_SECONDS,
+            enabled: bool = STALE_CACHE_ENABLED,
+            refresh_seconds: float = STALE_CACHE_REFRESH_SECONDS):
+        self.db_file = db_file
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self.enabled = enabled
+        self.refresh_seconds = refresh_seconds
+        self._conn = None
+        self._lock = threading.Lock()
+        self._stats = {"puts": 0, "unchanged": 0, "writes": 0, "hits": 0, "misses": 0}
+        # Escrituras pendientes y en curso (llave -> (stored_at, valor)); get las ve antes de llegar a la base
+        self._pending: Dict[str, Tuple[float, str]] = {}
+        self._writing: Dict[str, Tuple[float, str]] = {}
+        # Ultima escritura aceptada por llave (stored_at, hash del valor), para no repetir respuestas iguales
+        self._written: "OrderedDict[str, Tuple[float, int]]" = OrderedDict()
+        self._cond = threading.Condition()
+        self._writer: Optional[threading.Thread] = None
+
+    def _db(self):
+        if self._conn is None:
+            conn = connect(self.db_file)
+            # Con WAL no hace falta sincronizar el disco en cada escritura: es una copia de respaldo
+            conn.execute("PRAGMA synchronous=NORMAL")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def make_key(tool: str, *params: Hashable) -> str:
+        """Llave de una respuesta: nombre de la tool y los parametros que la determinan."""
+        return json.dumps([tool, *params], ensure_ascii=False, sort_keys=True, default=str)
+
+    def put(self, key: str, value: Any) -> None:
+        """Guardar la ultima respuesta buena (debe poder serializarse como JSON) sin esperar la escritura."""
+        if not self.enabled:
+            return
+        data = json.dumps(value, ensure_ascii=False, default=str)
+        now = time.time()
+        with self._cond:
+            self._stats["puts"] += 1
+            written = self._written.get(key)
+            if written and written[1] == hash(data) and now - written[0] < self.refresh_seconds:
+                self._stats["unchanged"] += 1
+                return
+            self._written[key] = (now, hash(data))
+            self._written.move_to_end(key)
+            if len(self._written) > self.max_entries:
+                self._written.popitem(last=False)
+            self._pending[key] = (now, data)
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="rag-stale-cache", daemon=True)
+                self._writer.start()
+            self._cond.notify_all()
+
+    def _write_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                self._writing, self._pending = self._pending, {}
+            try:
+                self._write(self._writing)
+            except Exception as e:
+                logger.warning(f"Error writing stale responses: {str(e)}")
+            finally:
+                with self._cond:
+                    self._writing = {}
+                    self._cond.notify_all()
+
+    def _write(self, entries: Dict[str, Tuple[float, str]]) -> None:
+        with self._lock:
+            conn = self._db()
+            conn.executemany(
+                "INSERT INTO stale_responses VALUES (?, ?, ?)"
+                " ON CONFLICT (key) DO UPDATE SET stored_at = excluded.stored_at, value = excluded.value",
+                [(key, stored_at, data) for key, (stored_at, data) in entries.items()],
+            )
+            writes = self._stats["writes"]
+            self._stats["writes"] += len(entries)
+            # Recortar de vez en cuando para no contar las filas en cada escritura
+            if writes // 100 != self._stats["writes"] // 100:
+                conn.execute(
+                    "DELETE FROM stale_responses WHERE key IN"
+                    " (SELECT key FROM stale_responses ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Esperar a que se escriban las respuestas pendientes; devuelve False si se vencio el timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._writing, timeout)
+
+    def get(self, key: str, tool: str = "") -> Optional[Tuple[Any, float]]:
+        """
+        Ultima respuesta buena guardada para la llave
+
+        Args:
+            key (str): Llave construida con make_key
+            tool (str): Nombre de la tool, para la metrica de respuestas servidas
+
+        Returns:
+            Optional[Tuple[Any, float]]: (respuesta, antiguedad en segundos), o None si no hay una vigente
+        """
+        if not self.enabled:
+            return None
+        with self._cond:
+            entry = self._pending.get(key) or self._writing.get(key)
+        if entry is None:
+            with self._lock:
+                row = self._db().execute(
+                    "SELECT stored_at, value FROM stale_responses WHERE key = ?", (key,)
+                ).fetchone()
+            entry = (row["stored_at"], row["value"]) if row else None
+        age = time.time() - entry[0] if entry else None
+        with self._lock:
+            if entry is None or age > self.max_age_seconds:
+                self._stats["misses"] += 1
+                return None
+            self._stats["hits"] += 1
+        telemetry.increment("rag_stale_responses_total", tool=tool)
+        return json.loads(entry[1]), age
+
+    def stats(self) -> dict:
+        with self._cond:
+            pending = len(self._pending) + len(self._writing)
+        with self._lock:
+            size = self._db().execute("SELECT COUNT(*) FROM stale_responses").fetchone()[0]
+            return {**self._stats, "pending": pending, "size": size, "max_entries": self.max_entries}
+
+
+def mark_stale(response: dict, age_seconds: float, error: BaseException) -> dict:
+    """Marcar una respuesta guardada como desactualizada, con su antiguedad y el motivo."""
+    return {
+        **response,
+        "stale": True,
+        "stale_age_seconds": round(age_seconds, 1),
+        "message": f"{response.get('message', '')} (respuesta guardada hace {round(age_seconds)}s:"
+                   f" Vertex AI no esta disponible: {str(error)})",
+    }
+
+
+# Respaldo compartido por todas las tools del proceso
+stale_cache = StaleCache()
@@ -1,24 +1,110 @@
 import logging
 import re
+import time
+from typing import Dict, List, Optional
 
 from google.adk.tools.tool_context import ToolContext
-from vertexai import rag
 
 from ..config import (
     LOCATION,
     PROJECT_ID,
+    SESSION_CORPORA_MAX_ENTRIES,
+    SESSION_CORPORA_STATE_KEY,
+    SESSION_CORPORA_TTL_SECONDS,
 )
+from .corpus_resolver import corpus_resolver
 
 logger = logging.getLogger(__name__)
 
+# Llaves por corpus de versiones anteriores (una por corpus, incluida la mal escrita de create_corpus)
+_LEGACY_STATE_PREFIXES = ("corpus_exists_", "corpus_exisits_")
 
-def get_corpus_resource_name(corpus_name: str) -> str:
+
+def _session_corpora(tool_context: ToolContext) -> Dict[str, List]:
+    """Corpora resueltos en la sesion: nombre -> [nombre de recurso, timestamp de la ultima validacion]."""
+    return dict(tool_context.state.get(SESSION_CORPORA_STATE_KEY) or {})
+
+
+def session_corpus(corpus_name: str, tool_context: ToolContext) -> Optional[str]:
+    """
+    Nombre de recurso de un corpus ya resuelto en la sesion, si su validacion sigue vigente
+
+    Args:
+        corpus_name (str): Nombre del corpus tal como lo usan las tools
+        tool_context (ToolContext): Herramienta de contexto para administrar el estado
+
+    Returns:
+        Optional[str]: Nombre de recurso, o None si no esta en la sesion o su validacion vencio
+    """
+    entry = _session_corpora(tool_context).get(corpus_name)
+    if entry and time.time() - entry[1] < SESSION_CORPORA_TTL_SECONDS:
+        return entry[0]
+    return None
+
+
+def _legacy_keys(tool_context: ToolContext) -> Dict[str, object]:
+    """Llaves corpus_exists_* de sesiones guardadas con versiones anteriores, con su valor (None si ya se vaciaron)."""
+    state = tool_context.state
+    keys = state.to_dict() if hasattr(state, "to_dict") else dict(state)
+    return {key: value for key, value in keys.items() if key.startswith(_LEGACY_STATE_PREFIXES)}
+
+
+def _clear_legacy_keys(tool_context: ToolContext, legacy: Dict[str, object]) -> None:
+    """
+    Vaciar las llaves corpus_exists_* de versiones anteriores. El estado de ADK no permite borrar llaves,
+    asi que se asignan a None (el valor mas chico que se puede persistir) y siguen en la sesion.
+    """
+    for key, value in legacy.items():
+        if value is not None:
+            tool_context.state[key] = None
+
+
+def remember_corpus(corpus_name: str, resource_name: str, tool_context: ToolContext) -> None:
+    """
+    Guardar en la sesion el nombre de recurso de un corpus, quitando las entradas vencidas y las
+    mas antiguas para no pasar de SESSION_CORPORA_MAX_ENTRIES llaves por corpus en la sesion
+    (las llaves corpus_exists_* que quedaron de versiones anteriores cuentan contra ese limite)
+
+    Args:
+        corpus_name (str): Nombre del corpus tal como lo usan las tools
+        resource_name (str): Nombre de recurso completo del corpus
+        tool_context (ToolContext): Herramienta de contexto para administrar el estado
+    """
+    legacy = _legacy_keys(tool_context)
+    if SESSION_CORPORA_STATE_KEY not in tool_context.state:
+        # Primera vez que se arma el registro en esta sesion
+        _clear_legacy_keys(tool_context, legacy)
+    max_entries = max(1, SESSION_CORPORA_MAX_ENTRIES - len(legacy))
+    now = time.time()
+    corpora = {
+        name: entry for name, entry in _session_corpora(tool_context).items()
+        if now - entry[1] < SESSION_CORPORA_TTL_SECONDS and name != corpus_name
+    }
+    corpora[corpus_name] = [resource_name, now]
+    if len(corpora) > max_entries:
+        newest = sorted(corpora.items(), key=lambda item: item[1][1])[-max_entries:]
+        corpora = dict(newest)
+    # Asignar un dict nuevo para que la sesion registre el cambio
+    tool_context.state[SESSION_CORPORA_STATE_KEY] = corpora
+
+
+def forget_corpus(resource_name: str, tool_context: ToolContext) -> None:
+    """Quitar de la sesion todos los nombres que apuntan a un corpus (por ejemplo al eliminarlo)."""
+    corpora = _session_corpora(tool_context)
+    remaining = {name: entry for name, entry in corpora.items() if entry[0] != resource_name}
+    if len(remaining) != len(corpora):
+        tool_context.state[SESSION_CORPORA_STATE_KEY] = remaining
+
+
+def get_corpus_resource_name(corpus_name: str, tool_context: Optional[ToolContext] = None) -> str:
     """
     Convierte el nombre de un corpus en el nombre completo de su recurso si es necesario.
     Administra varios formatos de entrada y garantiza que el nombre devuelto cumpla con los requisitos de Vertex AI.
 
     Args:
         corpus_name (str): Nombre del corpus
+        tool_context (ToolContext): Herramienta de contexto; si se indica, se usa primero el nombre ya
+            resuelto en la sesion
 
     Returns:
         str: Nombre completo del recurso del corpus
@@ -29,13 +115,17 @@ def get_corpus_resource_name(corpus_name: str) -> str:
     if re.match(r"^projects/[^/]+/locations/[^/]+/ragCorpora/[^/]+$", corpus_name):
         return corpus_name
 
-    # Comprobar si este es un nombre para mostrar de un corpus existente
+    # Nombre ya resuelto en esta sesion
+    if tool_context is not None:
+        resource_name = session_corpus(corpus_name, tool_context)
+        if resource_name:
+            return resource_name
+
+    # Comprobar si este es un nombre para mostrar de un corpus existente (usando el indice cacheado)
     try:
-        # Enumerar todos los corpus y verifique si hay una coincidencia con el nombre para mostrar
-        corpora = rag.list_corpora()
-        for corpus in corpora:
-            if hasattr(corpus, "display_name") and corpus.display_name == corpus_name:
-                return corpus.name
+        resource_name = corpus_resolver.lookup(corpus_name)
+        if resource_name:
+            return resource_name
     except Exception as e:
         logger.warning(f"Error when checking for corpus display name: {str(e)}")
         # Si no se puede comprobar, continuamos con el comportamiento predeterminado
@@ -66,27 +156,23 @@ def check_corpus_exists(corpus_name: str, tool_context: ToolContext) -> bool:
     Returns:
         bool: True si el corpus existe de lo contrario False
     """
-    # Verificar el estado si tool_context fue provisto
-    if tool_context.state.get(f"corpus_exists_{corpus_name}"):
+    # Verificar el estado de la sesion (solo mientras la validacion siga vigente)
+    if session_corpus(corpus_name, tool_context):
         return True
 
     try:
-        # Obtener nombre del recurso completo
-        corpus_resource_name = get_corpus_resource_name(corpus_name)
-
-        # Listar todos los corpora y verificar si este existe
-        corpora = rag.list_corpora()
-        for corpus in corpora:
-            if (
-                corpus.name == corpus_resource_name
-                or corpus.display_name == corpus_name
-            ):
-                # Actualizar el estado
-                tool_context.state[f"corpus_exists_{corpus_name}"] = True
-                # Asignar el nuevo corpus como actual si es que no lo es
-                if not tool_context.state.get("current_corpus"):
-                    tool_context.state["current_corpus"] = corpus_name
-                return True
+        # Buscar el corpus en el indice cacheado, por nombre para mostrar o por nombre de recurso
+        corpus_resource_name = corpus_resolver.lookup(corpus_name)
+        if not corpus_resource_name:
+            corpus_resource_name = corpus_resolver.lookup(get_corpus_resource_name(corpus_name))
+
+        if corpus_resource_name:
+            # Actualizar el estado
+            remember_corpus(corpus_name, corpus_resource_name, tool_context)
+            # Asignar el nuevo corpus como actual si es que no lo es
+            if not tool_context.state.get("current_corpus"):
+                tool_context.state["current_corpus"] = corpus_name
+            return True
 
         return False
     except Exception as e:
@@ -0,0 +1,80 @@
+"""
+Preparacion del proceso antes de recibir consultas: abre el canal con Vertex, resuelve los corpora
+y carga las caches e indices locales, para que la primera consulta no pague esos costos.
+"""
+import logging
+import threading
+import time
+from typing import Optional
+
+from ..rag_backend import rag
+from .corpus_resolver import corpus_resolver
+from .lexical_index import lexical_indexes
+from .metadata_index import metadata_index
+from .rerank import get_scorer
+
+from ..config import (
+    HYBRID_RETRIEVAL_ENABLED,
+    RERANK_ENABLED,
+    WARMUP_LIST_FILES,
+    WARMUP_MAX_CORPORA,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up(list_files: bool = WARMUP_LIST_FILES, max_corpora: int = WARMUP_MAX_CORPORA) -> dict:
+    """
+    Resolver los corpora actuales y preparar las caches
+
+    Args:
+        list_files (bool): Sincronizar tambien los archivos de cada corpus en la copia local de metadatos
+        max_corpora (int): Cantidad maxima de corpora cuyos archivos e indices se preparan
+
+    Returns:
+        dict: Corpora encontrados, corpora preparados y duracion en milisegundos
+    """
+    started = time.perf_counter()
+    # El primer listado abre el canal (TLS y credenciales) y llena el resolver de nombres
+    corpora = list(rag.list_corpora())
+    corpus_resolver.prime(corpora)
+    metadata_index.sync_corpora(corpora)
+
+    prepared = 0
+    for corpus in corpora[:max_corpora]:
+        try:
+            if list_files:
+                metadata_index.refresh(corpus.name)
+            if HYBRID_RETRIEVAL_ENABLED:
+                lexical_indexes.get(corpus.name)
+            prepared += 1
+        except Exception as e:
+            logger.warning(f"Error warming up corpus {corpus.name}: {str(e)}")
+
+    if RERANK_ENABLED:
+        get_scorer()
+
+    return {
+        "corpora": len(corpora),
+        "prepared_corpora": prepared,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+_thread: Optional[threading.Thread] = None
+
+
+def start_warm_up() -> threading.Thread:
+    """Ejecutar warm_up en un hilo de fondo (una sola vez por proceso) para no demorar el arranque."""
+    global _thread
+
+    def run():
+        try:
+            logger.info(f"Warm-up finished: {warm_up()}")
+        except Exception as e:
+            logger.warning(f"Warm-up failed: {str(e)}")
+
+    if _thread is None:
+        _thread = threading.Thread(target=run, name="rag-warmup", daemon=True)
+        _thread.start()
+    return _thread
@@ -0,0 +1,149 @@
+"""
+Clientes gapic de Vertex RAG administrados por el proceso.
+vertexai.rag crea un cliente nuevo (con su canal gRPC, TLS y credenciales) en cada llamada; aqui se llama una sola
+vez a las fabricas del propio SDK por cada lugar del pool y sus clientes se reutilizan en todas las llamadas rag.*.
+El SDK sigue eligiendo version de API, credenciales, endpoint y client_info.
+"""
+import functools
+import inspect
+import itertools
+import logging
+import threading
+from importlib import metadata
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .config import (
+    RAG_CLIENT_POOL_SIZE,
+    RAG_CLIENT_TIMEOUT_SECONDS,
+)
+from .tools.resilience import rpc_timeout
+
+logger = logging.getLogger(__name__)
+
+# Versiones de google-cloud-aiplatform con las fabricas de vertexai.rag.utils._gapic_utils que se envuelven
+# (minima probada, ver requirements.txt; la siguiente mayor puede cambiarlas)
+SUPPORTED_SDK_VERSIONS = ((1, 92), (2, 0))
+_FACTORIES = {
+    "rag_data": "create_rag_data_service_client",
+    "rag": "create_rag_service_client",
+}
+
+
+class _DefaultTimeoutClient:
+    """
+    Reenvia al cliente gapic y agrega un timeout a las RPC que no lo indican: el valor por defecto,
+    acotado a lo que le queda al intento o a la tool en curso
+    """
+
+    def __init__(self, client: Any, timeout: float):
+        self._client = client
+        self._timeout = timeout
+        self._accepts_timeout: Dict[str, bool] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._client, name)
+        if name.startswith("_") or not callable(attr) or isinstance(attr, type):
+            return attr
+        accepts = self._accepts_timeout.get(name)
+        if accepts is None:
+            try:
+                accepts = "timeout" in inspect.signature(attr).parameters
+            except (TypeError, ValueError):
+                accepts = False
+            self._accepts_timeout[name] = accepts
+        if not accepts:
+            return attr
+
+        @functools.wraps(attr)
+        def call(*args, **kwargs):
+            kwargs.setdefault("timeout", rpc_timeout(self._timeout))
+            return attr(*args, **kwargs)
+
+        return call
+
+
+class ClientPool:
+    """
+    Clientes de un servicio creados en el primer uso y repartidos por turnos.
+    Con size=1 todo el proceso usa un unico canal; con mas, las llamadas concurrentes se reparten entre canales.
+    """
+
+    def __init__(self, factory: Callable[[], Any], size: int = RAG_CLIENT_POOL_SIZE):
+        self._factory = factory
+        self._size = max(1, size)
+        self._clients: List[Any] = []
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+
+    def get(self) -> Any:
+        slot = next(self._turn) % self._size
+        if slot >= len(self._clients):
+            with self._lock:
+                while len(self._clients) <= slot:
+                    self._clients.append(self._factory())
+        return self._clients[slot]
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+
+def _sdk_version() -> Optional[Tuple[int, ...]]:
+    """Version instalada de google-cloud-aiplatform (None si no se puede leer)."""
+    try:
+        return tuple(int(part) for part in metadata.version("google-cloud-aiplatform").split(".")[:2])
+    except (metadata.PackageNotFoundError, ValueError):
+        return None
+
+
+def _pooled_factory(original: Callable[..., Any], pool: "ClientPool") -> Callable[..., Any]:
+    @functools.wraps(original)
+    def create(*args: Any, **kwargs: Any) -> Any:
+        # Una llamada con argumentos no es la que se cachea: se delega tal cual al SDK
+        if args or kwargs:
+            return original(*args, **kwargs)
+        return pool.get()
+
+    return create
+
+
+_pools: Dict[str, ClientPool] = {}
+_install_lock = threading.Lock()
+
+
+def install() -> bool:
+    """
+    Reutilizar los clientes que crean las fabricas de vertexai.rag en lugar de uno nuevo por llamada (una sola vez)
+
+    Returns:
+        bool: True si quedaron instalados; False si la version del SDK no es una de las soportadas o no tiene
+            las fabricas esperadas, y se siguen creando clientes por llamada
+    """
+    with _install_lock:
+        if _pools:
+            return True
+        version = _sdk_version()
+        minimum, maximum = SUPPORTED_SDK_VERSIONS
+        if version is None or not minimum <= version < maximum:
+            logger.warning(f"Managed Vertex RAG clients not enabled for google-cloud-aiplatform {version}")
+            return False
+        try:
+            from vertexai.rag.utils import _gapic_utils
+        except ImportError as e:
+            logger.warning(f"Managed Vertex RAG clients not available: {str(e)}")
+            return False
+        originals = {name: getattr(_gapic_utils, attr, None) for name, attr in _FACTORIES.items()}
+        if not all(callable(original) for original in originals.values()):
+            logger.warning("Managed Vertex RAG clients not available: unexpected vertexai.rag client factories")
+            return False
+
+        for name, original in originals.items():
+            _pools[name] = ClientPool(
+                lambda original=original: _DefaultTimeoutClient(original(), RAG_CLIENT_TIMEOUT_SECONDS)
+            )
+            setattr(_gapic_utils, _FACTORIES[name], _pooled_factory(original, _pools[name]))
+        return True
+
+
+def client_stats() -> Dict[str, int]:
+    """Clientes (canales) creados por servicio."""
+    return {name: len(pool) for name, pool in _pools.items()}
@@ -0,0 +1,71 @@
+"""
+Configuracion comun de las pruebas: backend local (RAG_BACKEND=local) y estado en carpetas temporales.
+Las variables se fijan antes de importar rag_agent porque config.py lee el entorno al importarse.
+"""
+import itertools
+import json
+import os
+import tempfile
+from types import SimpleNamespace
+
+_ROOT = tempfile.mkdtemp(prefix="rag_agent_tests_")
+os.environ.update({
+    "RAG_BACKEND": "local",
+    "RAG_STATE_DIR": os.path.join(_ROOT, "state"),
+    "LOCAL_RAG_SOURCE_DIR": os.path.join(_ROOT, "sources"),
+    "RAG_INGESTION_BACKGROUND": "false",
+    "RAG_TELEMETRY_ENABLED": "false",
+    "RAG_WARMUP_ENABLED": "false",
+    "RAG_HYBRID_ENABLED": "false",
+    "RAG_RERANK_ENABLED": "false",
+    "RAG_ADAPTIVE_RETRIEVAL": "false",
+    "RAG_HEDGING_ENABLED": "false",
+})
+
+import pytest  # noqa: E402
+
+_ids = itertools.count(1)
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    """Caches y circuitos compartidos del proceso vacios en cada prueba."""
+    from rag_agent.tools.corpus_resolver import corpus_resolver
+    from rag_agent.tools.query_cache import query_cache
+    from rag_agent.tools.resilience import resilient_calls
+
+    query_cache.clear()
+    corpus_resolver.invalidate()
+    resilient_calls._breakers.clear()
+    yield
+
+
+@pytest.fixture
+def tool_context():
+    """ToolContext minimo: las tools solo usan su estado de sesion."""
+    return SimpleNamespace(state={})
+
+
+@pytest.fixture
+def unique_name():
+    """Nombres unicos para corpora y buckets, ya que el backend local y el estado se comparten entre pruebas."""
+    return lambda prefix="t": f"{prefix}{next(_ids)}"
+
+
+@pytest.fixture
+def bucket(unique_name):
+    """
+    Bucket local (gs://<bucket>/...) dentro de LOCAL_RAG_SOURCE_DIR.
+    bucket.write(ruta, contenido) crea el archivo (dict/list se guardan como JSON) y devuelve su gs:// uri.
+    """
+    name = unique_name("bucket")
+    folder = os.path.join(os.environ["LOCAL_RAG_SOURCE_DIR"], name)
+
+    def write(path: str, content) -> str:
+        full_path = os.path.join(folder, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "w", encoding="utf-8") as f:
+            f.write(content if isinstance(content, str) else json.dumps(content, ensure_ascii=False))
+        return f"gs://{name}/{path}"
+
+    return SimpleNamespace(name=name, uri=f"gs://{name}", folder=folder, write=write)
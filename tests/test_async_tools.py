@@ -0,0 +1,42 @@
+import asyncio
+import contextvars
+import inspect
+import time
+
+from rag_agent.tools import async_tools
+from rag_agent.tools.concurrency import make_async_tool
+from rag_agent.tools.rag_query import rag_query
+
+_request_id = contextvars.ContextVar("request_id", default=None)
+
+
+def test_async_tool_keeps_name_signature_and_docstring():
+    assert asyncio.iscoroutinefunction(async_tools.rag_query)
+    assert async_tools.rag_query.__name__ == "rag_query"
+    assert async_tools.rag_query.__doc__ == rag_query.__doc__
+    assert inspect.signature(async_tools.rag_query) == inspect.signature(rag_query)
+
+
+def test_async_tools_run_off_the_event_loop_with_the_caller_context():
+    def slow_tool(value: str) -> dict:
+        time.sleep(0.2)
+        return {"status": "success", "value": value, "request_id": _request_id.get()}
+
+    tool = make_async_tool(slow_tool)
+
+    async def main():
+        _request_id.set("r1")
+        started = time.monotonic()
+        responses = await asyncio.gather(*(tool(str(i)) for i in range(4)))
+        return responses, time.monotonic() - started
+
+    responses, elapsed = asyncio.run(main())
+
+    assert [r["value"] for r in responses] == ["0", "1", "2", "3"]
+    assert all(r["request_id"] == "r1" for r in responses)
+    assert elapsed < 0.6
+
+
+def test_async_tool_answers_like_the_sync_tool(tool_context):
+    response = asyncio.run(async_tools.rag_query("no_existe", "q", tool_context))
+    assert response == rag_query("no_existe", "q", tool_context)
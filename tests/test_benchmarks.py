@@ -0,0 +1,35 @@
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.tool_bench import compare, percentile
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_percentile_and_regression_check():
+    assert percentile([], 95) == 0.0
+    assert percentile(list(range(1, 101)), 50) == 50
+    assert percentile(list(range(1, 101)), 95) == 95
+
+    baseline = {"results": [{"tool": "rag_query", "p95_ms": 10.0, "sdk_calls_per_invocation": 1.0}]}
+    current = [{"tool": "rag_query", "p95_ms": 13.0, "sdk_calls_per_invocation": 1.0}]
+    assert compare(current, baseline, max_regression=0.2) == ["rag_query.p95_ms: 10.0 -> 13.0"]
+    assert compare(current, baseline, max_regression=0.5) == []
+
+
+def test_tool_bench_runs_against_the_fake_backend(tmp_path):
+    output = tmp_path / "bench.json"
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.tool_bench", "--iterations", "5", "--latency-ms", "0",
+         "--corpora", "2", "--files-per-corpus", "5", "--tools", "rag_query", "list_corpora",
+         "--output", str(output)],
+        cwd=_ROOT, capture_output=True, text=True, timeout=120,
+    )
+    assert completed.returncode == 0, completed.stderr
+
+    results = {row["tool"]: row for row in json.loads(output.read_text())["results"]}
+    assert results["rag_query"]["statuses"] == {"success": 5}
+    # Las consultas repetidas salen de la cache: menos de una llamada al SDK por invocacion
+    assert results["rag_query"]["sdk_calls_per_invocation"] < 2
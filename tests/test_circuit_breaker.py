@@ -0,0 +1,158 @@
+import threading
+import time
+
+import pytest
+
+from rag_agent.tools import list_corpora as list_corpora_module
+from rag_agent.tools import rag_query as rag_query_module
+from rag_agent.tools import resilience
+from rag_agent.tools.add_data import add_data
+from rag_agent.tools.corpus_resolver import corpus_resolver
+from rag_agent.tools.create_corpus import create_corpus
+from rag_agent.tools.list_corpora import list_corpora
+from rag_agent.tools.rag_query import rag_query
+from rag_agent.tools.resilience import CircuitBreaker, CircuitOpenError, ResilientCaller
+from rag_agent.tools.stale_cache import StaleCache
+
+
+class ServiceUnavailable(Exception):
+    pass
+
+
+class DownRag:
+    def list_corpora(self):
+        raise ServiceUnavailable("503 Vertex no responde")
+
+
+def test_breaker_opens_probes_and_closes():
+    breaker = CircuitBreaker(failure_threshold=2, open_seconds=0.05)
+
+    assert not breaker.record_failure()
+    assert breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    assert breaker.allow() and not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_failed_probe_reopens_the_breaker():
+    breaker = CircuitBreaker(failure_threshold=3, open_seconds=0.05)
+    for _ in range(3):
+        breaker.record_failure()
+    time.sleep(0.06)
+
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_open_circuit_rejects_calls_without_running_them(monkeypatch):
+    caller = ResilientCaller(hedging=False, circuit_breaker=True)
+    caller._breakers["op"] = CircuitBreaker(failure_threshold=2, open_seconds=60)
+    calls = []
+
+    def down():
+        calls.append(1)
+        raise ServiceUnavailable()
+
+    for _ in range(2):
+        with pytest.raises(ServiceUnavailable):
+            caller.call("op", down)
+    with pytest.raises(CircuitOpenError):
+        caller.call("op", down)
+
+    assert len(calls) == 2
+    assert caller.stats()["op"]["circuit"] == "open" and caller.stats()["op"]["rejected"] == 1
+
+
+def test_permanent_errors_do_not_open_the_circuit():
+    caller = ResilientCaller(hedging=False, circuit_breaker=True)
+    caller._breakers["op"] = CircuitBreaker(failure_threshold=1, open_seconds=60)
+
+    def missing():
+        raise ValueError("no existe")
+
+    with pytest.raises(ValueError):
+        caller.call("op", missing)
+    assert caller.breaker("op").state == "closed"
+
+
+def test_stale_cache_serves_recent_responses_only(tmp_path):
+    cache = StaleCache(db_file=str(tmp_path / "stale.sqlite"), max_age_seconds=60)
+    key = cache.make_key("rag_query", "corpus", "q")
+    cache.put(key, {"status": "success", "results": [1]})
+
+    value, age = cache.get(key)
+    assert value == {"status": "success", "results": [1]} and age < 60
+    assert cache.get(cache.make_key("rag_query", "corpus", "otra")) is None
+
+    cache.max_age_seconds = 0
+    assert cache.get(key) is None
+    assert StaleCache(db_file=str(tmp_path / "off.sqlite"), enabled=False).get(key) is None
+
+
+def test_stale_cache_writes_in_the_background_and_skips_unchanged_answers(tmp_path, monkeypatch):
+    cache = StaleCache(db_file=str(tmp_path / "stale.sqlite"), refresh_seconds=60)
+    writers = []
+    write = cache._write
+    monkeypatch.setattr(cache, "_write", lambda entries: writers.append(threading.current_thread().name) or write(entries))
+    key = cache.make_key("rag_query", "corpus", "q")
+
+    cache.put(key, {"results": [1]})
+    cache.put(key, {"results": [1]})
+    assert cache.get(key)[0] == {"results": [1]}
+    cache.put(key, {"results": [2]})
+
+    assert cache.flush(timeout=5)
+    assert set(writers) == {"rag-stale-cache"}
+    assert cache.get(key)[0] == {"results": [2]}
+    stats = cache.stats()
+    assert (stats["puts"], stats["unchanged"], stats["pending"], stats["size"]) == (3, 1, 0, 1)
+
+
+def test_stale_cache_trims_to_max_entries_off_the_caller_thread(tmp_path):
+    cache = StaleCache(db_file=str(tmp_path / "stale.sqlite"), max_entries=10)
+    for i in range(100):
+        cache.put(cache.make_key("rag_query", "corpus", i), {"results": [i]})
+
+    assert cache.flush(timeout=5)
+    assert cache.stats()["size"] == 10
+    assert cache.get(cache.make_key("rag_query", "corpus", 99))[0] == {"results": [99]}
+
+
+def test_rag_query_falls_back_to_the_last_good_answer(monkeypatch, tool_context, bucket, unique_name):
+    bucket.write("a.txt", "fracciones")
+    corpus = unique_name("stale")
+    create_corpus(corpus, tool_context)
+    add_data(corpus, [bucket.uri], tool_context)
+    fresh = rag_query(corpus, "fracciones", tool_context)
+
+    def down(*args, **kwargs):
+        raise ServiceUnavailable("503")
+
+    monkeypatch.setattr(rag_query_module, "retrieve_contexts", down)
+    stale = rag_query(corpus, "fracciones", tool_context)
+    assert stale["stale"] is True and stale["results"] == fresh["results"]
+    assert "503" in stale["message"]
+
+    # Sin respuesta guardada para la consulta se informa el error
+    assert rag_query(corpus, "otra consulta", tool_context)["status"] == "error"
+
+
+def test_list_corpora_and_resolver_use_the_last_listing(monkeypatch, tool_context, unique_name):
+    corpus = unique_name("stale")
+    create_corpus(corpus, tool_context)
+    assert list_corpora()["status"] == "success"
+
+    monkeypatch.setattr(resilience, "RETRY_BASE_DELAY_SECONDS", 0.0)
+    monkeypatch.setattr(list_corpora_module, "rag", DownRag())
+    monkeypatch.setattr("rag_agent.tools.corpus_resolver.rag", DownRag())
+    stale = list_corpora()
+    assert stale["stale"] is True and corpus in {c["display_name"] for c in stale["corpora"]}
+
+    # El resolver arranca vacio y sin Vertex usa la copia local de metadatos
+    corpus_resolver.invalidate()
+    assert corpus_resolver.lookup(corpus)
@@ -0,0 +1,66 @@
+from rag_agent.tools.context_merge import (
+    apply_token_budget,
+    compact_contexts,
+    drop_near_duplicates,
+    merge_overlapping,
+)
+
+_TEXT = "El teorema de Pitagoras relaciona los catetos con la hipotenusa de un triangulo rectangulo."
+
+
+def test_overlapping_chunks_of_the_same_file_are_joined():
+    results = [
+        {"source_uri": "gs://b/a.txt", "text": _TEXT[30:], "score": 0.2},
+        {"source_uri": "gs://b/otro.txt", "text": "otro texto", "score": 0.3},
+        {"source_uri": "gs://b/a.txt", "text": _TEXT[:60], "score": 0.1},
+    ]
+
+    merged = merge_overlapping(results, min_overlap=20)
+
+    assert [r["source_uri"] for r in merged] == ["gs://b/a.txt", "gs://b/otro.txt"]
+    assert merged[0]["text"] == _TEXT
+    assert (merged[0]["score"], merged[0]["merged_chunks"]) == (0.1, 2)
+
+
+def test_short_overlaps_and_other_files_are_not_joined():
+    results = [
+        {"source_uri": "gs://b/a.txt", "text": "uno dos tres", "score": 0.1},
+        {"source_uri": "gs://b/a.txt", "text": "tres cuatro", "score": 0.2},
+        {"source_uri": "gs://b/b.txt", "text": "uno dos tres", "score": 0.3},
+    ]
+
+    assert len(merge_overlapping(results, min_overlap=20)) == 3
+
+
+def test_near_duplicates_keep_the_best_score():
+    results = [
+        {"source_uri": "a", "text": "uno dos tres cuatro cinco", "score": 0.3},
+        {"source_uri": "b", "text": "Uno, dos, tres, cuatro, cinco.", "score": 0.1},
+        {"source_uri": "c", "text": "seis siete", "score": 0.4},
+    ]
+
+    kept = drop_near_duplicates(results, threshold=0.9)
+
+    assert [(r["source_uri"], r["score"]) for r in kept] == [("a", 0.1), ("c", 0.4)]
+
+
+def test_token_budget_keeps_leading_contexts_and_truncates_a_single_large_one():
+    results = [{"text": "x" * 40}, {"text": "y" * 40}, {"text": "z" * 40}]
+
+    assert [r["text"][0] for r in apply_token_budget(results, token_budget=20)] == ["x", "y"]
+    assert apply_token_budget(results, token_budget=0) == results
+
+    truncated = apply_token_budget([{"text": "w" * 400}], token_budget=10)
+    assert truncated == [{"text": "w" * 40, "truncated": True}]
+
+
+def test_compact_contexts_merges_before_applying_the_budget():
+    results = [
+        {"source_uri": "gs://b/a.txt", "text": _TEXT[:60], "score": 0.1},
+        {"source_uri": "gs://b/a.txt", "text": _TEXT[30:], "score": 0.2},
+        {"source_uri": "gs://b/c.txt", "text": "c" * 400, "score": 0.3},
+    ]
+
+    compacted = compact_contexts(results, token_budget=50)
+
+    assert [r["text"] for r in compacted] == [_TEXT]
@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+
+import pytest
+
+from rag_agent.tools import corpus_resolver as resolver_module
+from rag_agent.tools.corpus_resolver import CorpusResolver
+
+
+class FakeRag:
+    def __init__(self, *corpora):
+        self.corpora = list(corpora)
+        self.list_calls = 0
+
+    def list_corpora(self):
+        self.list_calls += 1
+        return list(self.corpora)
+
+
+def _corpus(display_name, number):
+    return SimpleNamespace(display_name=display_name, name=f"projects/p/locations/l/ragCorpora/{number}")
+
+
+@pytest.fixture
+def fake_rag(monkeypatch):
+    fake = FakeRag(_corpus("uno", 1), _corpus("dos", 2))
+    monkeypatch.setattr(resolver_module, "rag", fake)
+    return fake
+
+
+def test_lookups_share_one_listing_within_ttl(fake_rag):
+    resolver = CorpusResolver(ttl_seconds=60, negative_ttl_seconds=60)
+
+    assert resolver.lookup("uno") == "projects/p/locations/l/ragCorpora/1"
+    assert resolver.lookup("dos") == "projects/p/locations/l/ragCorpora/2"
+    assert resolver.lookup("projects/p/locations/l/ragCorpora/2") == "projects/p/locations/l/ragCorpora/2"
+    assert fake_rag.list_calls == 1
+
+
+def test_missing_names_are_cached_negatively(fake_rag):
+    resolver = CorpusResolver(ttl_seconds=60, negative_ttl_seconds=60)
+
+    assert resolver.lookup("tres") is None
+    assert resolver.lookup("tres") is None
+    assert fake_rag.list_calls == 1
+    assert resolver.stats()["negative_hits"] == 1
+
+
+def test_expired_negative_entry_lists_again(fake_rag):
+    resolver = CorpusResolver(ttl_seconds=60, negative_ttl_seconds=0)
+
+    assert resolver.lookup("tres") is None
+    fake_rag.corpora.append(_corpus("tres", 3))
+    assert resolver.lookup("tres") == "projects/p/locations/l/ragCorpora/3"
+    assert fake_rag.list_calls == 2
+
+
+def test_expired_index_lists_again(fake_rag):
+    resolver = CorpusResolver(ttl_seconds=0, negative_ttl_seconds=0)
+
+    resolver.lookup("uno")
+    resolver.lookup("uno")
+    assert fake_rag.list_calls == 2
+
+
+def test_register_and_invalidate(fake_rag):
+    resolver = CorpusResolver(ttl_seconds=60, negative_ttl_seconds=60)
+    assert resolver.lookup("nuevo") is None
+
+    resolver.register("nuevo", "projects/p/locations/l/ragCorpora/9")
+    assert resolver.lookup("nuevo") == "projects/p/locations/l/ragCorpora/9"
+
+    resolver.invalidate("nuevo")
+    assert resolver.lookup("nuevo") is None
+    assert resolver.lookup("uno") == "projects/p/locations/l/ragCorpora/1"
+    assert fake_rag.list_calls == 1
+
+    resolver.invalidate()
+    resolver.lookup("uno")
+    assert fake_rag.list_calls == 2
@@ -0,0 +1,63 @@
+from rag_agent.tools import delete_documents as delete_module
+from rag_agent.tools.add_data import add_data
+from rag_agent.tools.create_corpus import create_corpus
+from rag_agent.tools.delete_documents import delete_documents
+from rag_agent.tools.find_documents import find_documents
+
+
+def _corpus(tool_context, bucket, unique_name):
+    for level in (1, 2):
+        for subject in ("matematica", "lenguaje"):
+            bucket.write(f"{subject}/nivel_{level}_{subject}.txt", f"{subject} nivel {level}")
+    corpus = unique_name("bulk")
+    create_corpus(corpus, tool_context)
+    add_data(corpus, [bucket.uri], tool_context)
+    return corpus
+
+
+def _remaining(corpus, tool_context):
+    return sorted(d["display_name"] for d in find_documents(corpus, "", "", tool_context)["documents"])
+
+
+def test_preview_requires_confirmation(tool_context, bucket, unique_name):
+    corpus = _corpus(tool_context, bucket, unique_name)
+
+    preview = delete_documents(corpus, [], "nivel_1_*", "", False, tool_context)
+
+    assert preview["status"] == "error" and preview["documents_count"] == 2
+    assert len(_remaining(corpus, tool_context)) == 4
+
+
+def test_delete_by_glob_prefix_and_ids_without_duplicates(tool_context, bucket, unique_name):
+    corpus = _corpus(tool_context, bucket, unique_name)
+    math = find_documents(corpus, "", f"{bucket.uri}/matematica/", tool_context)["documents"]
+
+    response = delete_documents(
+        corpus, [math[0]["document_id"]], "", f"{bucket.uri}/matematica/", True, tool_context
+    )
+
+    assert response["status"] == "success" and response["deleted_count"] == 2
+    assert _remaining(corpus, tool_context) == ["nivel_1_lenguaje.txt", "nivel_2_lenguaje.txt"]
+
+    # Volver a agregar los archivos borrados los importa de nuevo
+    again = add_data(corpus, [bucket.uri], tool_context)
+    assert (again["files_added"], again["files_unchanged"]) == (2, 2)
+
+
+def test_failed_deletes_are_reported_per_document(tool_context, bucket, unique_name):
+    corpus = _corpus(tool_context, bucket, unique_name)
+
+    response = delete_documents(corpus, ["no_existe"], "nivel_2_lenguaje.txt", "", True, tool_context)
+
+    assert response["status"] == "partial" and response["deleted_count"] == 1
+    assert {r["document_id"]: r["status"] for r in response["results"]}["no_existe"] == "error"
+
+
+def test_limits_and_validation(monkeypatch, tool_context, bucket, unique_name):
+    corpus = _corpus(tool_context, bucket, unique_name)
+    monkeypatch.setattr(delete_module, "BULK_DELETE_MAX_FILES", 3)
+
+    assert delete_documents(corpus, [], "", "", True, tool_context)["status"] == "error"
+    too_many = delete_documents(corpus, [], "*", "", True, tool_context)
+    assert too_many["status"] == "error" and "maximo 3" in too_many["message"]
+    assert len(_remaining(corpus, tool_context)) == 4
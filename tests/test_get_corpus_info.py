@@ -0,0 +1,54 @@
+from rag_agent.tools.add_data import add_data
+from rag_agent.tools.create_corpus import create_corpus
+from rag_agent.tools.get_corpus_info import get_corpus_info
+
+
+def _corpus_with_files(tool_context, bucket, unique_name, count):
+    for i in range(count):
+        bucket.write(f"doc{i}.txt", f"contenido {i}")
+    corpus = unique_name("info")
+    create_corpus(corpus, tool_context)
+    add_data(corpus, [bucket.uri], tool_context)
+    return corpus
+
+
+def test_pages_follow_next_page_token(tool_context, bucket, unique_name):
+    corpus = _corpus_with_files(tool_context, bucket, unique_name, 5)
+
+    seen, token, pages = [], "", 0
+    while True:
+        page = get_corpus_info(corpus, tool_context, page_size=2, page_token=token)
+        assert page["status"] == "success" and page["file_count"] <= 2
+        seen += [f["display_name"] for f in page["files"]]
+        pages += 1
+        token = page["next_page_token"]
+        if not token:
+            break
+
+    assert pages == 3
+    assert sorted(seen) == [f"doc{i}.txt" for i in range(5)]
+
+
+def test_fields_projection_and_validation(tool_context, bucket, unique_name):
+    corpus = _corpus_with_files(tool_context, bucket, unique_name, 1)
+
+    page = get_corpus_info(corpus, tool_context, fields="file_id, source_uri")
+    assert list(page["files"][0]) == ["file_id", "source_uri"]
+    assert page["files"][0]["source_uri"] == f"{bucket.uri}/doc0.txt"
+
+    invalid = get_corpus_info(corpus, tool_context, fields="file_id,tamano")
+    assert invalid["status"] == "error" and "tamano" in invalid["message"]
+
+
+def test_summary_counts_without_listing_files(tool_context, bucket, unique_name):
+    corpus = _corpus_with_files(tool_context, bucket, unique_name, 3)
+
+    summary = get_corpus_info(corpus, tool_context, summary=True)
+
+    assert "files" not in summary
+    assert summary["file_count"] == 3
+    assert summary["files_by_source"] == {bucket.uri: 3}
+
+
+def test_missing_corpus(tool_context):
+    assert get_corpus_info("no_existe", tool_context)["status"] == "error"
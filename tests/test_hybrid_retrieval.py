@@ -0,0 +1,106 @@
+import pytest
+
+from rag_agent.tools import ingestion, rag_query as rag_query_module
+from rag_agent.tools.add_data import add_data
+from rag_agent.tools.context_merge import reciprocal_rank_fusion
+from rag_agent.tools.create_corpus import create_corpus
+from rag_agent.tools.rag_query import rag_query, threshold_hits
+from rag_agent.tools.rag_query_multi_corpus import merge_results
+from rag_agent.tools.rerank import rerank
+
+
+class FlatScorer:
+    def score(self, query, texts):
+        return [1.0] * len(texts)
+
+
+def test_rrf_keeps_vector_score_and_adds_fused_score():
+    vector = [{"source_uri": "a", "text": "uno", "score": 0.2}, {"source_uri": "b", "text": "dos", "score": 0.4}]
+    lexical = [
+        {"source_uri": "c", "text": "tres", "score": None, "lexical_score": 3.0},
+        {"source_uri": "a", "text": "uno", "score": None, "lexical_score": 1.0},
+    ]
+    fused = reciprocal_rank_fusion([vector, lexical], top_k=3)
+
+    assert [r["source_uri"] for r in fused] == ["a", "c", "b"]
+    assert fused[0]["score"] == 0.2 and fused[0]["lexical_score"] == 1.0
+    assert fused[1]["score"] is None
+    assert all(r["fused_score"] > 0 for r in fused)
+
+
+def test_rrf_fuses_chunks_with_different_boundaries():
+    passage = "el teorema de pitagoras relaciona los catetos con la hipotenusa de un triangulo rectangulo"
+    words = passage.split()
+    vector = [
+        {"source_uri": "a", "text": " ".join(words[:10]), "score": 0.3},
+        {"source_uri": "b", "text": "otro archivo", "score": 0.5},
+    ]
+    lexical = [
+        {"source_uri": "a", "text": " ".join(words[6:]), "score": None, "lexical_score": 2.0},
+        {"source_uri": "c", "text": " ".join(words[:10]), "score": None, "lexical_score": 1.0},
+    ]
+    fused = reciprocal_rank_fusion([vector, lexical], top_k=5)
+
+    assert [r["source_uri"] for r in fused] == ["a", "b", "c"]
+    assert fused[0]["text"] == passage
+    assert fused[0]["score"] == 0.3 and fused[0]["lexical_score"] == 2.0
+
+
+def test_rrf_fuses_flat_and_record_chunks_of_the_same_json():
+    vector = [{"source_uri": "p.json", "text": '{"tema": "fracciones", "nivel": "basico"}', "score": 0.2}]
+    lexical = [{"source_uri": "p.json", "text": "tema: fracciones\nnivel: basico", "score": None, "lexical_score": 1.5}]
+    fused = reciprocal_rank_fusion([vector, lexical], top_k=5)
+
+    assert len(fused) == 1
+    assert fused[0]["text"] == vector[0]["text"] and fused[0]["lexical_score"] == 1.5
+
+
+def test_threshold_hits_ignores_lexical_only_results():
+    assert threshold_hits([{"score": 0.1}, {"score": None}, {"score": 0.0}]) == 2
+
+
+def test_rerank_zero_range_does_not_flatten_ranking():
+    results = [{"text": "a", "score": 0.3}, {"text": "b", "score": 0.1}, {"text": "c", "score": 0.2}]
+    ranked = rerank("q", results, top_k=3, weight=0.5, scorer=FlatScorer())
+
+    assert [r["text"] for r in ranked] == ["b", "c", "a"]
+    assert ranked[0]["rerank_score"] > 0
+
+
+def test_rerank_ranks_missing_vector_score_last():
+    results = [{"text": "a", "score": None}, {"text": "b", "score": 0.4}, {"text": "c", "score": 0.4}]
+    ranked = rerank("q", results, top_k=3, weight=0.5, scorer=FlatScorer())
+
+    assert [r["text"] for r in ranked] == ["b", "c", "a"]
+
+
+@pytest.mark.parametrize("strategy", ["score", "rrf"])
+def test_merge_results_handles_missing_scores(strategy):
+    merged = merge_results({
+        "c1": [{"source_uri": "x", "text": "solo lexico", "score": None}, {"source_uri": "y", "text": "y", "score": 0.3}],
+        "c2": [{"source_uri": "z", "text": "z", "score": 0.1}],
+    }, top_k=3, strategy=strategy)
+
+    assert len(merged) == 3
+    if strategy == "score":
+        assert [r["source_uri"] for r in merged] == ["z", "y", "x"]
+
+
+def test_hybrid_lexical_hits_do_not_fake_a_distance(monkeypatch, tool_context, bucket, unique_name):
+    monkeypatch.setattr(rag_query_module, "HYBRID_RETRIEVAL_ENABLED", True)
+    monkeypatch.setattr(ingestion, "HYBRID_RETRIEVAL_ENABLED", True)
+    bucket.write("notas.txt", "El teorema de Pitagoras relaciona los catetos con la hipotenusa")
+    corpus = unique_name("hybrid")
+    create_corpus(corpus, tool_context)
+    add_data(corpus, [bucket.uri], tool_context)
+
+    # Con un umbral tan estricto ningun chunk pasa la busqueda vectorial: solo quedan los de BM25
+    response = rag_query(corpus, "hipotenusa", tool_context, distance_threshold=0.001)
+
+    assert response["status"] == "success"
+    assert all(r["score"] is None for r in response["results"])
+    assert all(r["fused_score"] > 0 for r in response["results"])
+
+    # El modo adaptativo no se detiene con resultados que no pasaron el umbral vectorial
+    adaptive = rag_query(corpus, "hipotenusa", tool_context, distance_threshold=0.001, adaptive=True)
+    assert adaptive["retrieval"]["attempts"] == 3
@@ -0,0 +1,58 @@
+from rag_agent.rag_backend import rag
+from rag_agent.tools.add_data import add_data
+from rag_agent.tools.create_corpus import create_corpus
+from rag_agent.tools.ingestion import plan_incremental_import
+from rag_agent.tools.utils import get_corpus_resource_name
+
+
+def _statuses(response):
+    return {r["path"].rsplit("/", 1)[-1]: r["status"] for r in response["path_results"]}
+
+
+def test_unchanged_files_are_skipped_and_modified_files_replaced(tool_context, bucket, unique_name):
+    bucket.write("a.txt", "fracciones")
+    bucket.write("b.txt", "ecuaciones")
+    corpus = unique_name("manifest")
+    create_corpus(corpus, tool_context)
+    assert add_data(corpus, [bucket.uri], tool_context)["files_added"] == 2
+
+    again = add_data(corpus, [bucket.uri], tool_context)
+    assert (again["files_added"], again["files_unchanged"], again["files_replaced"]) == (0, 2, 0)
+    assert _statuses(again) == {"a.txt": "unchanged", "b.txt": "unchanged"}
+
+    bucket.write("b.txt", "geometria")
+    bucket.write("c.txt", "probabilidad")
+    changed = add_data(corpus, [bucket.uri], tool_context)
+    assert (changed["files_added"], changed["files_unchanged"], changed["files_replaced"]) == (2, 1, 1)
+
+    resource_name = get_corpus_resource_name(corpus, tool_context)
+    names = {f.display_name for f in rag.list_files(resource_name)}
+    assert names == {"a.txt", "b.txt", "c.txt"}
+    contexts = rag.retrieval_query(
+        rag_resources=[rag.RagResource(rag_corpus=resource_name)], text="geometria",
+        rag_retrieval_config=rag.RagRetrievalConfig(top_k=1),
+    ).contexts.contexts
+    assert contexts[0].text == "geometria"
+
+
+def test_files_imported_outside_the_manifest_are_adopted(tool_context, bucket, unique_name):
+    uri = bucket.write("a.txt", "fracciones")
+    corpus = unique_name("manifest")
+    create_corpus(corpus, tool_context)
+    resource_name = get_corpus_resource_name(corpus, tool_context)
+    rag.import_files(resource_name, [uri])
+
+    plan = plan_incremental_import(resource_name, [bucket.uri])
+
+    assert plan["to_import"] == [] and plan["unchanged"] == [uri]
+    assert [adopted[0] for adopted in plan["adopted"]] == [uri]
+
+
+def test_non_gcs_paths_are_always_imported(tool_context, unique_name):
+    corpus = unique_name("manifest")
+    create_corpus(corpus, tool_context)
+    drive = "https://drive.google.com/file/d/abc/view"
+
+    plan = plan_incremental_import(get_corpus_resource_name(corpus, tool_context), [drive])
+
+    assert plan["to_import"] == [drive]
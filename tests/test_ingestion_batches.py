@@ -0,0 +1,136 @@
+import math
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from rag_agent.config import CHARS_PER_TOKEN, DEFAULT_CHUNK_OVERLAP, DEFAULT_CHUNK_SIZE
+from rag_agent.local_rag import ChunkingConfig, TransformationConfig
+from rag_agent.tools import ingestion
+from rag_agent.tools.rate_limit import TokenBucket
+
+
+class ServiceUnavailable(Exception):
+    pass
+
+
+class FakeRag:
+    """import_files con respuestas programadas (un resultado o una excepcion por llamada)."""
+    TransformationConfig = TransformationConfig
+    ChunkingConfig = ChunkingConfig
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = []
+
+    def import_files(self, corpus_name, paths, **kwargs):
+        self.calls.append(list(paths))
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        imported, skipped, failed = outcome
+        return SimpleNamespace(
+            imported_rag_files_count=imported, skipped_rag_files_count=skipped, failed_rag_files_count=failed
+        )
+
+
+class RecordingLimiter:
+    def __init__(self):
+        self.acquired = []
+
+    def acquire(self, tokens=1.0, timeout=None):
+        self.acquired.append(tokens)
+        return True
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    limiter = RecordingLimiter()
+    monkeypatch.setattr(ingestion, "embedding_rate_limiter", limiter)
+    monkeypatch.setattr(ingestion, "ADD_DATA_RETRY_BASE_SECONDS", 0.0)
+    return limiter
+
+
+def test_estimate_embedding_requests_uses_file_sizes(bucket):
+    chars_per_chunk = (DEFAULT_CHUNK_SIZE - DEFAULT_CHUNK_OVERLAP) * CHARS_PER_TOKEN
+    bucket.write("docs/grande.txt", "x" * (chars_per_chunk * 3 + 1))
+    bucket.write("docs/chico.txt", "y")
+
+    assert ingestion.estimate_embedding_requests([f"{bucket.uri}/docs"]) == 4 + 1
+    # Paths sin tamaño conocido (Drive, inexistentes) cuentan como un chunk
+    assert ingestion.estimate_embedding_requests(["https://drive.google.com/file/d/abc/view"]) == 1
+
+
+def test_batch_charges_estimated_chunks_not_files(monkeypatch, limiter, bucket):
+    monkeypatch.setattr(ingestion, "rag", FakeRag((1, 0, 0)))
+    uri = bucket.write("a.txt", "z" * 10000)
+
+    ingestion._import_batch("corpus", 0, [uri], max_concurrent_batches=1)
+
+    expected = math.ceil(10000 / ((DEFAULT_CHUNK_SIZE - DEFAULT_CHUNK_OVERLAP) * CHARS_PER_TOKEN))
+    assert limiter.acquired == [expected]
+
+
+def test_partial_failures_are_recorded_not_retried(monkeypatch, limiter):
+    fake = FakeRag((2, 0, 1))
+    monkeypatch.setattr(ingestion, "rag", fake)
+
+    batch = ingestion._import_batch("corpus", 0, ["gs://b/1", "gs://b/2", "gs://b/3"], max_concurrent_batches=1)
+
+    assert len(fake.calls) == 1 and len(limiter.acquired) == 1
+    assert (batch["imported"], batch["failed"], batch["attempts"]) == (2, 1, 1)
+    assert ingestion._batch_status(batch) == "partial"
+
+
+def test_transient_errors_are_retried(monkeypatch, limiter):
+    fake = FakeRag(ServiceUnavailable("503"), (2, 0, 0))
+    monkeypatch.setattr(ingestion, "rag", fake)
+
+    batch = ingestion._import_batch("corpus", 0, ["gs://b/1", "gs://b/2"], max_concurrent_batches=1)
+
+    assert len(fake.calls) == 2
+    assert (batch["imported"], batch["failed"], batch["error"]) == (2, 0, "")
+
+
+def test_permanent_errors_are_not_retried(monkeypatch, limiter):
+    fake = FakeRag(ValueError("formato invalido"), (1, 0, 0))
+    monkeypatch.setattr(ingestion, "rag", fake)
+
+    batch = ingestion._import_batch("corpus", 0, ["gs://b/1"], max_concurrent_batches=1)
+
+    assert len(fake.calls) == 1
+    assert batch["failed"] == 1 and "formato invalido" in batch["error"]
+
+
+def test_paths_are_split_into_batches_with_per_path_status(monkeypatch, limiter):
+    fake = FakeRag((2, 0, 0), ValueError("rechazado"), (0, 1, 0))
+    monkeypatch.setattr(ingestion, "rag", fake)
+    paths = [f"gs://b/{i}" for i in range(5)]
+
+    result = ingestion.import_paths_in_batches("corpus", paths, batch_size=2, max_concurrent_batches=1)
+
+    assert fake.calls == [paths[0:2], paths[2:4], paths[4:5]]
+    assert (result["imported"], result["failed"], result["skipped"]) == (2, 2, 1)
+    assert [r["status"] for r in result["path_results"]] == ["imported", "imported", "failed", "failed", "skipped"]
+
+
+def test_mixed_batches_do_not_claim_a_status_per_path(monkeypatch, limiter):
+    monkeypatch.setattr(ingestion, "rag", FakeRag((1, 0, 1), (2, 0, 0)))
+    paths = [f"gs://b/{i}" for i in range(4)]
+
+    result = ingestion.import_paths_in_batches("corpus", paths, batch_size=2, max_concurrent_batches=1)
+
+    assert [batch["status"] for batch in result["batches"]] == ["partial", "imported"]
+    assert [r["status"] for r in result["path_results"]] == ["unknown", "unknown", "imported", "imported"]
+
+
+def test_token_bucket_refills_at_its_rate():
+    bucket = TokenBucket(rate_per_minute=600, capacity=2)
+
+    assert bucket.acquire(2, timeout=0)
+    assert not bucket.acquire(1, timeout=0)
+    started = time.monotonic()
+    assert bucket.acquire(1, timeout=1)
+    assert 0.05 <= time.monotonic() - started < 0.5
+    # Pedidos mayores que la capacidad se limitan a ella en lugar de esperar para siempre
+    assert bucket.acquire(50, timeout=1)
@@ -0,0 +1,101 @@
+import sqlite3
+import time
+
+import pytest
+
+from rag_agent.tools import add_data as add_data_module
+from rag_agent.tools import ingestion_jobs as jobs_module
+from rag_agent.tools.add_data import add_data
+from rag_agent.tools.create_corpus import create_corpus
+from rag_agent.tools.get_ingestion_status import get_ingestion_status
+from rag_agent.tools.ingestion_jobs import IngestionJobManager
+
+# Tabla de la primera version, sin las columnas unchanged y replaced
+_V1_SCHEMA = """
+CREATE TABLE ingestion_jobs (
+    job_id TEXT PRIMARY KEY, corpus_name TEXT NOT NULL, corpus_resource_name TEXT NOT NULL,
+    paths TEXT NOT NULL, state TEXT NOT NULL, total_paths INTEGER NOT NULL, batches_total INTEGER NOT NULL,
+    batches_done INTEGER NOT NULL DEFAULT 0, imported INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0, skipped INTEGER NOT NULL DEFAULT 0, error TEXT NOT NULL DEFAULT '',
+    path_results TEXT NOT NULL DEFAULT '[]', attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL, updated_at REAL NOT NULL
+)
+"""
+
+
+def _ingestion_result(imported=1, failed=0):
+    return {
+        "imported": imported, "failed": failed, "skipped": 0, "unchanged": 0, "replaced": 0,
+        "batches": [{"error": "fallo" if failed else ""}], "path_results": [],
+    }
+
+
+def _wait(manager, job_id, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = manager.get(job_id)
+        if job["state"] not in ("queued", "running"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"El job {job_id} no termino")
+
+
+@pytest.fixture
+def fake_import(monkeypatch):
+    calls = []
+
+    def fake(corpus_resource_name, paths, on_plan=None, on_batch_done=None):
+        calls.append(paths)
+        return _ingestion_result(failed=1 if "gs://b/malo" in paths else 0)
+
+    monkeypatch.setattr(jobs_module, "import_paths_incremental", fake)
+    return calls
+
+
+def test_old_tables_are_migrated_and_interrupted_jobs_resumed(tmp_path, fake_import):
+    db_file = str(tmp_path / "jobs.sqlite")
+    conn = sqlite3.connect(db_file)
+    conn.execute(_V1_SCHEMA)
+    conn.execute(
+        "INSERT INTO ingestion_jobs (job_id, corpus_name, corpus_resource_name, paths, state, total_paths,"
+        " batches_total, created_at, updated_at) VALUES ('viejo', 'c', 'rc', '[\"gs://b/a\"]', 'running', 1, 1, 0, 0)"
+    )
+    conn.commit()
+    conn.close()
+
+    manager = IngestionJobManager(db_file=db_file)
+    job = _wait(manager, "viejo")
+
+    assert fake_import == [["gs://b/a"]]
+    assert (job["state"], job["attempts"], job["imported"], job["unchanged"], job["replaced"]) == ("success", 1, 1, 0, 0)
+
+
+def test_jobs_report_partial_failures_and_limit_pending(tmp_path, fake_import):
+    manager = IngestionJobManager(db_file=str(tmp_path / "jobs.sqlite"), max_pending_jobs=1)
+
+    job = _wait(manager, manager.submit("c", "rc", ["gs://b/a", "gs://b/malo"])["job_id"])
+    assert (job["state"], job["error"]) == ("partial", "fallo")
+
+    manager.max_pending_jobs = 0
+    with pytest.raises(RuntimeError):
+        manager.submit("c", "rc", ["gs://b/a"])
+
+
+def test_add_data_in_background_and_status_tool(monkeypatch, tmp_path, tool_context, bucket, unique_name):
+    manager = IngestionJobManager(db_file=str(tmp_path / "jobs.sqlite"))
+    monkeypatch.setattr(add_data_module, "INGESTION_BACKGROUND_ENABLED", True)
+    monkeypatch.setattr(add_data_module, "ingestion_jobs", manager)
+    monkeypatch.setattr("rag_agent.tools.get_ingestion_status.ingestion_jobs", manager)
+    bucket.write("a.txt", "uno")
+    bucket.write("b.txt", "dos")
+    corpus = unique_name("jobs")
+    create_corpus(corpus, tool_context)
+
+    response = add_data(corpus, [bucket.uri], tool_context)
+    assert response["status"] == "success" and tool_context.state["last_ingestion_job"] == response["job_id"]
+    _wait(manager, response["job_id"])
+
+    status = get_ingestion_status("", tool_context)
+    assert (status["state"], status["files_added"], status["total_paths"]) == ("success", 2, 1)
+    assert {r["path"] for r in status["path_results"]} == {f"{bucket.uri}/a.txt", f"{bucket.uri}/b.txt"}
+    assert get_ingestion_status("no_existe", tool_context)["status"] == "error"
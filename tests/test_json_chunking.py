@@ -0,0 +1,71 @@
+import json
+
+from rag_agent.chunking import chunk_document, chunk_records, json_records
+from rag_agent.tools.add_data import add_data
+from rag_agent.tools.create_corpus import create_corpus
+from rag_agent.tools.document_metadata import document_metadata, normalize_value
+from rag_agent.tools.rag_query import rag_query
+
+_DOCUMENT = {
+    "materia": "Matemática",
+    "nivel": "Nivel 2",
+    "preguntas": [
+        {"eje": "Números", "enunciado": "Sumar fracciones con igual denominador"},
+        {"eje": "Geometría", "enunciado": "Calcular el perimetro de un triangulo"},
+    ],
+}
+
+
+def test_each_record_is_a_chunk_with_its_parent_fields_as_header():
+    chunks = chunk_document("gs://b/nivel_2.json", json.dumps(_DOCUMENT, ensure_ascii=False))
+
+    assert len(chunks) == 2
+    assert chunks[0].startswith("materia: Matemática | nivel: Nivel 2\n")
+    assert "enunciado: Sumar fracciones con igual denominador" in chunks[0]
+    assert "Geometría" in chunks[1] and "fracciones" not in chunks[1]
+
+
+def test_long_records_are_windowed_and_repeat_the_header():
+    records = json_records(json.dumps({"nivel": 1, "items": [{"texto": " ".join(f"p{i}" for i in range(30))}]}))
+
+    chunks = chunk_records(records, chunk_size=12, chunk_overlap=2)
+
+    assert len(chunks) > 1 and all(chunk.startswith("nivel: 1\n") for chunk in chunks)
+
+
+def test_non_json_files_fall_back_to_word_windows():
+    assert json_records("no es json") is None
+    assert chunk_document("gs://b/a.json", "uno dos tres", chunk_size=2, chunk_overlap=0) == ["uno dos", "tres"]
+
+
+def test_metadata_comes_from_records_then_from_the_path():
+    metadata = document_metadata("gs://b/x.json", json_records(json.dumps(_DOCUMENT, ensure_ascii=False)))
+    assert metadata == {
+        "subject": ["matematica"], "level": ["2"], "eje": ["numeros", "geometria"], "format": ["json"],
+    }
+
+    from_path = document_metadata("gs://b/Lenguaje/nivel_3.txt", None)
+    assert (from_path["subject"], from_path["level"], from_path["format"]) == (["lenguaje"], ["3"], ["text"])
+    assert normalize_value("level", "Nivel 4") == "4"
+
+
+def test_rag_query_filters_by_subject_level_and_eje(tool_context, bucket, unique_name):
+    bucket.write("matematica/nivel_2.json", _DOCUMENT)
+    bucket.write("lenguaje/nivel_2.json", {"preguntas": [{"enunciado": "Sumar fracciones en un texto"}]})
+    corpus = unique_name("json")
+    create_corpus(corpus, tool_context)
+    add_data(corpus, [bucket.uri], tool_context)
+
+    everything = rag_query(corpus, "sumar fracciones", tool_context, distance_threshold=2.0, top_k=5)
+    assert {r["source_uri"] for r in everything["results"]} == {
+        f"{bucket.uri}/matematica/nivel_2.json", f"{bucket.uri}/lenguaje/nivel_2.json",
+    }
+
+    filtered = rag_query(corpus, "sumar fracciones", tool_context, subject="Lenguaje", level="2", distance_threshold=2.0)
+    assert filtered["filters"] == {"subject": "lenguaje", "level": "2"}
+    assert {r["source_uri"] for r in filtered["results"]} == {f"{bucket.uri}/lenguaje/nivel_2.json"}
+
+    by_eje = rag_query(corpus, "sumar fracciones", tool_context, eje="geometría", distance_threshold=2.0)
+    assert [r["text"] for r in by_eje["results"]] and all("Matemática" in r["text"] for r in by_eje["results"])
+
+    assert rag_query(corpus, "sumar fracciones", tool_context, level="4")["status"] == "error"
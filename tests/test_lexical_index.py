@@ -0,0 +1,75 @@
+import pytest
+
+from rag_agent.tools import lexical_index
+from rag_agent.tools.lexical_index import LexicalIndex
+
+
+def _index(docs):
+    index = LexicalIndex()
+    for source_uri, chunks in docs.items():
+        index.add(source_uri, chunks)
+    return index
+
+
+DOCS = {
+    "gs://b/a": ["fracciones con igual denominador", "suma de fracciones"],
+    "gs://b/b": ["fracciones y decimales"],
+    "gs://b/c": ["perimetro de triangulos"],
+    "gs://b/d": ["area de triangulos rectangulos"],
+}
+
+
+def test_search_ranks_and_filters_by_source():
+    index = _index(DOCS)
+
+    hits = index.search("suma fracciones", top_k=3)
+    assert hits[0][:2] == ("gs://b/a", "suma de fracciones")
+    assert {source for source, _, _ in hits} == {"gs://b/a", "gs://b/b"}
+
+    filtered = index.search("fracciones", top_k=3, sources=["gs://b/b"])
+    assert [source for source, _, _ in filtered] == ["gs://b/b"]
+
+
+def test_scores_after_deletes_match_an_index_without_them(monkeypatch):
+    monkeypatch.setattr(lexical_index, "LEXICAL_COMPACT_RATIO", 1.0)
+    index = _index(DOCS)
+    index.remove("gs://b/a")
+    fresh = _index({uri: chunks for uri, chunks in DOCS.items() if uri != "gs://b/a"})
+
+    hits = index.search("fracciones triangulos", top_k=5)
+
+    assert hits == pytest.approx(fresh.search("fracciones triangulos", top_k=5))
+    assert all(score > 0 for _, _, score in hits)
+
+
+def test_state_roundtrip_keeps_live_document_frequency(monkeypatch):
+    monkeypatch.setattr(lexical_index, "LEXICAL_COMPACT_RATIO", 1.0)
+    index = _index(DOCS)
+    index.remove("gs://b/b")
+
+    restored = LexicalIndex.from_state(index.to_state())
+
+    assert restored.search("fracciones", top_k=5) == index.search("fracciones", top_k=5)
+
+
+def test_remove_compacts_past_ratio(monkeypatch):
+    monkeypatch.setattr(lexical_index, "LEXICAL_COMPACT_RATIO", 0.3)
+    index = _index(DOCS)
+
+    index.remove("gs://b/a")
+
+    assert not index._deleted and len(index) == 3
+    assert index.search("fracciones", top_k=5)[0][0] == "gs://b/b"
+
+
+def test_registry_persists_indexes_per_corpus(tmp_path):
+    registry = lexical_index.LexicalIndexRegistry(folder=str(tmp_path / "lexical"))
+    registry.get("c1").add("gs://b/a", ["suma de fracciones"])
+    registry.flush("c1")
+
+    reloaded = lexical_index.LexicalIndexRegistry(folder=str(tmp_path / "lexical"))
+    assert [hit[0] for hit in reloaded.get("c1").search("fracciones", top_k=1)] == ["gs://b/a"]
+    assert len(reloaded.get("c2")) == 0
+
+    reloaded.drop("c1")
+    assert len(lexical_index.LexicalIndexRegistry(folder=str(tmp_path / "lexical")).get("c1")) == 0
@@ -0,0 +1,125 @@
+import itertools
+
+import numpy as np
+
+from rag_agent import local_rag
+from rag_agent.local_rag.store import VectorStore
+
+
+def _store_with_owners(count, dim=8, **kwargs):
+    rng = np.random.default_rng(0)
+    store = VectorStore(dim, initial_capacity=4, **kwargs)
+    vectors = rng.normal(size=(count, dim)).astype(np.float32)
+    for i in range(count):
+        store.add(vectors[i:i + 1], owner=f"f{i}", payloads=[f"p{i}"])
+    return store, vectors
+
+
+def test_store_search_returns_nearest_payloads():
+    store, vectors = _store_with_owners(10)
+
+    hits = store.search(vectors[3], top_k=2)
+
+    assert hits[0][0] == "p3" and abs(hits[0][1]) < 1e-5
+    assert len(hits) == 2
+
+
+def test_store_compacts_only_past_the_dead_ratio():
+    store, vectors = _store_with_owners(10, compact_ratio=0.5)
+    for i in range(5):
+        store.remove_owner(f"f{i}")
+    assert store._size == 10 and len(store) == 5
+
+    store.remove_owner("f5")
+
+    assert store._size == 4 and store._dead == 0
+    assert [payload for payload, _ in store.search(vectors[8], top_k=1)] == ["p8"]
+    assert store.owner_mask({"f9"}).sum() == 1
+
+
+def test_local_api_import_query_paginate_delete(bucket):
+    for i in range(3):
+        bucket.write(f"doc{i}.txt", f"documento numero {i} sobre fracciones y decimales")
+    corpus = local_rag.create_corpus(display_name="local_api")
+    response = local_rag.import_files(corpus.name, [bucket.uri])
+    assert response.imported_rag_files_count == 3
+
+    # Importar de nuevo omite los source_uri existentes, como Vertex
+    assert local_rag.import_files(corpus.name, [bucket.uri]).skipped_rag_files_count == 3
+
+    pager = local_rag.list_files(corpus.name, page_size=2)
+    first_page = list(itertools.islice(pager, 2))
+    second = list(local_rag.list_files(corpus.name, page_size=2, page_token=pager.next_page_token))
+    assert len(first_page) == 2 and pager.next_page_token == "2" and len(second) == 1
+
+    contexts = local_rag.retrieval_query(
+        text="documento numero 1 sobre fracciones y decimales",
+        rag_resources=[local_rag.RagResource(rag_corpus=corpus.name)],
+        rag_retrieval_config=local_rag.RagRetrievalConfig(top_k=1),
+    ).contexts.contexts
+    assert contexts[0].source_uri == f"{bucket.uri}/doc1.txt"
+
+    local_rag.delete_file(second[0].name)
+    assert len(list(local_rag.list_files(corpus.name))) == 2
+    local_rag.delete_corpus(corpus.name)
+    assert corpus.name not in {c.name for c in local_rag.list_corpora()}
+
+
+def _clustered_store(ann_min_vectors):
+    """Dos grupos de vectores opuestos; el indice IVF se entrena y se revisa una sola lista por consulta."""
+    rng = np.random.default_rng(1)
+    dim = 16
+    center = np.zeros(dim, dtype=np.float32)
+    center[0] = 1.0
+    store = VectorStore(dim, ann_min_vectors=ann_min_vectors, ann_nlist=8, ann_nprobe=1)
+    for group, sign in (("a", 1.0), ("b", -1.0)):
+        vectors = sign * center + 0.05 * rng.normal(size=(200, dim)).astype(np.float32)
+        for i, vector in enumerate(vectors):
+            store.add(vector[None, :], owner=f"{group}{i}", payloads=[f"{group}{i}"])
+    assert store.ann.is_trained
+    return store, center
+
+
+def test_ann_search_applies_selective_filter_before_candidates():
+    store, center = _clustered_store(ann_min_vectors=300)
+    mask = store.owner_mask({"b1", "b2", "b3"})
+
+    hits = store.search(center, top_k=3, row_mask=mask)
+
+    assert sorted(payload for payload, _ in hits) == ["b1", "b2", "b3"]
+
+
+def test_ann_search_falls_back_when_probed_lists_miss_the_filter():
+    store, center = _clustered_store(ann_min_vectors=50)
+    mask = store.owner_mask({f"b{i}" for i in range(200)})
+
+    hits = store.search(center, top_k=5, row_mask=mask)
+
+    assert len(hits) == 5 and all(payload.startswith("b") for payload, _ in hits)
+
+
+def test_ann_search_probes_a_subset_and_matches_exact_with_all_lists():
+    store, center = _clustered_store(ann_min_vectors=300)
+    exact = [payload for payload, _ in store.search(center, top_k=10, exact=True)]
+
+    approximate = store.search(center, top_k=10)
+    all_lists = store.search(center, top_k=10, nprobe=store.ann.nlist)
+
+    assert len(store.ann.candidates(store.normalize(center))) < len(store)
+    assert all(payload.startswith("a") for payload, _ in approximate)
+    assert [payload for payload, _ in all_lists] == exact
+
+
+def test_ann_index_survives_deletes_and_compaction():
+    store, center = _clustered_store(ann_min_vectors=300)
+    nearest = store.search(center, top_k=1, exact=True)[0][0]
+
+    for i in range(150):
+        store.remove_owner(f"b{i}")
+    store.remove_owner(nearest)
+    store.compact()
+
+    hits = store.search(center, top_k=5, nprobe=store.ann.nlist)
+    assert store._dead == 0 and store.ann.is_trained
+    assert [payload for payload, _ in hits] == [payload for payload, _ in store.search(center, top_k=5, exact=True)]
+    assert nearest not in {payload for payload, _ in hits}
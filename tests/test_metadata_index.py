@@ -0,0 +1,73 @@
+from types import SimpleNamespace
+
+from rag_agent.tools import metadata_index as metadata_module
+from rag_agent.tools.add_data import add_data
+from rag_agent.tools.create_corpus import create_corpus
+from rag_agent.tools.delete_document import delete_document
+from rag_agent.tools.find_documents import find_documents
+from rag_agent.tools.metadata_index import MetadataIndex
+
+
+def _rag_file(file_id, display_name, update_time="t1"):
+    return SimpleNamespace(
+        name=f"c/ragFiles/{file_id}", display_name=display_name,
+        source_uri=f"gs://b/{display_name}", create_time="t0", update_time=update_time,
+    )
+
+
+class CountingRag:
+    def __init__(self, files):
+        self.files = files
+        self.list_calls = 0
+
+    def list_files(self, corpus):
+        self.list_calls += 1
+        return list(self.files)
+
+
+def test_sync_files_upserts_and_removes(tmp_path):
+    index = MetadataIndex(db_file=str(tmp_path / "meta.sqlite"))
+    index.sync_files("c", [_rag_file("1", "nivel_1.json"), _rag_file("2", "nivel_2.json")])
+    index.set_metadata("c", "gs://b/nivel_1.json", {"subject": ["matematica"]})
+
+    index.sync_files("c", [_rag_file("1", "nivel_1.json", update_time="t2")])
+
+    assert [f["file_id"] for f in index.find_files("c")] == ["1"]
+    assert index.get_file("c", "1")["update_time"] == "t2"
+    assert index.filter_files("c", {"subject": "matematica"}) == [{"file_id": "1", "source_uri": "gs://b/nivel_1.json"}]
+
+
+def test_find_files_escapes_like_wildcards_and_uses_prefix_and_glob(tmp_path):
+    index = MetadataIndex(db_file=str(tmp_path / "meta.sqlite"))
+    index.sync_files("c", [_rag_file("1", "nivel_1.json"), _rag_file("2", "nivelX1.json"), _rag_file("3", "otro.txt")])
+
+    assert [f["file_id"] for f in index.find_files("c", display_name="NIVEL_")] == ["1"]
+    assert {f["file_id"] for f in index.find_files("c", name_glob="nivel*.json")} == {"1", "2"}
+    assert [f["file_id"] for f in index.find_files("c", source_prefix="gs://b/o")] == ["3"]
+    assert len(index.find_files("c", limit=2)) == 2
+
+
+def test_refresh_lists_only_after_ttl(monkeypatch, tmp_path):
+    fake = CountingRag([_rag_file("1", "a.txt")])
+    monkeypatch.setattr(metadata_module, "rag", fake)
+    index = MetadataIndex(db_file=str(tmp_path / "meta.sqlite"), ttl_seconds=60)
+
+    assert index.refresh("c") is True
+    assert index.refresh("c") is False
+    assert index.refresh("c", force=True) is True
+    assert fake.list_calls == 2
+
+
+def test_find_documents_tracks_imports_and_deletes(tool_context, bucket, unique_name):
+    bucket.write("matematica/nivel_1.txt", "fracciones")
+    bucket.write("lenguaje/nivel_1.txt", "sustantivos")
+    corpus = unique_name("find")
+    create_corpus(corpus, tool_context)
+    add_data(corpus, [bucket.uri], tool_context)
+
+    found = find_documents(corpus, "", f"{bucket.uri}/matematica/", tool_context)
+    assert found["documents_count"] == 1
+    document_id = found["documents"][0]["document_id"]
+
+    assert delete_document(corpus, document_id, tool_context)["status"] == "success"
+    assert find_documents(corpus, "nivel", "", tool_context)["documents_count"] == 1
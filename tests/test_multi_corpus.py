@@ -0,0 +1,86 @@
+import threading
+import time
+
+from rag_agent.tools.add_data import add_data
+from rag_agent.tools import concurrency
+from rag_agent.tools.concurrency import run_concurrently
+from rag_agent.tools.create_corpus import create_corpus
+from rag_agent.tools.rag_query_multi_corpus import merge_results, rag_query_multi_corpus
+
+
+def test_run_concurrently_keeps_order_and_reports_errors_and_timeouts():
+    def work(item):
+        if item == "error":
+            raise ValueError("fallo")
+        if item == "lento":
+            time.sleep(0.5)
+        return item.upper()
+
+    outcomes = run_concurrently(work, ["a", "error", "lento", "b"], max_workers=4, timeout=0.1)
+
+    assert outcomes[0] == (True, "A") and outcomes[3] == (True, "B")
+    assert not outcomes[1][0] and isinstance(outcomes[1][1], ValueError)
+    assert not outcomes[2][0] and isinstance(outcomes[2][1], TimeoutError)
+
+
+def test_run_concurrently_reuses_one_pool_and_bounds_each_call():
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def work(item):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+        return threading.current_thread().name
+
+    first = run_concurrently(work, range(6), max_workers=2)
+    second = run_concurrently(work, range(2), max_workers=2)
+
+    assert peak[0] <= 2
+    assert all(ok and name.startswith("rag-fanout") for ok, name in first + second)
+    assert concurrency.get_fanout_executor() is concurrency.get_fanout_executor()
+
+
+def test_nested_calls_run_inline_when_the_pool_is_full(monkeypatch):
+    monkeypatch.setattr(concurrency, "_fanout_slots", threading.BoundedSemaphore(2))
+
+    def outer(item):
+        inner = run_concurrently(lambda x: x * 10, [item, item + 1, item + 2], max_workers=3, timeout=5)
+        return [value for _, value in inner]
+
+    outcomes = run_concurrently(outer, [1, 2], max_workers=2, timeout=5)
+
+    assert outcomes == [(True, [10, 20, 30]), (True, [20, 30, 40])]
+
+
+def test_merge_results_deduplicates_and_keeps_best_score():
+    merged = merge_results({
+        "c1": [{"source_uri": "a", "text": "Uno", "score": 0.4}, {"source_uri": "b", "text": "dos", "score": 0.3}],
+        "c2": [{"source_uri": "a", "text": "uno ", "score": 0.1}],
+    }, top_k=5)
+
+    assert [r["source_uri"] for r in merged] == ["a", "b"]
+    assert merged[0]["score"] == 0.1 and merged[0]["corpus_name"] == "c2"
+
+
+def test_fan_out_merges_corpora_and_reports_missing_ones(tool_context, bucket, unique_name):
+    first, second = unique_name("multi"), unique_name("multi")
+    bucket.write("uno/a.txt", "hipotenusa catetos")
+    bucket.write("dos/b.txt", "hipotenusa triangulo")
+    for corpus, folder in ((first, "uno"), (second, "dos")):
+        create_corpus(corpus, tool_context)
+        add_data(corpus, [f"{bucket.uri}/{folder}"], tool_context)
+
+    response = rag_query_multi_corpus([first, second, first, "no_existe"], "hipotenusa", tool_context)
+
+    assert response["status"] == "success"
+    assert response["corpus_names"] == [first, second, "no_existe"]
+    assert {r["corpus_name"] for r in response["results"]} == {first, second}
+    assert list(response["corpus_errors"]) == ["no_existe"]
+
+
+def test_fan_out_rejects_empty_names(tool_context):
+    assert rag_query_multi_corpus([], "q", tool_context)["status"] == "error"
+    assert rag_query_multi_corpus(["ok", ""], "q", tool_context)["status"] == "error"
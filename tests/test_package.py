@@ -0,0 +1,32 @@
+import importlib
+import subprocess
+import sys
+
+
+def test_adk_loader_path_resolves_root_agent():
+    # adk run / adk web / eval cargan el agente con import_module(app).agent.root_agent
+    module = importlib.import_module("rag_agent")
+    assert module.agent.root_agent is module.root_agent
+    assert "agent" in module.__all__
+
+
+def test_importing_tools_does_not_load_agent():
+    code = "import sys, rag_agent.tools.rag_query; assert 'rag_agent.agent' not in sys.modules"
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert completed.returncode == 0, completed.stderr
+
+
+def test_loading_the_agent_defers_heavy_modules():
+    # google.adk ya importa vertexai por su cuenta: solo cuenta lo que carga este paquete
+    code = (
+        "import sys, importlib; import google.adk.agents; "
+        "heavy = ('numpy', 'vertexai.rag', 'rag_agent.local_rag', 'rag_agent.vertex_client'); "
+        "before = {m for m in heavy if m in sys.modules}; "
+        "importlib.import_module('rag_agent').agent.root_agent; "
+        "loaded = [m for m in heavy if m in sys.modules and m not in before]; "
+        "assert not loaded, loaded; "
+        "from rag_agent.rag_backend import rag; "
+        "assert rag._backend is None, 'backend cargado (y vertexai.init llamado) al cargar el agente'"
+    )
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert completed.returncode == 0, completed.stderr
@@ -0,0 +1,44 @@
+from rag_agent.tools import rag_query_batch as batch_module
+from rag_agent.tools.add_data import add_data
+from rag_agent.tools.create_corpus import create_corpus
+from rag_agent.tools.rag_query_batch import rag_query_batch
+
+
+def test_batch_answers_in_order(tool_context, bucket, unique_name):
+    bucket.write("a.txt", "fracciones")
+    bucket.write("b.txt", "ecuaciones")
+    corpus = unique_name("batch")
+    create_corpus(corpus, tool_context)
+    add_data(corpus, [bucket.uri], tool_context)
+
+    response = rag_query_batch(corpus, ["ecuaciones", "fracciones", "zzz"], tool_context)
+
+    assert response["status"] == "partial" and response["queries_count"] == 3
+    assert [r["query"] for r in response["responses"]] == ["ecuaciones", "fracciones", "zzz"]
+    assert response["responses"][0]["results"][0]["source_name"] == "b.txt"
+    assert response["responses"][1]["results"][0]["source_name"] == "a.txt"
+    assert response["responses"][2]["status"] == "error"
+
+
+def test_batch_isolates_failing_queries(monkeypatch, tool_context, unique_name):
+    corpus = unique_name("batch")
+    create_corpus(corpus, tool_context)
+
+    def flaky(corpus_resource_name, query, *args, **kwargs):
+        if query == "rota":
+            raise RuntimeError("fallo")
+        return [{"source_uri": "gs://b/a.txt", "source_name": "a.txt", "text": query, "score": 0.1}]
+
+    monkeypatch.setattr(batch_module, "retrieve_contexts", flaky)
+    response = rag_query_batch(corpus, ["ok", "rota"], tool_context)
+
+    assert response["status"] == "partial"
+    assert response["responses"][0]["status"] == "success"
+    assert "fallo" in response["responses"][1]["message"]
+
+
+def test_batch_validates_input(monkeypatch, tool_context):
+    monkeypatch.setattr(batch_module, "BATCH_QUERY_MAX_QUERIES", 2)
+    assert rag_query_batch("c", [], tool_context)["status"] == "error"
+    assert rag_query_batch("c", ["a", "b", "c"], tool_context)["status"] == "error"
+    assert rag_query_batch("no_existe", ["a"], tool_context)["message"] == "Corpus 'no_existe' no existe"
@@ -0,0 +1,60 @@
+from rag_agent.tools.add_data import add_data
+from rag_agent.tools.create_corpus import create_corpus
+from rag_agent.tools.query_cache import QueryCache, query_cache
+from rag_agent.tools.rag_query import rag_query
+
+
+def test_key_normalizes_query_text():
+    cache = QueryCache(max_entries=4, ttl_seconds=60)
+    assert cache.make_key("c", "  Hola   MUNDO ", 5) == cache.make_key("c", "hola mundo", 5)
+
+
+def test_invalidation_bumps_version_and_drops_entries():
+    cache = QueryCache(max_entries=4, ttl_seconds=60)
+    old_key = cache.make_key("c", "q", 5)
+    cache.put(old_key, "viejo")
+    cache.put(cache.make_key("otro", "q", 5), "otro")
+
+    cache.invalidate_corpus("c")
+
+    assert cache.get(old_key) is None
+    assert cache.get(cache.make_key("c", "q", 5)) is None
+    assert cache.get(cache.make_key("otro", "q", 5)) == "otro"
+    # Un resultado calculado antes de invalidar no se guarda con la version nueva
+    cache.put(old_key, "viejo")
+    assert cache.stats()["size"] == 1
+
+
+def test_lru_eviction_and_ttl():
+    cache = QueryCache(max_entries=2, ttl_seconds=60)
+    keys = [cache.make_key("c", f"q{i}") for i in range(3)]
+    cache.put(keys[0], 0)
+    cache.put(keys[1], 1)
+    cache.get(keys[0])
+    cache.put(keys[2], 2)
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == 0 and cache.get(keys[2]) == 2
+    assert cache.stats()["evictions"] == 1
+
+    expired = QueryCache(max_entries=2, ttl_seconds=0)
+    expired.put(keys[0], 0)
+    assert expired.get(keys[0]) is None
+
+
+def test_rag_query_is_cached_until_add_data(tool_context, bucket, unique_name):
+    bucket.write("a.txt", "Las fracciones representan partes de un entero")
+    corpus = unique_name("cache")
+    create_corpus(corpus, tool_context)
+    add_data(corpus, [bucket.uri], tool_context)
+
+    first = rag_query(corpus, "fracciones", tool_context, distance_threshold=1.0)
+    assert first["results_count"] == 1
+    hits = query_cache.stats()["hits"]
+    assert rag_query(corpus, "  FRACCIONES ", tool_context, distance_threshold=1.0)["results"] == first["results"]
+    assert query_cache.stats()["hits"] == hits + 1
+
+    bucket.write("b.txt", "Los decimales tambien representan fracciones")
+    add_data(corpus, [bucket.uri], tool_context)
+    refreshed = rag_query(corpus, "fracciones", tool_context, distance_threshold=1.0)
+    assert refreshed["results_count"] > first["results_count"]
@@ -0,0 +1,71 @@
+import pytest
+
+from rag_agent.tools import rag_query as rag_query_module
+from rag_agent.tools.add_data import add_data
+from rag_agent.tools.create_corpus import create_corpus
+from rag_agent.tools.rag_query import rag_query
+from rag_agent.tools.rerank import BM25Scorer, load_scorer, rerank
+
+_RESULTS = [
+    {"text": "numeros enteros y decimales", "score": 0.1},
+    {"text": "suma de fracciones con distinto denominador", "score": 0.2},
+    {"text": "fracciones", "score": 0.3},
+]
+
+
+class LengthScorer:
+    def score(self, query, texts):
+        return [len(text) for text in texts]
+
+
+def make_length_scorer():
+    return LengthScorer()
+
+
+def test_bm25_scores_matching_texts_higher():
+    scores = BM25Scorer().score("fracciones", [r["text"] for r in _RESULTS])
+
+    assert scores[0] == 0
+    assert scores[2] > scores[1] > 0
+
+
+@pytest.mark.parametrize("weight, expected", [
+    (0.0, ["numeros enteros y decimales", "suma de fracciones con distinto denominador"]),
+    (1.0, ["fracciones", "suma de fracciones con distinto denominador"]),
+])
+def test_weight_balances_scorer_and_vector_order(weight, expected):
+    ranked = rerank("fracciones", _RESULTS, top_k=2, weight=weight, scorer=BM25Scorer())
+
+    assert [r["text"] for r in ranked] == expected
+    assert all("rerank_score" in r and "score" in r for r in ranked)
+
+
+def test_custom_scorer_is_loaded_from_spec():
+    scorer = load_scorer(f"{__name__}:make_length_scorer")
+    ranked = rerank("q", _RESULTS, top_k=1, weight=1.0, scorer=scorer)
+
+    assert ranked[0]["text"] == "suma de fracciones con distinto denominador"
+    with pytest.raises(ValueError):
+        load_scorer("cross-encoder")
+
+
+def test_rag_query_overfetches_and_reranks(monkeypatch, tool_context, bucket, unique_name):
+    monkeypatch.setattr(rag_query_module, "RERANK_ENABLED", True)
+    monkeypatch.setattr(rag_query_module, "RERANK_FETCH_K", 10)
+    for i in range(6):
+        bucket.write(f"doc{i}.txt", "fracciones " + "relleno " * i)
+    corpus = unique_name("rerank")
+    create_corpus(corpus, tool_context)
+    add_data(corpus, [bucket.uri], tool_context)
+    fetched = []
+    vector_contexts = rag_query_module._vector_contexts
+
+    def recording(corpus_resource_name, query, top_k, *args):
+        fetched.append(top_k)
+        return vector_contexts(corpus_resource_name, query, top_k, *args)
+
+    monkeypatch.setattr(rag_query_module, "_vector_contexts", recording)
+    response = rag_query(corpus, "fracciones", tool_context, top_k=2, distance_threshold=2.0)
+
+    assert fetched == [10] and response["results_count"] == 2
+    assert all("rerank_score" in r for r in response["results"])
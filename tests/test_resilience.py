@@ -0,0 +1,153 @@
+import time
+
+import pytest
+
+from rag_agent.tools import resilience
+from rag_agent.tools.concurrency import run_concurrently
+from rag_agent.tools.resilience import ResilientCaller, is_retryable, with_deadline
+
+
+class ServiceUnavailable(Exception):
+    pass
+
+
+class HttpError(Exception):
+    def __init__(self, code):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+@pytest.fixture(autouse=True)
+def fast_policies(monkeypatch):
+    monkeypatch.setattr(resilience, "RETRY_BASE_DELAY_SECONDS", 0.0)
+    monkeypatch.setattr(resilience, "CALL_POLICIES", {
+        "read": {"attempts": 3, "timeout": 5.0, "hedge": True},
+        "short": {"attempts": 1, "timeout": 0.05},
+    })
+
+
+def _flaky(*outcomes):
+    outcomes = list(outcomes)
+    calls = []
+
+    def call():
+        calls.append(1)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return call, calls
+
+
+def test_transient_errors_are_detected_by_name_or_code():
+    assert is_retryable(ServiceUnavailable()) and is_retryable(TimeoutError())
+    assert is_retryable(HttpError(503)) and is_retryable(HttpError(429))
+    assert not is_retryable(HttpError(404)) and not is_retryable(ValueError())
+
+
+def test_transient_errors_are_retried_up_to_the_policy():
+    caller = ResilientCaller(hedging=False, circuit_breaker=False)
+    call, calls = _flaky(ServiceUnavailable(), ServiceUnavailable(), "ok")
+
+    assert caller.call("read", call) == "ok"
+    assert len(calls) == 3 and caller.stats()["read"]["retries"] == 2
+
+    call, calls = _flaky(ServiceUnavailable(), ServiceUnavailable(), ServiceUnavailable(), "tarde")
+    with pytest.raises(ServiceUnavailable):
+        caller.call("read", call)
+    assert len(calls) == 3
+
+
+def test_permanent_errors_are_not_retried():
+    caller = ResilientCaller(hedging=False, circuit_breaker=False)
+    call, calls = _flaky(ValueError("no existe"), "ok")
+
+    with pytest.raises(ValueError):
+        caller.call("read", call)
+    assert len(calls) == 1
+
+
+def test_each_attempt_has_its_own_timeout():
+    caller = ResilientCaller(hedging=False, circuit_breaker=False)
+
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        caller.call("short", lambda: time.sleep(0.8))
+    assert time.monotonic() - started < 0.5
+
+
+def test_tool_deadline_bounds_every_call_including_worker_threads(monkeypatch):
+    monkeypatch.setattr(resilience, "TOOL_DEADLINES_SECONDS", {"slow_tool": 0.2})
+    caller = ResilientCaller(hedging=False, circuit_breaker=False)
+
+    @with_deadline
+    def slow_tool():
+        return run_concurrently(lambda _: caller.call("read", lambda: time.sleep(0.8)), range(2), max_workers=2)
+
+    started = time.monotonic()
+    outcomes = slow_tool()
+
+    assert time.monotonic() - started < 0.6
+    assert all(not ok and isinstance(error, TimeoutError) for ok, error in outcomes)
+    assert resilience._deadline.get() is None
+
+
+def test_slow_requests_are_hedged(monkeypatch):
+    monkeypatch.setattr(resilience, "HEDGE_DEFAULT_DELAY_SECONDS", 0.05)
+    caller = ResilientCaller(hedging=True, circuit_breaker=False)
+    started_calls = []
+
+    def call():
+        started_calls.append(1)
+        if len(started_calls) == 1:
+            time.sleep(0.8)
+            return "lenta"
+        return "duplicada"
+
+    started = time.monotonic()
+    assert caller.call("read", call) == "duplicada"
+    assert time.monotonic() - started < 0.5
+    stats = caller.stats()["read"]
+    assert (stats["hedges"], stats["hedge_wins"]) == (1, 1)
+
+
+def test_hedge_delay_follows_recent_latencies(monkeypatch):
+    monkeypatch.setattr(resilience, "HEDGE_MIN_SAMPLES", 10)
+    caller = ResilientCaller()
+    assert caller.hedge_delay("read") == resilience.HEDGE_DEFAULT_DELAY_SECONDS
+
+    for i in range(100):
+        caller._record_latency("read", i / 100)
+    assert caller.hedge_delay("read") == pytest.approx(resilience.HEDGE_PERCENTILE / 100)
+
+
+def test_rpc_timeout_is_bounded_by_the_current_attempt():
+    caller = ResilientCaller(hedging=False, circuit_breaker=False)
+
+    assert resilience.rpc_timeout(30) == 30
+    assert 0 < caller.call("short", lambda: resilience.rpc_timeout(30)) <= 0.05
+
+
+def test_abandoned_requests_hold_their_slot_until_they_finish(monkeypatch):
+    monkeypatch.setattr(resilience, "RESILIENCE_MAX_IN_FLIGHT", 1)
+    caller = ResilientCaller(hedging=False, circuit_breaker=False)
+
+    with pytest.raises(TimeoutError):
+        caller.call("short", lambda: time.sleep(0.3))
+    assert caller.in_flight() == {"short": 1}
+    with pytest.raises(TimeoutError, match="esperando lugar"):
+        caller.call("short", lambda: "no llega a enviarse")
+
+    time.sleep(0.35)
+    assert caller.in_flight() == {}
+    assert caller.call("short", lambda: "ok") == "ok"
+
+
+def test_hedges_are_skipped_when_the_pool_is_saturated(monkeypatch):
+    monkeypatch.setattr(resilience, "HEDGE_DEFAULT_DELAY_SECONDS", 0.02)
+    caller = ResilientCaller(max_workers=1, hedging=True, circuit_breaker=False)
+
+    assert caller.call("read", lambda: time.sleep(0.1) or "ok") == "ok"
+    stats = caller.stats()["read"]
+    assert (stats["hedges"], stats["hedges_skipped"]) == (0, 1)
@@ -0,0 +1,44 @@
+from rag_agent.config import (
+    DEFAULT_DISTANCE_THRESHOLD,
+    DEFAULT_TOP_K,
+    RETRIEVAL_MAX_DISTANCE_THRESHOLD,
+    RETRIEVAL_MAX_TOP_K,
+)
+from rag_agent.tools.add_data import add_data
+from rag_agent.tools.create_corpus import create_corpus
+from rag_agent.tools.rag_query import rag_query, retrieval_steps
+
+
+def test_fixed_steps_use_defaults_and_clamp_overrides():
+    assert retrieval_steps(0, 0.0, adaptive=False) == [(DEFAULT_TOP_K, DEFAULT_DISTANCE_THRESHOLD)]
+    assert retrieval_steps(5, 0.7, adaptive=False) == [(5, 0.7)]
+    assert retrieval_steps(1000, 99.0, adaptive=False) == [(RETRIEVAL_MAX_TOP_K, RETRIEVAL_MAX_DISTANCE_THRESHOLD)]
+
+
+def test_adaptive_steps_widen_up_to_the_requested_limits():
+    assert retrieval_steps(0, 0.0, adaptive=True) == [(2, 0.35), (3, 0.5), (6, 0.65)]
+    # Los pasos que quedan iguales al recortarlos no se repiten
+    assert retrieval_steps(2, 0.4, adaptive=True) == [(2, 0.35), (2, 0.4)]
+
+
+def test_rag_query_reports_the_parameters_used(tool_context, bucket, unique_name):
+    for i in range(4):
+        bucket.write(f"doc{i}.txt", "fracciones " + "relleno " * i)
+    corpus = unique_name("params")
+    create_corpus(corpus, tool_context)
+    add_data(corpus, [bucket.uri], tool_context)
+
+    fixed = rag_query(corpus, "fracciones", tool_context, top_k=2, distance_threshold=1.5)
+    assert fixed["results_count"] == 2
+    assert fixed["retrieval"] == {"top_k": 2, "distance_threshold": 1.5, "adaptive": False, "attempts": 1}
+
+    # La coincidencia exacta pasa el primer umbral estricto: no hace falta ampliar
+    adaptive = rag_query(corpus, "fracciones", tool_context, adaptive=True)
+    assert adaptive["retrieval"]["attempts"] == 1 and adaptive["results_count"] <= 2
+
+    # Con una sola de tres palabras en comun la distancia (~0.42) solo pasa el segundo umbral
+    wider = rag_query(corpus, "fracciones alfa beta", tool_context, adaptive=True)
+    assert wider["retrieval"] == {"top_k": 3, "distance_threshold": 0.5, "adaptive": True, "attempts": 2}
+
+    negative = rag_query(corpus, "fracciones", tool_context, top_k=-1)
+    assert negative["status"] == "error"
@@ -0,0 +1,60 @@
+from rag_agent.config import SESSION_CORPORA_MAX_ENTRIES, SESSION_CORPORA_STATE_KEY
+from rag_agent.tools import utils
+from rag_agent.tools.create_corpus import create_corpus
+from rag_agent.tools.delete_corpus import delete_corpus
+
+
+def test_registry_is_namespaced_and_clears_legacy_keys(tool_context):
+    tool_context.state.update({
+        "corpus_exists_viejo": True,
+        "corpus_exisits_viejo": True,
+        "current_corpus": "viejo",
+    })
+
+    utils.remember_corpus("nuevo", "projects/p/locations/l/ragCorpora/1", tool_context)
+
+    assert SESSION_CORPORA_STATE_KEY.startswith("rag_agent:")
+    assert tool_context.state["corpus_exists_viejo"] is None
+    assert tool_context.state["corpus_exisits_viejo"] is None
+    assert tool_context.state["current_corpus"] == "viejo"
+
+
+def test_registry_is_bounded(tool_context):
+    for i in range(SESSION_CORPORA_MAX_ENTRIES + 5):
+        utils.remember_corpus(f"c{i}", f"projects/p/locations/l/ragCorpora/{i}", tool_context)
+
+    corpora = tool_context.state[SESSION_CORPORA_STATE_KEY]
+    assert len(corpora) == SESSION_CORPORA_MAX_ENTRIES
+    assert "c0" not in corpora and f"c{SESSION_CORPORA_MAX_ENTRIES + 4}" in corpora
+
+
+def test_leftover_legacy_keys_count_against_the_cap(tool_context):
+    tool_context.state.update({f"corpus_exists_v{i}": None for i in range(5)})
+    tool_context.state["corpus_exisits_v0"] = True
+
+    for i in range(SESSION_CORPORA_MAX_ENTRIES):
+        utils.remember_corpus(f"c{i}", f"projects/p/locations/l/ragCorpora/{i}", tool_context)
+
+    corpora = tool_context.state[SESSION_CORPORA_STATE_KEY]
+    assert len(corpora) == SESSION_CORPORA_MAX_ENTRIES - 6
+    assert len(corpora) + len(utils._legacy_keys(tool_context)) == SESSION_CORPORA_MAX_ENTRIES
+
+
+def test_entries_expire_after_ttl(monkeypatch, tool_context):
+    utils.remember_corpus("c", "projects/p/locations/l/ragCorpora/9", tool_context)
+    assert utils.session_corpus("c", tool_context) == "projects/p/locations/l/ragCorpora/9"
+    assert utils.get_corpus_resource_name("c", tool_context) == "projects/p/locations/l/ragCorpora/9"
+
+    monkeypatch.setattr(utils, "SESSION_CORPORA_TTL_SECONDS", 0)
+    assert utils.session_corpus("c", tool_context) is None
+
+
+def test_create_and_delete_corpus_update_the_registry(tool_context, unique_name):
+    name = unique_name("sess")
+    created = create_corpus(name, tool_context)
+    assert utils.session_corpus(name, tool_context) == created["corpus_name"]
+    assert utils.check_corpus_exists(name, tool_context)
+
+    assert delete_corpus(name, True, tool_context)["status"] == "success"
+    assert name not in tool_context.state[SESSION_CORPORA_STATE_KEY]
+    assert not any(key.startswith("corpus_exis") for key in tool_context.state)
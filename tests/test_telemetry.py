@@ -0,0 +1,94 @@
+import socket
+import threading
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from rag_agent import telemetry
+from rag_agent.tools.create_corpus import create_corpus
+from rag_agent.tools.rag_query import rag_query
+
+
+@pytest.fixture
+def metrics():
+    telemetry.reset()
+    telemetry.set_enabled(True)
+    yield telemetry
+    telemetry.set_enabled(False)
+    telemetry.reset()
+
+
+def test_disabled_telemetry_records_nothing(tool_context):
+    telemetry.reset()
+    rag_query("no_existe", "q", tool_context)
+
+    assert telemetry.render_prometheus() == "\n"
+    assert telemetry.export_spans() == []
+
+
+def test_tool_phases_and_sdk_calls_are_recorded(metrics, tool_context, unique_name):
+    corpus = unique_name("telemetry")
+    create_corpus(corpus, tool_context)
+    metrics.reset()
+
+    rag_query(corpus, "consulta", tool_context)
+
+    names = {span["name"] for span in metrics.export_spans()}
+    assert {"rag_query.total", "rag_query.resolve", "rag_query.remote"} <= names
+    text = metrics.render_prometheus()
+    assert 'rag_tool_calls_total{status="error",tool="rag_query"} 1' in text
+    assert 'rag_sdk_calls_total{method="retrieval_query",status="ok",tool="rag_query"} 1' in text
+    assert 'rag_tool_phase_seconds_count{phase="total",tool="rag_query"} 1' in text
+
+
+def test_exceptions_are_counted_by_status(metrics):
+    @telemetry.instrument_tool
+    def broken_tool():
+        raise RuntimeError("fallo")
+
+    with pytest.raises(RuntimeError):
+        broken_tool()
+
+    assert 'rag_tool_calls_total{status="exception",tool="broken_tool"} 1' in metrics.render_prometheus()
+    assert metrics.export_spans(clear=True)[0]["status"] == {"code": "ERROR"}
+    assert metrics.export_spans() == []
+
+
+def test_histogram_buckets_are_cumulative(metrics):
+    metrics.observe("latency_seconds", 0.03, tool="t")
+    metrics.observe("latency_seconds", 2.0, tool="t")
+
+    text = metrics.render_prometheus()
+    assert 'latency_seconds_bucket{tool="t",le="0.025"} 0' in text
+    assert 'latency_seconds_bucket{tool="t",le="0.05"} 1' in text
+    assert 'latency_seconds_bucket{tool="t",le="+Inf"} 2' in text
+    assert 'latency_seconds_count{tool="t"} 2' in text
+
+
+def test_metrics_endpoint_serves_prometheus_text(metrics):
+    metrics.increment("requests_total", tool="t")
+    assert metrics.start_metrics_server(port=0) is None
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), metrics._metrics_handler())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        body = urllib.request.urlopen(url, timeout=5).read().decode("utf-8")
+    finally:
+        server.shutdown()
+    assert 'requests_total{tool="t"} 1' in body
+
+
+def test_metrics_server_listens_on_loopback_by_default(metrics, monkeypatch):
+    monkeypatch.setattr(metrics, "_server", None)
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = metrics.start_metrics_server(port=port)
+    try:
+        assert server.server_address[0] == "127.0.0.1"
+        assert metrics.start_metrics_server(port=port) is server
+    finally:
+        server.shutdown()
+        server.server_close()
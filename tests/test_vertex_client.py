@@ -0,0 +1,111 @@
+import itertools
+import sys
+import time
+import types
+
+import pytest
+
+from rag_agent import vertex_client
+from rag_agent.tools import resilience
+from rag_agent.tools.corpus_resolver import corpus_resolver
+from rag_agent.tools.create_corpus import create_corpus
+from rag_agent.tools.warmup import warm_up
+
+
+class FakeGapicClient:
+    def retrieve_contexts(self, request=None, timeout=None):
+        return timeout
+
+    def list_rag_files(self, request=None):
+        return "sin timeout"
+
+
+@pytest.fixture
+def fake_sdk(monkeypatch):
+    """vertexai.rag.utils._gapic_utils con fabricas falsas que cuentan los clientes creados."""
+    created = []
+
+    def factory():
+        created.append(FakeGapicClient())
+        return created[-1]
+
+    gapic_utils = types.ModuleType("vertexai.rag.utils._gapic_utils")
+    gapic_utils.create_rag_data_service_client = factory
+    gapic_utils.create_rag_service_client = factory
+    gapic_utils.created = created
+    utils = types.ModuleType("vertexai.rag.utils")
+    utils._gapic_utils = gapic_utils
+    monkeypatch.setitem(sys.modules, "vertexai.rag.utils", utils)
+    monkeypatch.setitem(sys.modules, "vertexai.rag.utils._gapic_utils", gapic_utils)
+    monkeypatch.setattr(vertex_client, "_pools", {})
+    monkeypatch.setattr(vertex_client, "_sdk_version", lambda: (1, 92))
+    return gapic_utils
+
+
+def test_pool_creates_clients_lazily_and_rotates():
+    counter = itertools.count()
+    pool = vertex_client.ClientPool(lambda: next(counter), size=2)
+
+    assert len(pool) == 0
+    assert [pool.get() for _ in range(5)] == [0, 1, 0, 1, 0]
+    assert len(pool) == 2
+
+
+def test_default_timeout_is_added_only_where_supported():
+    client = vertex_client._DefaultTimeoutClient(FakeGapicClient(), timeout=7)
+
+    assert client.retrieve_contexts(request={}) == 7
+    assert client.retrieve_contexts(request={}, timeout=1) == 1
+    assert client.list_rag_files(request={}) == "sin timeout"
+
+
+def test_default_timeout_is_capped_by_the_current_attempt():
+    client = vertex_client._DefaultTimeoutClient(FakeGapicClient(), timeout=7)
+    token = resilience._attempt_deadline.set(time.monotonic() + 0.5)
+    try:
+        assert 0 < client.retrieve_contexts(request={}) <= 0.5
+    finally:
+        resilience._attempt_deadline.reset(token)
+
+
+def test_install_caches_the_clients_built_by_the_sdk(fake_sdk):
+    assert vertex_client.install() is True
+    assert vertex_client.install() is True
+
+    first = fake_sdk.create_rag_service_client()
+    assert fake_sdk.create_rag_service_client() is first
+    fake_sdk.create_rag_data_service_client()
+
+    assert vertex_client.client_stats() == {"rag_data": 1, "rag": 1}
+    assert len(fake_sdk.created) == 2
+    assert first._client is fake_sdk.created[0]
+    assert first.retrieve_contexts(request={}) == vertex_client.RAG_CLIENT_TIMEOUT_SECONDS
+
+
+def test_install_keeps_the_sdk_factories_on_unsupported_versions(fake_sdk, monkeypatch):
+    original = fake_sdk.create_rag_service_client
+    monkeypatch.setattr(vertex_client, "_sdk_version", lambda: (2, 1))
+
+    assert vertex_client.install() is False
+    assert fake_sdk.create_rag_service_client is original
+    assert vertex_client.client_stats() == {}
+
+
+def test_install_without_the_sdk_factories_keeps_the_sdk_clients(fake_sdk):
+    del fake_sdk.create_rag_data_service_client
+
+    assert vertex_client.install() is False
+    assert vertex_client.client_stats() == {}
+
+
+def test_warm_up_primes_the_resolver(tool_context, unique_name):
+    corpus = unique_name("warm")
+    create_corpus(corpus, tool_context)
+    corpus_resolver.invalidate()
+
+    summary = warm_up(list_files=True)
+
+    assert summary["corpora"] >= 1 and summary["prepared_corpora"] >= 1
+    list_calls = corpus_resolver.stats()["list_calls"]
+    assert corpus_resolver.lookup(corpus)
+    assert corpus_resolver.stats()["list_calls"] == list_calls